@@ -1,12 +1,16 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
-from app.db.session import SessionLocal
+from app.core.metrics import count_cache
+from app.core.security import decode_access_token
+from app.db.session import AsyncSessionLocal, SessionLocal
 from app.schemas.token import TokenPayload
-from app.services.user_service import get_user_by_email
-from app.api.routes.auth import get_current_user
+from app.schemas.user import Principal
+from app.services.principal_cache import principal_cache
+from app.services.user_service import get_user_by_email_async
 
 def get_db() -> Generator[Session, None, None]:
     """
@@ -18,6 +22,46 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    تابع وابستگی برای دریافت جلسه ناهمگام پایگاه داده
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    """
+    دریافت کاربر فعلی بر اساس توکن
+    
+    هویت کاربر با کلید sub توکن در کش نگهداری می‌شود تا درخواست‌های احراز شده
+    به پرس‌وجوی جدول کاربران نیاز نداشته باشند.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="اعتبارنامه‌های نامعتبر",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    # رمزگشایی توکن
+    email = decode_access_token(token)
+    if email is None:
+        raise credentials_exception
+    token_data = TokenPayload(email=email)
+    
+    principal = await principal_cache.get(token_data.email)
+    count_cache("principal", principal is not None)
+    if principal is not None:
+        return principal
+    
+    # دریافت کاربر از پایگاه داده
+    user = await get_user_by_email_async(db, email=token_data.email)
+    if user is None:
+        raise credentials_exception
+    principal = Principal.model_validate(user, from_attributes=True)
+    await principal_cache.set(token_data.email, principal)
+    return principal
+
 # وابستگی برای دسترسی کاربران معمولی
 get_current_active_user = get_current_user
 
@@ -31,4 +75,4 @@ def get_current_admin_user(current_user = Depends(get_current_user)):
             status_code=status.HTTP_403_FORBIDDEN,
             detail="شما به این بخش دسترسی ندارید",
         )
-    return current_user 
\ No newline at end of file
+    return current_user
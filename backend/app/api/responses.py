@@ -0,0 +1,101 @@
+from typing import Any, Optional
+
+import msgpack
+import numpy as np
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+
+# انواع محتوای MessagePack که در هدر Accept پذیرفته می‌شوند
+MSGPACK_CONTENT_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+# درخواست صریح JSON سریع (orjson بدون اعتبارسنجی response_model)؛ پاسخ با application/json نوشته می‌شود
+NUMERIC_JSON_CONTENT_TYPES = ("application/vnd.numeric+json",)
+
+def _default_json(obj: Any) -> Any:
+    # آرایه‌های غیرپیوسته یا با نوع پشتیبانی نشده در orjson
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def _default_msgpack(obj: Any) -> Any:
+    if isinstance(obj, np.ndarray):
+        array = np.ascontiguousarray(obj)
+        return {"dtype": array.dtype.str, "shape": list(array.shape), "data": array.tobytes()}
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Type is not MessagePack serializable: {type(obj).__name__}")
+
+class NumericJSONResponse(JSONResponse):
+    """
+    پاسخ JSON با orjson؛ آرایه‌های NumPy بدون تبدیل به لیست پایتون نوشته می‌شوند
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default_json, option=orjson.OPT_SERIALIZE_NUMPY)
+
+class MsgPackResponse(Response):
+    """
+    پاسخ MessagePack؛ هر آرایه NumPy به صورت ستونی {dtype، shape، data} با بایت‌های خام نوشته می‌شود
+
+    dtype رشته نوع NumPy (مانند "<f8") است و آرایه با np.frombuffer(data, dtype).reshape(shape)
+    بازسازی می‌شود.
+    """
+
+    media_type = "application/msgpack"
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, default=_default_msgpack, use_bin_type=True)
+
+def _plain(obj: Any) -> Any:
+    # تبدیل آرایه‌های NumPy به داده ساده پایتون برای مسیر پیش‌فرض FastAPI
+    if isinstance(obj, dict):
+        return {key: _plain(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_plain(value) for value in obj]
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    return obj
+
+def accepts(request: Request, media_types) -> bool:
+    """
+    آیا کلاینت در هدر Accept یکی از انواع داده شده را (با q بزرگ‌تر از صفر) خواسته است
+    """
+    for item in request.headers.get("accept", "").split(","):
+        media_type, *params = item.split(";")
+        if media_type.strip().lower() not in media_types:
+            continue
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+def accepts_msgpack(request: Request) -> bool:
+    return accepts(request, MSGPACK_CONTENT_TYPES)
+
+def numeric_response(request: Request, content: Any, response: Optional[Response] = None) -> Any:
+    """
+    پاسخ پرحجم عددی با قالب مذاکره شده از هدر Accept
+
+    به صورت پیش‌فرض محتوا با آرایه‌های تبدیل شده به لیست برمی‌گردد و FastAPI آن را مانند
+    قبل با response_model اعتبارسنجی و با JSONResponse می‌نویسد. فقط کلاینتی که
+    application/msgpack یا application/vnd.numeric+json بخواهد پاسخ مستقیم MessagePack یا
+    orjson (بدون اعتبارسنجی و با عبور مستقیم آرایه‌های NumPy) می‌گیرد. وضعیت و هدرهای
+    تنظیم شده روی پارامتر response مسیر به پاسخ مستقیم منتقل می‌شوند.
+    """
+    if accepts_msgpack(request):
+        response_class = MsgPackResponse
+    elif accepts(request, NUMERIC_JSON_CONTENT_TYPES):
+        response_class = NumericJSONResponse
+    else:
+        if response is not None:
+            response.headers["Vary"] = "Accept"
+        return _plain(content)
+    headers = dict(response.headers) if response is not None else {}
+    headers["Vary"] = "Accept"
+    status_code = response.status_code if response is not None and response.status_code else 200
+    return response_class(content, status_code=status_code, headers=headers)
@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+
+from app.api.deps import get_current_admin_user
+from app.core.profiling import profiler
+from app.models.user import User as UserModel
+from app.schemas.profiling import ProfilingSwitch
+
+router = APIRouter()
+
+@router.get("/profiling")
+async def read_profiling(current_user: UserModel = Depends(get_current_admin_user)):
+    """
+    وضعیت کلید پروفایل این پردازه و فهرست پروفایل‌های ذخیره شده (فقط ادمین)
+    """
+    return {"status": profiler.status(), "captures": profiler.list_captures()}
+
+@router.post("/profiling")
+async def enable_profiling(
+    switch: ProfilingSwitch,
+    current_user: UserModel = Depends(get_current_admin_user)
+):
+    """
+    پروفایل CPU و حافظه N درخواست بعدی یا درصدی از درخواست‌ها (فقط ادمین)
+    
+    کلید در پردازه کارگری که این درخواست را دریافت کرده فعال می‌شود. شناسه پروفایل
+    هر درخواست در هدر X-Profile-Id پاسخ آن برگردانده می‌شود.
+    """
+    return profiler.enable(
+        requests=switch.requests,
+        sample_rate=switch.sample_rate,
+        path_prefix=switch.path_prefix,
+        duration_seconds=switch.duration_seconds,
+    )
+
+@router.delete("/profiling")
+async def disable_profiling(current_user: UserModel = Depends(get_current_admin_user)):
+    """
+    غیرفعال کردن پروفایل درخواست‌ها (فقط ادمین)
+    """
+    return profiler.disable()
+
+@router.get("/profiling/{capture_id}/{kind}")
+async def download_profile(
+    capture_id: str,
+    kind: str,
+    current_user: UserModel = Depends(get_current_admin_user)
+):
+    """
+    دریافت خروجی یک پروفایل (فقط ادمین)
+    
+    cpu و alloc پشته‌های folded قابل استفاده در flamegraph.pl یا speedscope هستند و meta
+    خلاصه درخواست را برمی‌گرداند.
+    """
+    path = profiler.capture_path(capture_id, kind)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="پروفایل یافت نشد",
+        )
+    media_type = "application/json" if kind == "meta" else "text/plain"
+    return FileResponse(path, media_type=media_type, filename=path.name)
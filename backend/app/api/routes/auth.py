@@ -1,25 +1,24 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from jose import JWTError, jwt
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.api.deps import get_db
-from app.core.security import create_access_token, verify_password, get_password_hash
+from app.api.deps import get_async_db, get_current_user, get_current_admin_user
+from app.core.security import create_access_token, password_hasher, verify_password_async
 from app.schemas.user import UserCreate, UserInDB, User
-from app.schemas.token import Token, TokenPayload
-from app.services.user_service import get_user_by_email, create_user
+from app.schemas.token import Token
+from app.services.user_service import get_user_by_email_async, create_user_async
 
 router = APIRouter()
 
 @router.post("/register", response_model=User)
-async def register(user_in: UserCreate, db: Session = Depends(get_db)):
+async def register(user_in: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """
     ثبت‌نام کاربر جدید
     """
     # بررسی وجود ایمیل در پایگاه داده
-    db_user = get_user_by_email(db, email=user_in.email)
+    db_user = await get_user_by_email_async(db, email=user_in.email)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -27,15 +26,15 @@ async def register(user_in: UserCreate, db: Session = Depends(get_db)):
         )
     
     # ایجاد کاربر جدید
-    return create_user(db=db, user=user_in)
+    return await create_user_async(db=db, user=user_in)
 
 @router.post("/login", response_model=Token)
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     """
     ورود کاربر و دریافت توکن دسترسی
     """
     # بررسی کاربر با ایمیل وارد شده
-    user = get_user_by_email(db, email=form_data.username)
+    user = await get_user_by_email_async(db, email=form_data.username)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -44,7 +43,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
         )
     
     # بررسی صحت رمز عبور
-    if not verify_password(form_data.password, user.hashed_password):
+    if not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="ایمیل یا رمز عبور اشتباه است",
@@ -67,38 +66,16 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
         }
     }
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
-
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    """
-    دریافت کاربر فعلی بر اساس توکن
-    """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="اعتبارنامه‌های نامعتبر",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        # رمزگشایی توکن
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = TokenPayload(email=email)
-    except JWTError:
-        raise credentials_exception
-    
-    # دریافت کاربر از پایگاه داده
-    user = get_user_by_email(db, email=token_data.email)
-    if user is None:
-        raise credentials_exception
-    return user
-
 @router.get("/me", response_model=User)
 async def read_users_me(current_user: UserInDB = Depends(get_current_user)):
     """
     دریافت اطلاعات کاربر فعلی
     """
-    return current_user 
\ No newline at end of file
+    return current_user 
+
+@router.get("/hashing-stats")
+async def read_hashing_stats(current_user: UserInDB = Depends(get_current_admin_user)):
+    """
+    آمار استخر هش رمز عبور (فقط ادمین)
+    """
+    return password_hasher.stats()
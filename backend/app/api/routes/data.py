@@ -1,38 +1,233 @@
-from typing import Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
 
-from app.api.deps import get_db, get_current_active_user
+import numpy as np
+from fastapi import (
+    APIRouter, Depends, HTTPException, status, UploadFile, File, Request, Response, Query, WebSocket,
+    WebSocketDisconnect
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_async_db, get_current_active_user, get_current_admin_user
+from app.api.responses import numeric_response
+from app.core.metrics import count_cache, stage
+from app.core.security import decode_access_token
+from app.db.session import AsyncSessionLocal
 from app.models.user import User as UserModel
-from app.services.eeg_service import process_eeg_data
-from app.services.audio_service import process_audio_data
-from app.schemas.data import EEGData, AudioData, CognitiveData, EmotionData, BrainwaveData
+from app.services.user_service import get_user_by_email_async
+from app.services.baseline_service import baseline_summary, get_baseline, update_baseline
+from app.services.cpu_pool import run_cpu_bound
+from app.services.eeg_archive import archive_eeg
+from app.services.eeg_service import analyze_eeg_signal
+from app.services.eeg_codec import (
+    BINARY_CONTENT_TYPES, NPY_CONTENT_TYPE, RAW_CONTENT_TYPE, EEGDecodeError, decode_eeg_body, decode_raw,
+    to_microvolts
+)
+from app.services.eeg_stream import EEGStreamSession
+from app.services.influx_writer import (
+    COGNITIVE_FIELDS, build_emotion_points, build_eeg_points, build_stream_points, submit_points
+)
+from app.services.model_registry import model_registry
+from app.services.result_cache import payload_key, result_cache
+from app.services.jobs import AUDIO_JOB, EEG_JOB, JobTooLargeError, encode_eeg_payload, enqueue_job, get_job
+from app.services.timeseries_service import get_series, resolve_range
+from app.services.audio_service import AudioDecodeError, build_audio_result, extract_segment_features
+from app.schemas.data import EEGData, EEGStreamConfig, AudioData, CognitiveData, EmotionData, BrainwaveData
 
 router = APIRouter()
 
-@router.post("/eeg", response_model=Dict[str, Any])
+@router.post(
+    "/eeg",
+    response_model=Dict[str, Any],
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "application/json": {"schema": EEGData.model_json_schema()},
+                RAW_CONTENT_TYPE: {"schema": {"type": "string", "format": "binary"}},
+                NPY_CONTENT_TYPE: {"schema": {"type": "string", "format": "binary"}},
+            },
+            "required": True,
+        }
+    },
+)
 async def upload_eeg_data(
-    eeg_data: EEGData,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    mode: str = Query("sync", pattern="^(sync|async)$", description="async: ثبت در صف و برگرداندن شناسه کار"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """
     آپلود و پردازش داده‌های EEG
+    
+    علاوه بر JSON، بدنه باینری خام (application/octet-stream، نمونه‌های درهم float32 یا int16
+    little-endian) و فایل .npy (application/x-npy) پذیرفته می‌شود. برای قالب‌های باینری،
+    کانال‌ها و نرخ نمونه‌برداری در هدرهای X-EEG-* ارسال می‌شوند.
+    
+    واحد مقادیر در فیلد unit یا هدر X-EEG-Unit (uV، mV یا V) اعلام می‌شود. رد کانال‌ها و
+    پنجره‌ها با آستانه دامنه میکروولت فقط برای داده با واحد اعلام شده انجام می‌شود.
+    
+    در حالت mode=async داده در صف پردازش قرار می‌گیرد و پاسخ 202 با شناسه کار برمی‌گردد.
     """
+    content_type = request.headers.get("content-type", "application/json").split(";")[0].strip()
+    with stage("eeg.read_body"):
+        body = await request.body()
+    
+    # آپلودهای تکراری (مثلاً تلاش مجدد کلاینت) بدون پردازش و اثر جانبی دوباره پاسخ داده می‌شوند
+    eeg_headers = {key: value for key, value in request.headers.items() if key.startswith("x-eeg-")}
+    cache_key = await run_in_threadpool(
+        payload_key, EEG_JOB, body, user_id=current_user.id, content_type=content_type, **eeg_headers
+    )
+    cached = await result_cache.get(cache_key)
+    count_cache("result", cached is not None)
+    if cached is not None:
+        response.headers["X-Cache"] = "HIT"
+        return numeric_response(request, _eeg_response(cached), response)
+    
+    if content_type in BINARY_CONTENT_TYPES:
+        # رمزگشایی بدون کپی بدنه باینری
+        try:
+            with stage("eeg.decode"):
+                signal, header = decode_eeg_body(body, content_type, request.headers)
+        except EEGDecodeError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        channels, sampling_rate, start_time, unit = header.channels, header.sampling_rate, header.start_time, header.unit
+    elif content_type == "application/json":
+        try:
+            with stage("eeg.validate"):
+                eeg_data = EEGData.model_validate_json(body)
+        except ValidationError as e:
+            # ناسازگاری ابعاد داده (بررسی سطح مدل در EEGData) خطای 400 است و بقیه خطاها 422
+            shape_errors = [error for error in e.errors() if not error["loc"]]
+            if shape_errors:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(shape_errors[0]["ctx"]["error"]))
+            raise RequestValidationError(e.errors())
+        with stage("eeg.to_array"):
+            signal = np.asarray(eeg_data.values, dtype=np.float64)
+        channels, sampling_rate, unit = eeg_data.channels, eeg_data.sampling_rate, eeg_data.unit
+        start_time = eeg_data.timestamps[0] if eeg_data.timestamps else None
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="نوع محتوای داده EEG پشتیبانی نمی‌شود"
+        )
+    
+    if start_time is None:
+        start_time = time.time() - signal.shape[-1] / sampling_rate
+    # آستانه‌های دامنه فقط برای داده با واحد اعلام شده (پس از تبدیل به میکروولت) اعمال می‌شوند
+    calibrated = unit is not None
+    signal = to_microvolts(signal, unit)
+    
+    if mode == "async":
+        try:
+            job_id = await enqueue_job(
+                EEG_JOB, current_user.id, encode_eeg_payload(signal),
+                sampling_rate=sampling_rate, start_time=start_time, calibrated=calibrated, cache_key=cache_key
+            )
+        except JobTooLargeError as e:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+        with stage("eeg.archive"):
+            await archive_eeg(current_user.id, signal, channels, sampling_rate, start_time, calibrated)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return numeric_response(request, _job_accepted(request, job_id), response)
+    
     # پردازش داده‌های EEG
-    result = process_eeg_data(db, current_user.id, eeg_data)
+    try:
+        result = await run_cpu_bound(analyze_eeg_signal, signal, sampling_rate, calibrated)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    # نگهداری داده خام برای پردازش مجدد با نسخه‌های بعدی الگوریتم؛ آپلودهای رد شده بایگانی نمی‌شوند
+    with stage("eeg.archive"):
+        await archive_eeg(current_user.id, signal, channels, sampling_rate, start_time, calibrated)
     
+    # ارسال نتایج به صف نوشتن InfluxDB بدون انتظار برای پایگاه داده
+    submit_points(build_eeg_points(current_user.id, result, start_time))
+    
+    # به‌روزرسانی خط پایه کاربر و جایگزینی میانگین پیش‌فرض با آن
+    with stage("eeg.baseline"):
+        baseline = await update_baseline(db, current_user.id, result["cognitive_data"]["current"])
+    result["cognitive_data"]["average"] = [round(value) for value in baseline.mean]
+    await result_cache.set(cache_key, result)
+    response.headers["X-Cache"] = "MISS"
+    
+    return numeric_response(request, _eeg_response(result), response)
+
+def _eeg_response(result: Dict[str, Any]) -> Dict[str, Any]:
     return {
         "status": "موفقیت",
         "message": "داده‌های EEG با موفقیت ثبت شدند",
         "brainwaveData": result.get("brainwave_data"),
-        "cognitiveData": result.get("cognitive_data")
+        "cognitiveData": result.get("cognitive_data"),
+        "preprocessing": result.get("preprocessing")
+    }
+
+def _job_accepted(request: Request, job_id: str) -> Dict[str, Any]:
+    return {
+        "status": "در صف",
+        "message": "داده‌ها برای پردازش در صف قرار گرفتند",
+        "jobId": job_id,
+        "statusUrl": str(request.url_for("get_job_status", job_id=job_id))
     }
 
+@router.websocket("/eeg/stream")
+async def stream_eeg_data(
+    websocket: WebSocket,
+    token: str = Query(...)
+):
+    """
+    دریافت جریانی داده‌های EEG از طریق WebSocket
+    
+    اولین پیام یک JSON پیکربندی (EEGStreamConfig) است و پیام‌های بعدی بلوک‌های باینری
+    نمونه‌های درهم با همان قالب بدنه خام آپلود هستند. پس از کامل شدن هر پنجره لغزان،
+    توان باندها و شاخص‌های شناختی به کلاینت ارسال می‌شود.
+    """
+    # احراز هویت با توکن ارسال شده در پارامتر پرس‌وجو؛ جلسه پایگاه داده پیش از پذیرش اتصال بسته می‌شود
+    # تا اتصال‌های طولانی جریان، اتصال‌های استخر پایگاه داده را نگه ندارند
+    email = decode_access_token(token)
+    user = None
+    if email:
+        async with AsyncSessionLocal() as db:
+            user = await get_user_by_email_async(db, email=email)
+    if user is None or not user.is_active:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    try:
+        config = EEGStreamConfig.model_validate_json(await websocket.receive_text())
+        if config.start_time is None:
+            config.start_time = time.time()
+        session = EEGStreamSession(config)
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes") is None:
+                raise ValueError("بلوک‌های نمونه باید به صورت باینری ارسال شوند")
+            block = to_microvolts(decode_raw(message["bytes"], config), config.unit)
+            # پردازش بلوک خارج از حلقه رویداد
+            updates = await run_in_threadpool(session.push, block)
+            submit_points(build_stream_points(user.id, updates))
+            for update in updates:
+                await websocket.send_json(update)
+    except WebSocketDisconnect:
+        return
+    except (ValidationError, ValueError) as e:
+        await websocket.send_json({"type": "error", "detail": str(e)})
+        await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA)
+
 @router.post("/audio", response_model=Dict[str, Any])
 async def upload_audio_data(
+    request: Request,
+    response: Response,
+    mode: str = Query("sync", pattern="^(sync|async)$", description="async: ثبت در صف و برگرداندن شناسه کار"),
     audio_file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """
@@ -45,75 +240,170 @@ async def upload_audio_data(
             detail="فایل باید از نوع صوتی باشد"
         )
     
-    # خواندن محتوای فایل
-    audio_data = await audio_file.read()
+    cache_key = await run_in_threadpool(
+        payload_key, AUDIO_JOB, audio_file.file, user_id=current_user.id, content_type=audio_file.content_type
+    )
+    cached = await result_cache.get(cache_key)
+    count_cache("result", cached is not None)
+    if cached is not None:
+        response.headers["X-Cache"] = "HIT"
+        return numeric_response(request, _audio_response(cached), response)
+    
+    if mode == "async":
+        try:
+            job_id = await enqueue_job(
+                AUDIO_JOB, current_user.id, await audio_file.read(),
+                content_type=audio_file.content_type, uploaded_at=time.time(), cache_key=cache_key
+            )
+        except JobTooLargeError as e:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+        response.status_code = status.HTTP_202_ACCEPTED
+        return numeric_response(request, _job_accepted(request, job_id), response)
     
-    # پردازش داده‌های صوتی
-    result = process_audio_data(db, current_user.id, audio_data)
+    # پردازش جریانی فایل موقت آپلود خارج از حلقه رویداد، بدون خواندن کامل آن در حافظه
+    try:
+        features = await run_in_threadpool(extract_segment_features, audio_file.file)
+    except AudioDecodeError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    # امتیازدهی همراه با درخواست‌های همزمان دیگر در یک فراخوانی مدل
+    with stage("audio.score"):
+        scores = await model_registry.predict_batched("emotion", features["table"])
+    result = build_audio_result(features, scores)
+    submit_points(build_emotion_points(current_user.id, result, time.time()))
+    await result_cache.set(cache_key, result)
+    response.headers["X-Cache"] = "MISS"
     
+    return numeric_response(request, _audio_response(result), response)
+
+def _audio_response(result: Dict[str, Any]) -> Dict[str, Any]:
     return {
         "status": "موفقیت",
         "message": "داده‌های صوتی با موفقیت ثبت شدند",
         "emotionData": result.get("emotion_data")
     }
 
+@router.get("/jobs/{job_id}", response_model=Dict[str, Any])
+async def get_job_status(
+    job_id: str,
+    request: Request,
+    response: Response,
+    current_user: UserModel = Depends(get_current_active_user)
+):
+    """
+    دریافت وضعیت و نتیجه یک کار پردازش ناهمگام
+    """
+    job = await get_job(job_id)
+    # کاربر فقط به کارهای خودش دسترسی دارد مگر اینکه ادمین باشد
+    if job is None or (job["user_id"] != current_user.id and not current_user.is_admin):
+        raise HTTPException(status_code=404, detail="کار پیدا نشد")
+    
+    return numeric_response(request, {
+        "jobId": job_id,
+        "kind": job["kind"],
+        "status": job["status"],
+        "result": job.get("result"),
+        "error": job.get("error")
+    }, response)
+
+@router.get("/cache-stats")
+async def read_cache_stats(current_user: UserModel = Depends(get_current_admin_user)):
+    """
+    آمار برخورد کش نتایج پردازش در این پردازه (فقط ادمین)
+    """
+    return result_cache.stats()
+
+def time_range_params(
+    start: Optional[datetime] = Query(None, description="ابتدای بازه (پیش‌فرض: ۲۴ ساعت پیش)"),
+    end: Optional[datetime] = Query(None, description="انتهای بازه (پیش‌فرض: اکنون)"),
+    resolution: Optional[str] = Query(None, description="دقت نقاط، مانند 30s، 5m یا 1h (پیش‌فرض: حدود ۵۰۰ نقطه)"),
+    method: str = Query("mean", pattern="^(mean|minmax|lttb)$", description="روش کاهش نمونه"),
+) -> Dict[str, Any]:
+    """
+    پارامترهای مشترک پرس‌وجوی بازه زمانی
+    """
+    try:
+        start_ts, end_ts, step = resolve_range(start, end, resolution)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {"start": start_ts, "end": end_ts, "resolution": step, "method": method}
+
+def _finite(values: np.ndarray) -> np.ndarray:
+    # مقادیر گمشده بازه‌های خالی صفر می‌شوند؛ در پاسخ‌های orjson و MessagePack آرایه بدون تبدیل به لیست سریال می‌شود
+    return np.nan_to_num(values)
+
 @router.get("/cognitive", response_model=CognitiveData)
 async def get_cognitive_data(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    time_range: Dict[str, Any] = Depends(time_range_params),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """
     دریافت داده‌های شناختی کاربر
+    
+    current آخرین مقدار و trend سری کاهش‌یافته هر شاخص در بازه است؛ average و baseline
+    از خط پایه تجمعی کاربر خوانده می‌شوند و به اسکن تاریخچه نیازی ندارند.
     """
-    # اینجا در نسخه واقعی، از پایگاه داده یا InfluxDB داده‌ها را دریافت می‌کنیم
-    # برای نمونه، داده‌های شبیه‌سازی شده برمی‌گردانیم
+    fields = list(COGNITIVE_FIELDS)
+    baseline = baseline_summary(await get_baseline(db, current_user.id))
+    timestamps, series = await get_series(current_user.id, "cognitive", fields, **time_range)
+    if len(timestamps) == 0:
+        return numeric_response(request, {
+            "current": [],
+            "average": baseline["mean"],
+            "trend": [[] for _ in fields],
+            "timestamps": [],
+            "baseline": baseline
+        }, response)
     
-    return {
-        "current": [75, 65, 40, 80, 85, 70],
-        "average": [60, 60, 50, 65, 70, 60],
-        "trend": [
-            [50, 55, 60, 65, 70, 75],
-            [40, 45, 50, 55, 60, 65],
-            [30, 35, 40, 45, 50, 40],
-            [60, 65, 70, 75, 80, 80],
-            [65, 70, 75, 80, 85, 85],
-            [50, 55, 60, 65, 70, 70]
-        ]
-    }
+    return numeric_response(request, {
+        "current": [float(np.nan_to_num(series[field][-1])) for field in fields],
+        "average": baseline["mean"],
+        "trend": [_finite(series[field]) for field in fields],
+        "timestamps": timestamps,
+        "baseline": baseline
+    }, response)
 
 @router.get("/emotion", response_model=EmotionData)
 async def get_emotion_data(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    time_range: Dict[str, Any] = Depends(time_range_params),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """
     دریافت داده‌های احساسی کاربر
     """
-    # اینجا در نسخه واقعی، از پایگاه داده یا InfluxDB داده‌ها را دریافت می‌کنیم
-    # برای نمونه، داده‌های شبیه‌سازی شده برمی‌گردانیم
+    fields = ["positive", "negative", "neutral"]
+    timestamps, series = await get_series(current_user.id, "emotion", fields, **time_range)
     
-    return {
-        "labels": ["۸:۰۰", "۱۰:۰۰", "۱۲:۰۰", "۱۴:۰۰", "۱۶:۰۰", "۱۸:۰۰", "۲۰:۰۰"],
-        "positive": [65, 70, 80, 75, 85, 90, 88],
-        "negative": [35, 30, 20, 25, 15, 10, 12],
-        "neutral": [50, 55, 50, 60, 55, 45, 50]
-    }
+    # برچسب زمانی؛ برای بازه‌های طولانی‌تر از یک روز تاریخ هم نمایش داده می‌شود
+    label_format = "%H:%M" if time_range["end"] - time_range["start"] <= 86400 else "%m-%d %H:%M"
+    labels = [datetime.fromtimestamp(t, timezone.utc).strftime(label_format) for t in timestamps]
+    
+    return numeric_response(request, {
+        "labels": labels,
+        **{field: _finite(series[field]) for field in fields},
+        "timestamps": timestamps
+    }, response)
 
 @router.get("/brainwave", response_model=BrainwaveData)
 async def get_brainwave_data(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    time_range: Dict[str, Any] = Depends(time_range_params),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """
     دریافت داده‌های امواج مغزی کاربر
     """
-    # اینجا در نسخه واقعی، از پایگاه داده یا InfluxDB داده‌ها را دریافت می‌کنیم
-    # برای نمونه، داده‌های شبیه‌سازی شده برمی‌گردانیم
+    fields = ["alpha", "beta", "delta", "theta", "gamma"]
+    timestamps, series = await get_series(current_user.id, "brainwave", fields, **time_range)
     
-    return {
-        "alpha": [10, 12, 14, 13, 15, 16, 15],
-        "beta": [20, 22, 25, 24, 26, 28, 27],
-        "delta": [5, 6, 4, 5, 7, 6, 5],
-        "theta": [8, 9, 7, 8, 10, 9, 8],
-        "gamma": [30, 32, 35, 34, 36, 38, 37]
-    } 
\ No newline at end of file
+    return numeric_response(request, {
+        **{field: _finite(series[field]) for field in fields},
+        "timestamps": timestamps
+    }, response)
@@ -1,31 +1,82 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import csv
+import json
+from typing import List, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, get_current_active_user, get_current_admin_user
+from app.api.deps import get_async_db, get_current_active_user, get_current_admin_user
+from app.db.session import AsyncSessionLocal
 from app.schemas.user import User, UserUpdate, UserCreate
 from app.models.user import User as UserModel
-from app.services.user_service import get_user, get_users, update_user, delete_user
+from app.services.user_service import (
+    get_user_async, get_users_page_async, iter_users_async, update_user_async, delete_user_async
+)
+from app.services.user_import import detect_format, import_users_async, parse_rows
 
 router = APIRouter()
 
 @router.get("/", response_model=List[User])
 async def read_users(
-    skip: int = 0, 
-    limit: int = 100, 
-    db: Session = Depends(get_db),
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="مقدار هدر X-Next-Cursor پاسخ قبلی"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_admin_user)
 ):
     """
     دریافت لیست تمام کاربران (فقط ادمین)
+    
+    صفحه‌بندی با cursor انجام می‌شود؛ اگر صفحه بعدی وجود داشته باشد، cursor آن در هدر
+    X-Next-Cursor برگردانده می‌شود.
     """
-    users = get_users(db, skip=skip, limit=limit)
+    try:
+        users, next_cursor = await get_users_page_async(db, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return users
 
+@router.get("/export")
+async def export_users(current_user: UserModel = Depends(get_current_admin_user)):
+    """
+    خروجی جریانی تمام کاربران به صورت NDJSON (فقط ادمین)
+    """
+    async def lines():
+        # جلسه مستقل تا پایان ارسال جریان باز می‌ماند
+        async with AsyncSessionLocal() as db:
+            async for user in iter_users_async(db):
+                yield json.dumps(user, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=users.ndjson"}
+    )
+
+@router.post("/import")
+async def import_users(
+    users_file: UploadFile = File(..., description="CSV با سطر عنوان یا NDJSON با فیلدهای email، name، password، age و gender"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_admin_user)
+):
+    """
+    ایجاد گروهی کاربران از فایل (فقط ادمین)
+    
+    ردیف‌های نامعتبر یا تکراری مانع ایجاد بقیه نمی‌شوند و با شماره سطر گزارش می‌شوند.
+    """
+    content = await users_file.read()
+    fmt = detect_format(users_file.filename or "", users_file.content_type)
+    try:
+        return await import_users_async(db, parse_rows(content, fmt))
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"فایل قابل خواندن نیست: {e}")
+
 @router.get("/{user_id}", response_model=User)
 async def read_user(
     user_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """
@@ -38,7 +89,7 @@ async def read_user(
             detail="شما به این اطلاعات دسترسی ندارید"
         )
     
-    db_user = get_user(db, user_id=user_id)
+    db_user = await get_user_async(db, user_id=user_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="کاربر پیدا نشد")
     return db_user
@@ -47,7 +98,7 @@ async def read_user(
 async def update_user_info(
     user_id: int, 
     user_update: UserUpdate, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """
@@ -60,7 +111,7 @@ async def update_user_info(
             detail="شما اجازه تغییر اطلاعات این کاربر را ندارید"
         )
     
-    db_user = update_user(db, user_id=user_id, user_update=user_update)
+    db_user = await update_user_async(db, user_id=user_id, user_update=user_update)
     if db_user is None:
         raise HTTPException(status_code=404, detail="کاربر پیدا نشد")
     return db_user
@@ -68,7 +119,7 @@ async def update_user_info(
 @router.delete("/{user_id}", response_model=User)
 async def delete_user_account(
     user_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: UserModel = Depends(get_current_active_user)
 ):
     """
@@ -81,7 +132,7 @@ async def delete_user_account(
             detail="شما اجازه حذف این کاربر را ندارید"
         )
     
-    db_user = delete_user(db, user_id=user_id)
+    db_user = await delete_user_async(db, user_id=user_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="کاربر پیدا نشد")
     return db_user 
\ No newline at end of file
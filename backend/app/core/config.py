@@ -1,26 +1,48 @@
 import os
-from typing import List, Union
+from typing import List, Optional, Union
 from pydantic_settings import BaseSettings
 from pydantic import AnyHttpUrl, validator
 
 class Settings(BaseSettings):
     API_HOST: str = "localhost"
     API_PORT: int = 8000
-    DEBUG: bool = True
+    DEBUG: bool = False
+    
+    # اجرای تولید با serve.py: تعداد کارگرهای وب (صفر یعنی به تعداد هسته‌ها) و مدیریت آن‌ها
+    WEB_CONCURRENCY: int = 0
+    WEB_PRELOAD: bool = True
+    WEB_TIMEOUT: int = 60
+    WEB_GRACEFUL_TIMEOUT: int = 30
+    WEB_MAX_REQUESTS: int = 0  # بازیابی دوره‌ای کارگرها پس از این تعداد درخواست؛ صفر یعنی غیرفعال
+    # پردازه‌های محاسباتی هر کارگر وب؛ خالی یعنی تقسیم هسته‌ها بین کارگرها و صفر یعنی استخر نخ
+    CPU_POOL_PROCESSES: Optional[int] = None
     
     # تنظیمات امنیتی
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 32
     
     # پایگاه داده
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
     
     # InfluxDB
     INFLUXDB_URL: str
     INFLUXDB_TOKEN: str
     INFLUXDB_ORG: str
     INFLUXDB_BUCKET: str
+    INFLUXDB_SINK: str = "influxdb"  # influxdb یا memory (برای تست)
+    INFLUXDB_BATCH_SIZE: int = 500
+    INFLUXDB_FLUSH_INTERVAL_SECONDS: float = 1.0
+    INFLUXDB_QUEUE_SIZE: int = 10000
+    INFLUXDB_MAX_RETRIES: int = 5
+    INFLUXDB_RETRY_BACKOFF_SECONDS: float = 0.5
+    INFLUXDB_ROLLUPS_ENABLED: bool = True
     
     # Redis
     REDIS_HOST: str
@@ -28,10 +50,63 @@ class Settings(BaseSettings):
     REDIS_DB: int
     REDIS_PASSWORD: str = None
     
+    # کش هویت کاربران احراز شده: memory (فقط با یک کارگر وب)، redis یا none
+    PRINCIPAL_CACHE_BACKEND: str = "memory"
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    
     # Kafka
     KAFKA_BOOTSTRAP_SERVERS: str
     KAFKA_EEG_TOPIC: str
     KAFKA_AUDIO_TOPIC: str
+    KAFKA_CONSUMER_GROUP: str = "mindmirror-workers"
+    KAFKA_MAX_MESSAGE_BYTES: int = 64 * 1024 * 1024
+    
+    # پردازش ناهمگام آپلودها: kafka یا memory (صف درون‌فرایندی برای تست)
+    JOB_QUEUE_BACKEND: str = "kafka"
+    JOB_RESULT_TTL_SECONDS: int = 24 * 3600
+    JOB_WORKER_PROCESSES: int = 0  # صفر یعنی به تعداد هسته‌ها
+    
+    # کش نتایج پردازش آپلودهای تکراری: memory، redis (حافظه + Redis) یا none
+    RESULT_CACHE_BACKEND: str = "memory"
+    RESULT_CACHE_TTL_SECONDS: int = 3600
+    RESULT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # سقف حجم سطح حافظه در هر پردازه
+    RESULT_CACHE_MAX_ITEM_BYTES: int = 4 * 1024 * 1024
+    # با هر تغییر در الگوریتم پردازش افزایش یابد تا نتایج قدیمی کش استفاده نشوند
+    PIPELINE_VERSION: str = "2"
+    
+    # پیش‌پردازش EEG پیش از تحلیل طیفی (آستانه‌ها بر حسب میکروولت و فقط برای آپلودهای با واحد اعلام شده)
+    EEG_PREPROCESSING: bool = True
+    EEG_BANDPASS_LOW_HZ: float = 0.5
+    EEG_BANDPASS_HIGH_HZ: float = 45.0
+    EEG_NOTCH_HZ: float = 50.0  # 60 در شبکه برق آمریکای شمالی؛ صفر یعنی غیرفعال
+    EEG_ARTIFACT_AMPLITUDE_UV: float = 150.0
+    EEG_ARTIFACT_MAX_BAD_FRACTION: float = 0.2  # سهم نمونه‌های پرت برای رد کل کانال
+    EEG_FLATLINE_STD_UV: float = 0.1
+    
+    # بایگانی خام آپلودهای EEG برای پردازش مجدد تاریخچه
+    EEG_ARCHIVE_ENABLED: bool = True
+    EEG_ARCHIVE_DIR: str = "./eeg_archive"
+    EEG_ARCHIVE_SEGMENT_MAX_BYTES: int = 256 * 1024 * 1024
+    
+    # وزن هر آپلود در میانگین نمایی خط پایه شناختی کاربر
+    BASELINE_EWMA_ALPHA: float = 0.1
+    
+    # معیارهای Prometheus در /metrics و زمان‌سنجی مراحل پردازش
+    METRICS_ENABLED: bool = True
+    
+    # پروفایل درخواست‌ها با کلید ادمین (/api/admin/profiling)
+    PROFILING_OUTPUT_DIR: str = "./profiles"
+    PROFILING_INTERVAL_MS: float = 5.0
+    PROFILING_TRACEMALLOC_FRAMES: int = 32
+    PROFILING_MAX_CAPTURES: int = 200
+    
+    # مدل‌های یادگیری ماشین؛ بدون مسیر، مدل‌های پیش‌فرض مبتنی بر قاعده استفاده می‌شوند
+    EMOTION_MODEL_PATH: Optional[str] = None
+    COGNITIVE_MODEL_PATH: Optional[str] = None
+    MODEL_WARMUP: bool = True
+    MODEL_BATCH_MAX_SIZE: int = 256  # حداکثر تعداد سطر ویژگی در هر فراخوانی مدل
+    MODEL_BATCH_WAIT_MS: float = 5.0
     
     @validator("DATABASE_URL", pre=True)
     def validate_database_url(cls, v):
@@ -0,0 +1,229 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+
+# مرزهای پیش‌فرض هیستوگرام‌های زمان (ثانیه)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class Counter:
+    """
+    شمارنده افزایشی با برچسب
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def samples(self) -> Iterable[str]:
+        for values, total in list(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labels, values)} {total}"
+
+class Histogram:
+    """
+    هیستوگرام تجمعی با مرزهای ثابت (قالب Prometheus)
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series: Dict[LabelValues, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # شمارش هر سطل، سپس مجموع و تعداد
+                series = self._series[label_values] = [0.0] * (len(self.buckets) + 3)
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self) -> Iterable[str]:
+        for values, series in list(self._series.items()):
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = 'le="%s"' % ("+Inf" if bound == float("inf") else repr(bound))
+                yield f"{self.name}_bucket{_format_labels(self.labels, values, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labels, values)} {series[-2]}"
+            yield f"{self.name}_count{_format_labels(self.labels, values)} {series[-1]}"
+
+class MetricsRegistry:
+    """
+    مجموعه معیارهای این پردازه به همراه گیج‌هایی که هنگام خواندن محاسبه می‌شوند
+    """
+
+    def __init__(self):
+        self._metrics: List = []
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, Dict[str, str], float]]]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, func):
+        """
+        ثبت تابعی که هنگام خواندن /metrics چندتایی‌های (نام، توضیح، برچسب‌ها، مقدار) گیج برمی‌گرداند
+        """
+        self._collectors.append(func)
+        return func
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        described = set()
+        for collect in self._collectors:
+            for name, documentation, labels, value in collect():
+                if value is None:
+                    continue
+                if name not in described:
+                    described.add(name)
+                    lines.append(f"# HELP {name} {documentation}")
+                    lines.append(f"# TYPE {name} gauge")
+                names = tuple(labels)
+                lines.append(f"{name}{_format_labels(names, tuple(labels[n] for n in names))} {float(value)}")
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "زمان پاسخ درخواست‌های HTTP", ("method", "route", "status")
+))
+stage_duration = registry.register(Histogram(
+    "pipeline_stage_duration_seconds", "زمان هر مرحله پردازش داده", ("stage",)
+))
+cache_requests = registry.register(Counter(
+    "cache_requests_total", "مراجعه به کش‌ها به تفکیک نتیجه", ("cache", "result")
+))
+
+# ثبت موقت زمان مراحل در پردازه‌های فرزند استخر محاسباتی برای ارسال به پردازه والد
+_capture = threading.local()
+
+def _observe_stage(name: str, seconds: float) -> None:
+    pending = getattr(_capture, "observations", None)
+    if pending is not None:
+        pending.append((name, seconds))
+    else:
+        stage_duration.observe(seconds, name)
+
+@contextmanager
+def _timed_stage(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _observe_stage(name, time.perf_counter() - started)
+
+_NOOP = nullcontext()
+
+def stage(name: str):
+    """
+    زمان‌سنجی یک بخش پرهزینه: with stage("eeg.band_power"): ...
+
+    وقتی METRICS_ENABLED خاموش است، یک context manager ثابت و بدون هزینه برمی‌گرداند.
+    """
+    if not settings.METRICS_ENABLED:
+        return _NOOP
+    return _timed_stage(name)
+
+def timed(name: str):
+    """
+    دکوراتور معادل stage برای کل یک تابع
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def call_capturing_stages(func: Callable, *args) -> Tuple[object, List[Tuple[str, float]]]:
+    """
+    اجرای تابع در پردازه فرزند و برگرداندن زمان مراحل آن همراه نتیجه
+    """
+    _capture.observations = []
+    try:
+        return func(*args), _capture.observations
+    finally:
+        _capture.observations = None
+
+def record_stages(observations: Optional[List[Tuple[str, float]]]) -> None:
+    for name, seconds in observations or ():
+        stage_duration.observe(seconds, name)
+
+def count_cache(cache: str, hit: bool) -> None:
+    if settings.METRICS_ENABLED:
+        cache_requests.inc(cache, "hit" if hit else "miss")
+
+class MetricsMiddleware:
+    """
+    میان‌افزار ASGI ثبت زمان پاسخ هر مسیر با الگوی مسیر (نه آدرس واقعی) به عنوان برچسب
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._templates: Dict[object, str] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status_code = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_code[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_duration.observe(
+                time.perf_counter() - started, scope["method"], self._route(scope), str(status_code[0])
+            )
+
+    def _route(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        template = self._templates.get(endpoint)
+        if template is None:
+            paths = {getattr(route, "endpoint", None): route.path for route in scope["app"].routes}
+            template = self._templates[endpoint] = paths.get(endpoint, "unmatched")
+        return template
@@ -0,0 +1,318 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# انواع فایل ذخیره شده برای هر درخواست پروفایل شده
+CAPTURE_KINDS = {"cpu": ".cpu.folded", "alloc": ".alloc.folded", "meta": ".json"}
+
+_CAPTURE_ID = re.compile(r"^\d{8}T\d{6}-\d+-[0-9a-f]{8}$")
+_SAMPLER_PREFIX = "profiler-sampler"
+
+@lru_cache(maxsize=4096)
+def _short_path(filename: str) -> str:
+    # مسیر نسبی به نزدیک‌ترین پوشه sys.path برای خوانایی نمودار شعله‌ای
+    best = filename
+    for root in sys.path:
+        if root and filename.startswith(root + os.sep) and len(filename) - len(root) - 1 < len(best):
+            best = filename[len(root) + 1:]
+    return best.replace(";", ":")
+
+def _fold_frame(frame, root: str) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{getattr(code, 'co_qualname', code.co_name)} ({_short_path(code.co_filename)})")
+        frame = frame.f_back
+    names.append(root)
+    return ";".join(reversed(names))
+
+class Sampler:
+    """
+    پروفایلر نمونه‌بردار: پشته تمام نخ‌های پردازه در فواصل ثابت خوانده و شمرده می‌شود
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"{_SAMPLER_PREFIX}-{id(self)}", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                name = names.get(ident, str(ident))
+                if not name.startswith(_SAMPLER_PREFIX):
+                    self.stacks[_fold_frame(frame, name)] += 1
+
+# tracemalloc بین درخواست‌های همزمان پروفایل شده مشترک است
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_owns_tracing = False
+
+def _start_tracing(frames: int) -> None:
+    global _tracing_users, _owns_tracing
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            _owns_tracing = True
+        _tracing_users += 1
+
+def _stop_tracing() -> None:
+    global _tracing_users, _owns_tracing
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _owns_tracing:
+            tracemalloc.stop()
+            _owns_tracing = False
+
+def _fold_allocations(snapshot: tracemalloc.Snapshot) -> Counter:
+    """
+    حافظه زنده به تفکیک پشته تخصیص در قالب folded (وزن: بایت)
+    """
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ))
+    stacks: Counter = Counter()
+    for stat in snapshot.statistics("traceback"):
+        # فریم‌های traceback از قدیمی‌ترین به جدیدترین مرتب هستند
+        stacks[";".join(f"{_short_path(frame.filename)}:{frame.lineno}" for frame in stat.traceback)] += stat.size
+    return stacks
+
+class Capture:
+    """
+    پروفایل یک درخواست: نمونه‌های CPU و حافظه تخصیص یافته‌ای که تا پایان آن زنده مانده است
+
+    نمونه‌برداری کل پردازه را می‌بیند؛ درخواست‌های همزمان دیگر نیز در خروجی حضور دارند.
+    """
+
+    def __init__(self, interval: float, frames: int):
+        self.interval = interval
+        self.frames = frames
+        self.id = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._sampler = Sampler(interval)
+        self._cpu: Counter = Counter()
+        self._alloc: Counter = Counter()
+        self._peak_bytes = 0
+        self._started = 0.0
+
+    def start(self) -> None:
+        _start_tracing(self.frames)
+        self._started = time.perf_counter()
+        self._sampler.start()
+
+    def stop(self) -> Dict[str, Any]:
+        self._cpu.update(self._sampler.stop())
+        seconds = time.perf_counter() - self._started
+        snapshot = tracemalloc.take_snapshot()
+        peak_bytes = max(self._peak_bytes, tracemalloc.get_traced_memory()[1])
+        _stop_tracing()
+        self._alloc.update(_fold_allocations(snapshot))
+        return {"cpu": self._cpu, "alloc": self._alloc, "seconds": seconds, "peak_bytes": peak_bytes}
+
+    def merge(self, profile: Dict[str, Any], prefix: str) -> None:
+        """
+        افزودن پروفایل پردازه فرزند (استخر محاسباتی) زیر یک ریشه جداگانه
+        """
+        self._cpu.update({f"{prefix};{stack}": count for stack, count in profile["cpu"].items()})
+        self._alloc.update({f"{prefix};{stack}": size for stack, size in profile["alloc"].items()})
+        self._peak_bytes = max(self._peak_bytes, profile["peak_bytes"])
+
+_current_capture: ContextVar[Optional[Capture]] = ContextVar("profiling_capture", default=None)
+
+def current_capture() -> Optional[Capture]:
+    """
+    پروفایل درخواست جاری، اگر در حال پروفایل شدن باشد
+    """
+    return _current_capture.get()
+
+def call_profiled(interval: float, frames: int, func: Callable, *args) -> Tuple[Any, Dict[str, Any]]:
+    """
+    اجرای تابع در پردازه فرزند با پروفایل جداگانه و برگرداندن آن همراه نتیجه
+    """
+    capture = Capture(interval, frames)
+    capture.start()
+    try:
+        result = func(*args)
+    finally:
+        profile = capture.stop()
+    return result, profile
+
+class Profiler:
+    """
+    کلید پروفایل درخواست‌ها: N درخواست بعدی یا درصدی از درخواست‌ها تا زمان انقضا
+
+    وضعیت کلید در هر پردازه کارگر مستقل است؛ خروجی‌ها در PROFILING_OUTPUT_DIR ذخیره می‌شوند.
+    """
+
+    def __init__(self):
+        # تنها ویژگی‌ای که در مسیر عادی درخواست‌ها خوانده می‌شود
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._remaining: Optional[int] = None
+        self._sample_rate = 1.0
+        self._path_prefix = "/"
+        self._expires_at: Optional[float] = None
+
+    def enable(
+        self,
+        requests: Optional[int] = None,
+        sample_rate: float = 1.0,
+        path_prefix: str = "/",
+        duration_seconds: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        with self._lock:
+            self._remaining = requests
+            self._sample_rate = sample_rate
+            self._path_prefix = path_prefix
+            self._expires_at = time.time() + duration_seconds if duration_seconds else None
+            self.enabled = True
+        logger.warning("پروفایل درخواست‌ها فعال شد: %s", self.status())
+        return self.status()
+
+    def disable(self) -> Dict[str, Any]:
+        with self._lock:
+            self.enabled = False
+            self._remaining = None
+        return self.status()
+
+    def should_profile(self, path: str) -> bool:
+        if not path.startswith(self._path_prefix):
+            return False
+        if self._expires_at is not None and time.time() >= self._expires_at:
+            self.disable()
+            return False
+        if self._sample_rate < 1.0 and random.random() >= self._sample_rate:
+            return False
+        with self._lock:
+            if not self.enabled:
+                return False
+            if self._remaining is not None:
+                self._remaining -= 1
+                if self._remaining <= 0:
+                    self.enabled = False
+        return True
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "remaining_requests": self._remaining,
+            "sample_rate": self._sample_rate,
+            "path_prefix": self._path_prefix,
+            "expires_at": self._expires_at,
+            "pid": os.getpid(),
+        }
+
+    def save(self, capture: Capture, method: str, path: str, status_code: int) -> None:
+        """
+        پایان پروفایل و ذخیره خروجی‌های قابل استفاده در flamegraph.pl یا speedscope
+        """
+        profile = capture.stop()
+        directory = Path(settings.PROFILING_OUTPUT_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        for kind in ("cpu", "alloc"):
+            lines = (f"{stack} {value}\n" for stack, value in profile[kind].most_common())
+            (directory / f"{capture.id}{CAPTURE_KINDS[kind]}").write_text("".join(lines), encoding="utf-8")
+        meta = {
+            "id": capture.id,
+            "method": method,
+            "path": path,
+            "status": status_code,
+            "pid": os.getpid(),
+            "created_at": time.time(),
+            "seconds": profile["seconds"],
+            "cpu_samples": sum(profile["cpu"].values()),
+            "interval_ms": capture.interval * 1000,
+            "retained_bytes": sum(profile["alloc"].values()),
+            "peak_traced_bytes": profile["peak_bytes"],
+        }
+        (directory / f"{capture.id}{CAPTURE_KINDS['meta']}").write_text(json.dumps(meta), encoding="utf-8")
+        self._prune(directory)
+
+    def _prune(self, directory: Path) -> None:
+        # نگه داشتن فقط PROFILING_MAX_CAPTURES پروفایل آخر
+        metas = sorted(directory.glob("*.json"), key=lambda item: item.stat().st_mtime, reverse=True)
+        for meta in metas[settings.PROFILING_MAX_CAPTURES:]:
+            capture_id = meta.name[: -len(".json")]
+            for suffix in CAPTURE_KINDS.values():
+                (directory / f"{capture_id}{suffix}").unlink(missing_ok=True)
+
+    def list_captures(self) -> List[Dict[str, Any]]:
+        directory = Path(settings.PROFILING_OUTPUT_DIR)
+        if not directory.is_dir():
+            return []
+        captures = []
+        for meta in directory.glob("*.json"):
+            try:
+                captures.append(json.loads(meta.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                continue
+        return sorted(captures, key=lambda item: item["created_at"], reverse=True)
+
+    def capture_path(self, capture_id: str, kind: str) -> Optional[Path]:
+        """
+        مسیر فایل یک پروفایل ذخیره شده؛ شناسه‌های نامعتبر پذیرفته نمی‌شوند
+        """
+        if not _CAPTURE_ID.match(capture_id) or kind not in CAPTURE_KINDS:
+            return None
+        path = Path(settings.PROFILING_OUTPUT_DIR) / f"{capture_id}{CAPTURE_KINDS[kind]}"
+        return path if path.is_file() else None
+
+profiler = Profiler()
+
+class ProfilingMiddleware:
+    """
+    میان‌افزار ASGI پروفایل درخواست‌ها؛ وقتی کلید خاموش است فقط یک ویژگی بررسی می‌شود
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not profiler.enabled or scope["type"] != "http" or not profiler.should_profile(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        capture = Capture(settings.PROFILING_INTERVAL_MS / 1000, settings.PROFILING_TRACEMALLOC_FRAMES)
+        status_code = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_code[0] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", capture.id.encode())]
+            await send(message)
+
+        token = _current_capture.set(capture)
+        capture.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_capture.reset(token)
+            # پاسخ ارسال شده است؛ گرفتن snapshot و نوشتن فایل‌ها حلقه رویداد را مسدود نمی‌کند
+            await asyncio.to_thread(profiler.save, capture, scope["method"], scope["path"], status_code[0])
@@ -1,6 +1,10 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union
-from jose import jwt
+from typing import Any, Callable, Dict, Optional, Union
+from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
 
@@ -24,6 +28,18 @@ def create_access_token(data: dict, expires_delta: Union[timedelta, None] = None
     )
     return encoded_jwt
 
+def decode_access_token(token: str) -> Optional[str]:
+    """
+    رمزگشایی توکن JWT و برگرداندن شناسه کاربر (sub)؛ در صورت نامعتبر بودن None
+    """
+    try:
+        payload = jwt.decode(
+            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+        )
+    except JWTError:
+        return None
+    return payload.get("sub")
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     بررسی مطابقت رمز عبور ساده با رمز عبور هش شده
@@ -34,4 +50,94 @@ def get_password_hash(password: str) -> str:
     """
     هش کردن رمز عبور
     """
-    return pwd_context.hash(password) 
\ No newline at end of file
+    return pwd_context.hash(password) 
+
+class PasswordHashingBusy(Exception):
+    """
+    خطای اشباع استخر هش رمز عبور؛ درخواست باید بعداً تکرار شود
+    """
+
+class PasswordHasher:
+    """
+    استخر محدود برای اجرای bcrypt خارج از حلقه رویداد
+
+    bcrypt در حین محاسبه GIL را آزاد می‌کند، بنابراین نخ‌ها به صورت موازی روی چند هسته
+    اجرا می‌شوند. اگر تعداد کارهای در حال اجرا و در صف از ظرفیت بیشتر شود، درخواست
+    بلافاصله با PasswordHashingBusy رد می‌شود تا صف بی‌پایان رشد نکند.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.capacity = max_workers + max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+        self._completed = 0
+        self._total_seconds = 0.0
+        self._max_seconds = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # ایجاد تنبل تا استخر پیش از fork شدن پردازه‌های کارگر ساخته نشود
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    def _timed(self, func: Callable, *args) -> Any:
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._completed += 1
+                self._total_seconds += elapsed
+                self._max_seconds = max(self._max_seconds, elapsed)
+
+    async def run(self, func: Callable, *args) -> Any:
+        """
+        اجرای تابع هش در استخر با اعمال فشار معکوس
+        """
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                raise PasswordHashingBusy()
+            self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), self._timed, func, *args)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        آمار استخر: عمق صف، کارهای در حال اجرا و زمان هش
+        """
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "capacity": self.capacity,
+                "in_flight": self._in_flight,
+                "queue_depth": max(0, self._in_flight - self.max_workers),
+                "rejected": self._rejected,
+                "completed": self._completed,
+                "hash_seconds_total": self._total_seconds,
+                "hash_seconds_avg": self._total_seconds / self._completed if self._completed else 0.0,
+                "hash_seconds_max": self._max_seconds,
+            }
+
+# استخر مشترک هش رمز عبور برای هر پردازه کارگر
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    بررسی رمز عبور در استخر هش بدون مسدود کردن حلقه رویداد
+    """
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    هش کردن رمز عبور در استخر هش بدون مسدود کردن حلقه رویداد
+    """
+    return await password_hasher.run(get_password_hash, password)
@@ -5,6 +5,7 @@ from app.db.session import engine
 from app.models.base import Base
 from app.core.security import get_password_hash
 from app.models.user import User
+from app.models.baseline import CognitiveBaseline  # noqa: F401 - ثبت جدول در metadata
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -15,6 +16,9 @@ def init_db(db: Session) -> None:
     """
     # ایجاد جداول
     Base.metadata.create_all(bind=engine)
+    # ایندکس‌های اضافه شده به جدول‌های موجود (create_all فقط جدول‌های جدید را می‌سازد)
+    for index in User.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
     
     # بررسی وجود کاربر ادمین
     user = db.query(User).filter(User.email == "admin@mindmirror.ai").first()
@@ -0,0 +1,28 @@
+from app.core.config import settings
+
+_client = None
+
+def get_redis():
+    """
+    دریافت کلاینت ناهمگام Redis مشترک (به صورت تنبل ساخته می‌شود)
+    """
+    global _client
+    if _client is None:
+        import redis.asyncio as redis
+
+        _client = redis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=settings.REDIS_DB,
+            password=settings.REDIS_PASSWORD or None,
+        )
+    return _client
+
+async def close_redis() -> None:
+    """
+    بستن اتصال‌های Redis هنگام خاموش شدن برنامه
+    """
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
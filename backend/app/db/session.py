@@ -1,11 +1,54 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 
+# درایورهای ناهمگام متناظر با هر پایگاه داده
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def get_async_database_url(url: str) -> str:
+    """
+    تبدیل آدرس پایگاه داده به آدرس با درایور ناهمگام
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if parsed.get_driver_name() in ("asyncpg", "aiosqlite") or backend not in ASYNC_DRIVERS:
+        return url
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+def get_pool_options(url: str) -> dict:
+    """
+    تنظیمات استخر اتصال از Settings (SQLite از استخر صف‌دار پشتیبانی نمی‌کند)
+    """
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
 # ایجاد موتور SQLAlchemy
 engine = create_engine(settings.DATABASE_URL)
 
 # ایجاد کلاس جلسه پایگاه داده
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine) 
\ No newline at end of file
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# موتور ناهمگام برای مسیرهای API تا پرس‌وجوها حلقه رویداد را مسدود نکنند
+async_engine = create_async_engine(
+    get_async_database_url(settings.DATABASE_URL),
+    **get_pool_options(settings.DATABASE_URL)
+)
+
+# کلاس جلسه ناهمگام؛ اشیا پس از commit منقضی نمی‌شوند تا سریال‌سازی پاسخ به پرس‌وجوی ضمنی نیاز نداشته باشد
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
@@ -1,7 +1,19 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import auth, users, data
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.api.routes import admin, auth, users, data
+from app.core import metrics
+from app.core.profiling import ProfilingMiddleware
 from app.core.config import settings
+from app.core.security import PasswordHashingBusy, password_hasher
+from app.db.redis import close_redis
+from app.db.session import async_engine
+from app.services.cpu_pool import start_cpu_pool, stop_cpu_pool
+from app.services import influx_writer, jobs
+from app.services.influx_writer import start_writer, stop_writer
+from app.services.jobs import start_jobs, stop_jobs
+from app.services.model_registry import model_registry
+from app.services.result_cache import result_cache
 
 # ایجاد نمونه FastAPI
 app = FastAPI(
@@ -19,10 +31,88 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# زمان پاسخ هر مسیر برای /metrics
+app.add_middleware(metrics.MetricsMiddleware)
+
+# پروفایل درخواست‌ها با کلید ادمین؛ در حالت خاموش بدون هزینه
+app.add_middleware(ProfilingMiddleware)
+
 # اضافه کردن روت‌های API
 app.include_router(auth.router, prefix="/api/auth", tags=["احراز هویت"])
 app.include_router(users.router, prefix="/api/users", tags=["کاربران"])
 app.include_router(data.router, prefix="/api/data", tags=["داده‌ها"])
+app.include_router(admin.router, prefix="/api/admin", tags=["مدیریت"])
+
+@app.on_event("startup")
+async def startup():
+    """
+    راه‌اندازی کارهای پس‌زمینه هر پردازه کارگر
+    """
+    start_cpu_pool()
+    await start_writer()
+    await start_jobs()
+    if settings.MODEL_WARMUP:
+        model_registry.warm_up()
+
+@app.on_event("shutdown")
+async def shutdown():
+    """
+    آزادسازی منابع هنگام خاموش شدن سرویس
+    """
+    await stop_jobs()
+    await model_registry.stop()
+    await stop_writer()
+    await close_redis()
+    stop_cpu_pool()
+
+@app.exception_handler(PasswordHashingBusy)
+async def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusy):
+    """
+    پاسخ سریع 503 هنگام اشباع استخر هش رمز عبور
+    """
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "سرویس موقتاً شلوغ است، لطفاً دوباره تلاش کنید"},
+        headers={"Retry-After": "1"},
+    )
+
+@metrics.registry.collector
+def collect_runtime_gauges():
+    """
+    گیج‌های لحظه‌ای این پردازه: استخر اتصال، صف‌ها و کش نتایج
+    """
+    pool = async_engine.pool
+    for name, method in (("size", "size"), ("checked_out", "checkedout"), ("overflow", "overflow")):
+        if hasattr(pool, method):
+            yield "db_pool_connections", "وضعیت استخر اتصال پایگاه داده", {"state": name}, getattr(pool, method)()
+    
+    writer = influx_writer.influx_writer
+    if writer is not None:
+        for key, value in writer.stats().items():
+            yield f"influx_writer_{key}", "وضعیت صف نوشتن InfluxDB", {}, value
+    queue = jobs.job_queue
+    if queue is not None and hasattr(queue, "depth"):
+        yield "job_queue_depth", "کارهای در انتظار صف درون‌فرایندی", {}, queue.depth()
+    
+    hashing = password_hasher.stats()
+    yield "password_hash_in_flight", "درخواست‌های در حال هش رمز عبور", {}, hashing["in_flight"]
+    yield "password_hash_queue_depth", "درخواست‌های منتظر هش رمز عبور", {}, hashing["queue_depth"]
+    
+    cache = result_cache.stats()
+    if cache:
+        yield "result_cache_hit_ratio", "نسبت برخورد کش نتایج پردازش", {}, cache["hit_ratio"]
+        yield "result_cache_bytes", "حجم سطح حافظه کش نتایج", {}, cache["bytes"]
+    for name, stats in model_registry.stats()["batching"].items():
+        yield "model_batch_mean_requests", "میانگین درخواست‌های هر فراخوانی مدل", {"model": name}, stats["mean_batch_requests"]
+
+@app.get("/metrics", tags=["سلامت"], include_in_schema=False)
+async def read_metrics():
+    """
+    معیارهای این پردازه در قالب متنی Prometheus
+    """
+    if not settings.METRICS_ENABLED:
+        return PlainTextResponse("", status_code=status.HTTP_404_NOT_FOUND)
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/", tags=["سلامت"])
 async def root():
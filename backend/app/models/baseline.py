@@ -0,0 +1,18 @@
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Integer
+from sqlalchemy.sql import func
+from app.models.base import Base
+
+class CognitiveBaseline(Base):
+    """
+    آمار تجمعی شش شاخص شناختی هر کاربر (میانگین و واریانس Welford و میانگین نمایی)
+
+    هر فیلد آرایه‌ای شش‌تایی به ترتیب COGNITIVE_FIELDS است.
+    """
+    __tablename__ = "cognitive_baselines"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    mean = Column(JSON, nullable=False)
+    m2 = Column(JSON, nullable=False)
+    ewma = Column(JSON, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.sql import func
 from app.models.base import Base
 
@@ -16,5 +17,15 @@ class User(Base):
     is_admin = Column(Boolean, default=False)
     age = Column(Integer, nullable=True)
     gender = Column(String, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now()) 
\ No newline at end of file
+    # در SQLite قالب ذخیره با CURRENT_TIMESTAMP یکسان است تا مقایسه cursor درست باشد
+    created_at = Column(
+        DateTime(timezone=True).with_variant(
+            sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+            "sqlite"
+        ),
+        server_default=func.now()
+    )
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # ترتیب صفحه‌بندی cursor؛ هر صفحه یک جستجوی بازه‌ای روی این ایندکس است
+    __table_args__ = (Index("ix_users_created_at_id", "created_at", "id"),) 
\ No newline at end of file
@@ -1,5 +1,8 @@
-from typing import List, Dict, Any, Optional
-from pydantic import BaseModel
+from typing import List, Dict, Any, Literal, Optional
+from pydantic import BaseModel, Field, model_validator
+
+# واحد مقادیر EEG؛ بدون واحد اعلام شده، آستانه‌های دامنه (میکروولت) اعمال نمی‌شوند
+EEGUnit = Literal["uV", "mV", "V"]
 
 class EEGData(BaseModel):
     """
@@ -8,9 +11,41 @@ class EEGData(BaseModel):
     channels: List[str]
     timestamps: List[float]
     values: List[List[float]]
-    sampling_rate: float
+    sampling_rate: float = Field(..., gt=0)
+    unit: Optional[EEGUnit] = Field(None, description="واحد مقادیر: uV، mV یا V")
     device_info: Optional[Dict[str, Any]] = None
 
+    @model_validator(mode="after")
+    def check_shape(self):
+        # هر ردیف values یک کانال است و همه کانال‌ها تعداد نمونه یکسان دارند
+        if len(self.values) != len(self.channels):
+            raise ValueError("تعداد ردیف‌های values با تعداد کانال‌ها برابر نیست")
+        if len({len(row) for row in self.values}) > 1:
+            raise ValueError("تعداد نمونه‌های همه کانال‌ها باید برابر باشد")
+        return self
+
+class EEGBinaryHeader(BaseModel):
+    """
+    طرح‌واره سرآیند داده‌های باینری EEG (ارسال شده در هدرهای X-EEG-*)
+    """
+    channels: List[str]
+    sampling_rate: float
+    start_time: Optional[float] = None
+    dtype: str = "float32"
+    scale: float = 1.0
+    unit: Optional[EEGUnit] = None
+
+class EEGStreamConfig(EEGBinaryHeader):
+    """
+    طرح‌واره پیام پیکربندی جریان EEG (اولین پیام WebSocket)
+
+    حدود مقادیر اندازه بافر حلقوی هر اتصال را محدود می‌کنند.
+    """
+    channels: List[str] = Field(..., min_length=1, max_length=256)
+    sampling_rate: float = Field(..., gt=0, le=10_000)
+    window_seconds: float = Field(2.0, gt=0, le=60)
+    step_seconds: float = Field(0.5, gt=0, le=60)
+
 class AudioData(BaseModel):
     """
     طرح‌واره داده‌های صوتی
@@ -20,6 +55,15 @@ class AudioData(BaseModel):
     duration: float
     sampling_rate: float
 
+class CognitiveBaselineData(BaseModel):
+    """
+    طرح‌واره خط پایه تجمعی شاخص‌های شناختی کاربر
+    """
+    count: int
+    mean: List[float]
+    std: List[float] = []
+    ewma: List[float]
+
 class CognitiveData(BaseModel):
     """
     طرح‌واره داده‌های شناختی
@@ -27,6 +71,8 @@ class CognitiveData(BaseModel):
     current: List[float]
     average: List[float]
     trend: Optional[List[List[float]]] = None
+    timestamps: List[float] = []
+    baseline: Optional[CognitiveBaselineData] = None
 
 class EmotionData(BaseModel):
     """
@@ -36,6 +82,7 @@ class EmotionData(BaseModel):
     positive: List[float]
     negative: List[float]
     neutral: List[float]
+    timestamps: List[float] = []
 
 class BrainwaveData(BaseModel):
     """
@@ -45,4 +92,5 @@ class BrainwaveData(BaseModel):
     beta: List[float]
     delta: List[float]
     theta: List[float]
-    gamma: List[float]
\ No newline at end of file
+    gamma: List[float]
+    timestamps: List[float] = []
@@ -0,0 +1,18 @@
+from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+
+class ProfilingSwitch(BaseModel):
+    """
+    طرح‌واره فعال‌سازی پروفایل درخواست‌ها
+    """
+    requests: Optional[int] = Field(None, ge=1, description="تعداد درخواست‌های بعدی که پروفایل می‌شوند")
+    sample_rate: float = Field(1.0, gt=0, le=1, description="نسبت درخواست‌های پروفایل شده")
+    path_prefix: str = Field("/api/data/eeg", description="فقط مسیرهایی که با این پیشوند شروع می‌شوند")
+    duration_seconds: Optional[float] = Field(None, gt=0, le=24 * 3600, description="غیرفعال شدن خودکار پس از این مدت")
+
+    @model_validator(mode="after")
+    def require_limit(self):
+        # کلید نباید بدون محدودیت روشن بماند
+        if self.requests is None and self.duration_seconds is None:
+            self.duration_seconds = 300.0
+        return self
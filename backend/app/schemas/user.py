@@ -46,4 +46,12 @@ class User(UserBase):
     is_active: bool
     
     class Config:
-        orm_mode = True 
\ No newline at end of file
+        orm_mode = True 
+
+class Principal(UserBase):
+    """
+    طرح‌واره هویت کاربر احراز شده که در کش نگهداری می‌شود (بدون رمز عبور)
+    """
+    id: int
+    is_active: bool
+    is_admin: bool
@@ -1,58 +1,168 @@
-import numpy as np
 import io
+from typing import BinaryIO, Dict, List, Union
+
+import numpy as np
 from sqlalchemy.orm import Session
 
-def process_audio_data(db: Session, user_id: int, audio_data: bytes):
+from app.core.config import settings
+from app.core.metrics import timed
+from app.services.model_registry import model_registry
+
+# طول هر بخش تحلیل احساسات و پارامترهای قاب‌بندی
+SEGMENT_SECONDS = 5.0
+FRAME_LENGTH = 2048
+HOP_LENGTH = 512
+N_MFCC = 13
+
+# محدوده جستجوی فرکانس پایه صدای انسان (هرتز)
+PITCH_FMIN = 65.0
+PITCH_FMAX = 400.0
+
+# ترتیب ستون‌های خروجی مدل احساسات
+EMOTION_LABELS = ("positive", "negative", "neutral")
+
+class AudioDecodeError(ValueError):
+    """
+    خطای خواندن یا رمزگشایی فایل صوتی
+    """
+
+def process_audio_data(db: Session, user_id: int, audio_data: Union[bytes, BinaryIO]):
     """
     پردازش داده‌های صوتی برای تحلیل احساسات
-    
-    این پیاده‌سازی یک نمونه ساده است. در نسخه واقعی، از کتابخانه librosa برای استخراج ویژگی‌ها
-    و از مدل‌های هوش مصنوعی مانند Transformers برای تحلیل احساسات استفاده می‌کنیم.
-    """
-    # در نسخه واقعی، داده‌های صوتی را پردازش می‌کنیم
-    # اینجا برای نمونه، مقادیر شبیه‌سازی شده تولید می‌کنیم
-    
-    # شبیه‌سازی تحلیل احساسات در طول زمان
-    time_points = 7  # تعداد نقاط زمانی
-    
-    # ایجاد برچسب‌های زمانی فارسی
-    labels = ["۸:۰۰", "۱۰:۰۰", "۱۲:۰۰", "۱۴:۰۰", "۱۶:۰۰", "۱۸:۰۰", "۲۰:۰۰"]
-    
-    # شبیه‌سازی مقادیر احساسی
-    positive = simulate_emotion_values(time_points, base=75, trend='increase')
-    negative = simulate_emotion_values(time_points, base=25, trend='decrease')
-    neutral = simulate_emotion_values(time_points, base=50, trend='stable')
-    
-    # ذخیره‌سازی داده‌ها در پایگاه داده (در نسخه واقعی)
-    # در اینجا فقط نتایج را برمی‌گردانیم
-    
+
+    فایل به صورت بلوک‌های ثابت (هر بلوک یک بخش SEGMENT_SECONDS ثانیه‌ای) از روی فایل
+    موقت آپلود خوانده می‌شود، بنابراین مصرف حافظه برای ضبط‌های یک ساعته هم ثابت می‌ماند.
+    برای هر بخش انرژی، MFCC و گام صدا با librosa استخراج و به امتیاز احساسی تبدیل می‌شود.
+    """
+    source = io.BytesIO(audio_data) if isinstance(audio_data, (bytes, bytearray)) else audio_data
+    features = extract_segment_features(source)
+    return build_audio_result(features, model_registry.predict("emotion", features["table"]))
+
+def build_audio_result(features: Dict[str, np.ndarray], scores: np.ndarray):
+    """
+    ساخت پاسخ تحلیل صوت از ویژگی‌های بخش‌ها و امتیازهای مدل (بخش، EMOTION_LABELS)
+    """
+    # برچسب زمانی شروع هر بخش به صورت دقیقه:ثانیه
+    segment_times = features["start"]
+    labels = [f"{int(round(t)) // 60:02d}:{int(round(t)) % 60:02d}" for t in segment_times]
+    emotion_data = {"labels": labels}
+    for i, label in enumerate(EMOTION_LABELS):
+        emotion_data[label] = scores[:, i].round(1).tolist()
+
     return {
-        "emotion_data": {
-            "labels": labels,
-            "positive": positive,
-            "negative": negative,
-            "neutral": neutral
-        }
+        "duration": features["duration"],
+        "segment_times": segment_times.tolist(),
+        "emotion_data": emotion_data
     }
 
-def simulate_emotion_values(n_points, base=50, trend='stable'):
-    """
-    شبیه‌سازی مقادیر احساسی با روند مشخص
-    
-    trend: 'increase', 'decrease', 'stable'
-    """
-    if trend == 'increase':
-        base_values = np.linspace(base, base+15, n_points)
-    elif trend == 'decrease':
-        base_values = np.linspace(base, base-15, n_points)
-    else:  # stable
-        base_values = np.ones(n_points) * base
-    
-    # اضافه کردن نویز تصادفی
-    noise = np.random.normal(0, 5, n_points)
-    values = base_values + noise
-    
-    # محدود کردن مقادیر به بازه 0 تا 100
-    values = np.clip(values, 0, 100)
-    
-    return values.astype(int).tolist() 
\ No newline at end of file
+@timed("audio.features")
+def extract_segment_features(source: BinaryIO, segment_seconds: float = SEGMENT_SECONDS) -> Dict[str, np.ndarray]:
+    """
+    استخراج ویژگی‌های هر بخش (انرژی، گام، MFCC) با خواندن جریانی فایل
+    """
+    import librosa
+    import soundfile
+
+    try:
+        info = soundfile.info(source)
+        source.seek(0)
+        sampling_rate = info.samplerate
+        frames_per_segment = max(1, int(segment_seconds * sampling_rate / HOP_LENGTH))
+        blocks = librosa.stream(
+            source,
+            block_length=frames_per_segment,
+            frame_length=FRAME_LENGTH,
+            hop_length=HOP_LENGTH,
+            mono=True,
+            fill_value=0.0,
+        )
+        rows: List[np.ndarray] = [_block_features(block, sampling_rate) for block in blocks]
+    except AudioDecodeError:
+        raise
+    except Exception as e:
+        raise AudioDecodeError(f"فایل صوتی قابل خواندن نیست: {e}")
+    if not rows:
+        raise AudioDecodeError("فایل صوتی خالی است")
+
+    table = np.vstack(rows)
+    segment_length = frames_per_segment * HOP_LENGTH / sampling_rate
+    return {
+        "start": np.arange(len(rows)) * segment_length,
+        "table": table,
+        "duration": info.frames / sampling_rate,
+        "energy_db": table[:, 0],
+        "pitch_median": table[:, 1],
+        "pitch_std": table[:, 2],
+        "voiced_ratio": table[:, 3],
+        "mfcc": table[:, 4:],
+    }
+
+def _block_features(block: np.ndarray, sampling_rate: int) -> np.ndarray:
+    """
+    ویژگی‌های یک بلوک: [انرژی dB، میانه گام، انحراف گام، نسبت قاب‌های واکدار، MFCC...]
+    """
+    import librosa
+
+    if len(block) < FRAME_LENGTH:
+        block = np.pad(block, (0, FRAME_LENGTH - len(block)))
+    rms = librosa.feature.rms(y=block, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH, center=False)[0]
+    energy_db = float(librosa.amplitude_to_db(np.array([rms.mean()]), ref=1.0)[0])
+
+    mfcc = librosa.feature.mfcc(
+        y=block, sr=sampling_rate, n_mfcc=N_MFCC, n_fft=FRAME_LENGTH, hop_length=HOP_LENGTH, center=False
+    ).mean(axis=1)
+
+    # گام فقط روی قاب‌هایی که انرژی کافی دارند محاسبه می‌شود
+    f0 = librosa.yin(
+        block, fmin=PITCH_FMIN, fmax=PITCH_FMAX, sr=sampling_rate,
+        frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH, center=False
+    )
+    n = min(len(f0), len(rms))
+    voiced = f0[:n][rms[:n] > 0.5 * np.median(rms)] if n else f0[:0]
+    pitch_median = float(np.median(voiced)) if len(voiced) else 0.0
+    pitch_std = float(np.std(voiced)) if len(voiced) else 0.0
+    voiced_ratio = len(voiced) / n if n else 0.0
+
+    return np.concatenate(([energy_db, pitch_median, pitch_std, voiced_ratio], mfcc))
+
+def score_emotions(table: np.ndarray) -> np.ndarray:
+    """
+    مدل پیش‌فرض: تبدیل ویژگی‌های آوایی هر بخش به امتیاز مثبت، منفی و خنثی (مجموع 100)
+
+    table سطرهای خروجی _block_features است. برانگیختگی از انرژی و تغییرات گام و ظرفیت
+    هیجانی از ارتفاع و پویایی گام تخمین زده می‌شود؛ امتیازها با softmax روی سه دسته به
+    دست می‌آیند.
+    """
+    energy_db, pitch_median, pitch_std, voiced_ratio = table[:, :4].T
+    energy = (energy_db + 30.0) / 10.0
+    pitch = np.where(pitch_median > 0, (pitch_median - 165.0) / 50.0, 0.0)
+    variation = (pitch_std - 20.0) / 20.0
+
+    arousal = 1.0 / (1.0 + np.exp(-(energy + 0.5 * variation)))
+    valence = np.tanh(0.6 * pitch + 0.4 * variation) * voiced_ratio
+
+    logits = np.column_stack((
+        2.0 * arousal * valence,       # مثبت
+        -2.0 * arousal * valence,      # منفی
+        1.0 - arousal,                 # خنثی
+    ))
+    weights = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return 100.0 * weights / weights.sum(axis=1, keepdims=True)
+
+def load_emotion_model():
+    """
+    بارگذاری مدل احساسات scikit-learn از EMOTION_MODEL_PATH یا مدل پیش‌فرض
+
+    آرایه‌های مدل با mmap_mode خوانده می‌شوند تا کارگرهای مختلف از یک نسخه در
+    حافظه صفحه‌ای سیستم عامل استفاده کنند.
+    """
+    if not settings.EMOTION_MODEL_PATH:
+        return score_emotions
+    import joblib
+
+    model = joblib.load(settings.EMOTION_MODEL_PATH, mmap_mode="r")
+    classes = [str(label) for label in model.classes_]
+    order = [classes.index(label) for label in EMOTION_LABELS]
+    return lambda table: 100.0 * model.predict_proba(table)[:, order]
+
+model_registry.register("emotion", load_emotion_model)
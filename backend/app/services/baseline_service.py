@@ -0,0 +1,86 @@
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.baseline import CognitiveBaseline
+
+# خط پایه پیش‌فرض تا پیش از اولین آپلود کاربر
+DEFAULT_AVERAGE = [60, 65, 40, 70, 65, 55]
+
+def welford_update(
+    count: int, mean: Sequence[float], m2: Sequence[float], values: Sequence[float]
+) -> Tuple[int, List[float], List[float]]:
+    """
+    به‌روزرسانی میانگین و مجموع مربعات انحراف با یک مشاهده جدید (الگوریتم Welford)
+    """
+    count += 1
+    new_mean, new_m2 = [], []
+    for mu, m, x in zip(mean, m2, values):
+        delta = x - mu
+        mu += delta / count
+        new_mean.append(mu)
+        new_m2.append(m + delta * (x - mu))
+    return count, new_mean, new_m2
+
+def ewma_update(ewma: Sequence[float], values: Sequence[float], alpha: float) -> List[float]:
+    """
+    به‌روزرسانی میانگین متحرک نمایی؛ وزن مشاهده جدید alpha است
+    """
+    return [previous + alpha * (x - previous) for previous, x in zip(ewma, values)]
+
+async def get_baseline(db: AsyncSession, user_id: int) -> Optional[CognitiveBaseline]:
+    """
+    دریافت خط پایه شناختی کاربر
+    """
+    result = await db.execute(select(CognitiveBaseline).where(CognitiveBaseline.user_id == user_id))
+    return result.scalars().first()
+
+async def update_baseline(db: AsyncSession, user_id: int, current: Sequence[float]) -> CognitiveBaseline:
+    """
+    افزودن شاخص‌های یک آپلود به خط پایه کاربر با هزینه ثابت
+
+    ردیف کاربر با قفل سطری خوانده می‌شود تا آپلودهای همزمان به‌روزرسانی یکدیگر را
+    بازنویسی نکنند؛ اولین آپلود ردیف را ایجاد می‌کند.
+    """
+    values = [float(x) for x in current]
+    for attempt in range(2):
+        # populate_existing: ردیفی که پیش‌تر در همین جلسه خوانده شده با مقادیر قفل شده فعلی بازنویسی می‌شود
+        result = await db.execute(
+            select(CognitiveBaseline)
+            .where(CognitiveBaseline.user_id == user_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        baseline = result.scalars().first()
+        if baseline is None:
+            baseline = CognitiveBaseline(
+                user_id=user_id, count=1, mean=values, m2=[0.0] * len(values), ewma=values
+            )
+            db.add(baseline)
+        else:
+            baseline.count, baseline.mean, baseline.m2 = welford_update(
+                baseline.count, baseline.mean, baseline.m2, values
+            )
+            baseline.ewma = ewma_update(baseline.ewma, values, settings.BASELINE_EWMA_ALPHA)
+        try:
+            await db.commit()
+        except IntegrityError:
+            # آپلود همزمان دیگری ردیف را زودتر ایجاد کرده است
+            await db.rollback()
+            if attempt:
+                raise
+            continue
+        return baseline
+
+def baseline_summary(baseline: Optional[CognitiveBaseline]) -> Dict[str, object]:
+    """
+    خلاصه قابل نمایش خط پایه: تعداد، میانگین، انحراف معیار و میانگین نمایی
+    """
+    if baseline is None or not baseline.count:
+        return {"count": 0, "mean": list(DEFAULT_AVERAGE), "std": [], "ewma": list(DEFAULT_AVERAGE)}
+    std = [math.sqrt(m / (baseline.count - 1)) if baseline.count > 1 else 0.0 for m in baseline.m2]
+    return {"count": baseline.count, "mean": baseline.mean, "std": std, "ewma": baseline.ewma}
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+from app.core.metrics import call_capturing_stages, record_stages
+from app.core.profiling import call_profiled, current_capture
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+def pool_size() -> int:
+    """
+    تعداد پردازه‌های محاسباتی این کارگر وب
+
+    به صورت پیش‌فرض هسته‌ها بین کارگرهای وب (WEB_CONCURRENCY) تقسیم می‌شوند تا
+    مجموع پردازه‌های محاسباتی از تعداد هسته‌ها بیشتر نشود. صفر یعنی اجرا در استخر نخ.
+    """
+    if settings.CPU_POOL_PROCESSES is not None:
+        return max(0, settings.CPU_POOL_PROCESSES)
+    web_workers = max(1, int(os.environ.get("WEB_CONCURRENCY", "1")))
+    return max(1, (os.cpu_count() or 1) // web_workers)
+
+def _warm_up() -> None:
+    # بارگذاری ماژول‌های پردازش در پردازه فرزند پیش از اولین درخواست
+    import app.services.eeg_service  # noqa: F401
+    import app.services.audio_service  # noqa: F401
+
+def get_cpu_pool() -> Optional[Executor]:
+    """
+    استخر پردازه مشترک کارهای محاسباتی (به صورت تنبل ساخته می‌شود)
+
+    فرزندها با forkserver ساخته می‌شوند تا از پردازه چندنخی کارگر وب fork نشوند.
+    """
+    global _executor
+    size = pool_size()
+    if size == 0:
+        return None
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=size, mp_context=multiprocessing.get_context("forkserver"))
+        logger.info("استخر محاسباتی با %s پردازه ساخته شد", size)
+    return _executor
+
+async def run_cpu_bound(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    اجرای تابع محاسباتی سطح ماژول در استخر پردازه بدون مسدود کردن حلقه رویداد
+    """
+    executor = get_cpu_pool()
+    loop = asyncio.get_running_loop()
+    if executor is None:
+        return await loop.run_in_executor(None, func, *args)
+    capture = current_capture()
+    try:
+        # زمان مراحل ثبت شده در پردازه فرزند همراه نتیجه برگردانده و اینجا ثبت می‌شود
+        if capture is None:
+            result, stages = await loop.run_in_executor(executor, call_capturing_stages, func, *args)
+        else:
+            # درخواست در حال پروفایل شدن است؛ پردازه فرزند پروفایل خود را برمی‌گرداند
+            (result, profile), stages = await loop.run_in_executor(
+                executor, call_capturing_stages, call_profiled, capture.interval, capture.frames, func, *args
+            )
+            capture.merge(profile, "cpu_pool")
+    except BrokenProcessPool:
+        # پردازه فرزندی از بین رفته (مثلاً کمبود حافظه)؛ استخر برای درخواست‌های بعدی از نو ساخته می‌شود
+        logger.error("استخر محاسباتی از کار افتاد و دوباره ساخته می‌شود")
+        _discard(executor)
+        raise
+    record_stages(stages)
+    return result
+
+def _discard(executor: Optional[Executor]) -> None:
+    global _executor
+    if executor is not None and executor is _executor:
+        _executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def start_cpu_pool() -> None:
+    """
+    ساخت استخر و گرم کردن پردازه‌ها در پس‌زمینه هنگام راه‌اندازی
+    """
+    executor = get_cpu_pool()
+    if executor is not None:
+        for _ in range(pool_size()):
+            executor.submit(_warm_up)
+
+def stop_cpu_pool() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
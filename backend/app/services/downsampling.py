@@ -0,0 +1,100 @@
+from typing import Tuple
+
+import numpy as np
+
+# روش‌های کاهش نمونه پشتیبانی شده
+METHODS = ("mean", "minmax", "lttb")
+
+
+def _bucket_starts(timestamps: np.ndarray, start: float, resolution: float):
+    """
+    اندیس سطل هر نقطه و محل شروع هر سطل غیرخالی در آرایه مرتب شده
+    """
+    buckets = np.floor((timestamps - start) / resolution).astype(np.int64)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+    return buckets, starts
+
+
+def bucket_mean(
+    timestamps: np.ndarray, values: np.ndarray, start: float, resolution: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    میانگین هر سطل زمانی؛ values با ابعاد (فیلد، نقطه) است
+    """
+    buckets, starts = _bucket_starts(timestamps, start, resolution)
+    counts = np.diff(np.append(starts, len(timestamps)))
+    sums = np.add.reduceat(values, starts, axis=1)
+    return start + buckets[starts] * resolution, sums / counts
+
+
+def bucket_min_max(
+    timestamps: np.ndarray, values: np.ndarray, start: float, resolution: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    پوش کمینه و بیشینه هر سطل؛ برای هر سطل دو نقطه (ابتدا و میانه سطل) برمی‌گرداند
+    """
+    buckets, starts = _bucket_starts(timestamps, start, resolution)
+    bucket_times = start + buckets[starts] * resolution
+    mins = np.minimum.reduceat(values, starts, axis=1)
+    maxs = np.maximum.reduceat(values, starts, axis=1)
+    times = np.column_stack((bucket_times, bucket_times + resolution / 2)).ravel()
+    out = np.stack((mins, maxs), axis=-1).reshape(values.shape[0], -1)
+    return times, out
+
+
+def lttb_indices(timestamps: np.ndarray, series: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    انتخاب اندیس نقاط با الگوریتم Largest-Triangle-Three-Buckets
+
+    حلقه فقط روی سطل‌های خروجی است و محاسبه مساحت مثلث‌ها داخل هر سطل برداری انجام می‌شود.
+    """
+    n = len(timestamps)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    # مرز سطل‌های میانی؛ اولین و آخرین نقطه همیشه حفظ می‌شوند
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(np.int64) + 1
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_t = timestamps[next_lo:next_hi].mean()
+        avg_v = series[next_lo:next_hi].mean()
+        t, v = timestamps[lo:hi], series[lo:hi]
+        area = np.abs(
+            (timestamps[previous] - avg_t) * (v - series[previous])
+            - (timestamps[previous] - t) * (avg_v - series[previous])
+        )
+        previous = lo + int(np.argmax(area))
+        selected[i + 1] = previous
+    return selected
+
+
+def downsample(
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    start: float,
+    end: float,
+    resolution: float,
+    method: str = "mean",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    کاهش نمونه سری چندفیلدی (فیلد، نقطه) به حدود (end - start) / resolution نقطه
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+    if len(timestamps) == 0:
+        return timestamps, values.reshape(values.shape[0], 0)
+    if np.any(np.diff(timestamps) < 0):
+        order = np.argsort(timestamps, kind="stable")
+        timestamps, values = timestamps[order], values[:, order]
+
+    if method == "minmax":
+        return bucket_min_max(timestamps, values, start, resolution)
+    if method == "lttb":
+        n_out = max(3, int(np.ceil((end - start) / resolution)))
+        # انتخاب نقاط بر اساس مجموع فیلدها تا تمام باندها یک محور زمانی مشترک داشته باشند
+        indices = lttb_indices(timestamps, values.sum(axis=0), n_out)
+        return timestamps[indices], values[:, indices]
+    return bucket_mean(timestamps, values, start, resolution)
@@ -0,0 +1,227 @@
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# نوع ثابت نمونه‌ها در فایل‌های قطعه؛ نمونه‌ها به صورت درهم (نمونه × کانال) ذخیره می‌شوند
+ARCHIVE_DTYPE = np.dtype("<f4")
+
+INDEX_FILE = "index.jsonl"
+SEGMENT_SUFFIX = ".f32"
+
+class ArchiveRecord(NamedTuple):
+    """
+    یک آپلود ذخیره شده: محل آن در فایل قطعه و بازه زمانی و کانال‌های آن
+    """
+    segment: str
+    offset: int  # بایت شروع در فایل قطعه
+    samples: int
+    channels: Tuple[str, ...]
+    sampling_rate: float
+    start_time: float  # ثانیه یونیکس
+    calibrated: bool = False  # نمونه‌ها بر حسب میکروولت هستند (واحد در آپلود اعلام شده)
+
+    @property
+    def end_time(self) -> float:
+        return self.start_time + self.samples / self.sampling_rate
+
+    def sample_range(self, start: Optional[float], end: Optional[float]) -> Tuple[int, int]:
+        """
+        بازه نمونه‌های این رکورد که در [start, end) قرار می‌گیرند
+        """
+        first = 0 if start is None else int(np.ceil((start - self.start_time) * self.sampling_rate))
+        last = self.samples if end is None else int(np.ceil((end - self.start_time) * self.sampling_rate))
+        return max(0, first), min(self.samples, last)
+
+class EEGArchive:
+    """
+    بایگانی خام جلسات EEG هر کاربر روی دیسک
+
+    هر کاربر یک پوشه با فایل‌های قطعه فقط-افزودنی و یک فهرست jsonl دارد. آپلودهای با
+    کانال‌ها و نرخ یکسان پشت سر هم در یک قطعه نوشته می‌شوند تا قطعه به سقف حجم برسد.
+    خواندن با np.memmap انجام می‌شود؛ برش یک بازه زمانی فقط صفحه‌های همان بازه را می‌خواند.
+    """
+
+    def __init__(self, root: str, segment_max_bytes: int):
+        self.root = Path(root)
+        self.segment_max_bytes = segment_max_bytes
+        self._index_cache: Dict[int, Tuple[int, List[ArchiveRecord]]] = {}
+        self._lock = threading.Lock()
+
+    def _user_dir(self, user_id: int) -> Path:
+        return self.root / str(int(user_id))
+
+    @contextmanager
+    def _exclusive(self, directory: Path):
+        # قفل فایل بین پردازه‌های کارگر که همزمان برای یک کاربر می‌نویسند
+        with open(directory / ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def append(
+        self, user_id: int, signal: np.ndarray, channels: Sequence[str], sampling_rate: float, start_time: float,
+        calibrated: bool = False
+    ) -> ArchiveRecord:
+        """
+        افزودن یک آپلود با ابعاد (کانال، نمونه) به انتهای قطعه جاری کاربر
+        """
+        signal = np.atleast_2d(signal)
+        if signal.shape[0] != len(channels):
+            raise ValueError("تعداد کانال‌ها با ابعاد داده EEG سازگار نیست")
+        # (کانال، نمونه) -> نمونه‌های درهم؛ برای بدنه‌های باینری float32 بدون کپی
+        frames = np.ascontiguousarray(signal.T, dtype=ARCHIVE_DTYPE)
+        directory = self._user_dir(user_id)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        with self._exclusive(directory):
+            records = self.records(user_id)
+            segment = self._writable_segment(directory, records, tuple(channels), float(sampling_rate), frames.nbytes)
+            with open(directory / segment, "ab") as f:
+                offset = f.tell()
+                f.write(frames.data)
+                f.flush()
+                os.fsync(f.fileno())
+            record = ArchiveRecord(
+                segment, offset, frames.shape[0], tuple(channels), float(sampling_rate), float(start_time),
+                bool(calibrated)
+            )
+            # فهرست پس از داده نوشته می‌شود؛ قطع شدن بین این دو فقط بایت‌های بدون ارجاع باقی می‌گذارد
+            with open(directory / INDEX_FILE, "a+b") as f:
+                self._drop_torn_line(f)
+                f.write((json.dumps(record._asdict(), ensure_ascii=False) + "\n").encode("utf-8"))
+        return record
+
+    @staticmethod
+    def _drop_torn_line(f) -> None:
+        """
+        حذف سطر ناقص انتهای فهرست (نوشتن قطع شده) تا رکورد بعدی به آن نچسبد
+        """
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        start = max(0, size - 64 * 1024)
+        f.seek(start)
+        tail = f.read()
+        if tail.endswith(b"\n"):
+            return
+        keep = start + tail.rfind(b"\n") + 1
+        logger.warning("سطر ناقص انتهای %s حذف شد", f.name)
+        f.truncate(keep)
+
+    def _writable_segment(
+        self, directory: Path, records: List[ArchiveRecord], channels: Tuple[str, ...], sampling_rate: float, size: int
+    ) -> str:
+        for record in reversed(records):
+            if record.channels == channels and record.sampling_rate == sampling_rate:
+                path = directory / record.segment
+                if path.stat().st_size + size <= self.segment_max_bytes:
+                    return record.segment
+                break
+        existing = sorted(directory.glob(f"*{SEGMENT_SUFFIX}"))
+        number = int(existing[-1].stem) + 1 if existing else 1
+        return f"{number:06d}{SEGMENT_SUFFIX}"
+
+    def records(self, user_id: int, start: Optional[float] = None, end: Optional[float] = None) -> List[ArchiveRecord]:
+        """
+        رکوردهای کاربر به ترتیب نوشتن، به صورت اختیاری فقط آن‌هایی که با بازه [start, end) هم‌پوشانی دارند
+        """
+        path = self._user_dir(user_id) / INDEX_FILE
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            return []
+        with self._lock:
+            cached = self._index_cache.get(user_id)
+        if cached is None or cached[0] != size:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                # سطر ناقص انتهایی (نوشتن همزمان) و سطرهای خراب نادیده گرفته می‌شوند
+                records = [record for record in map(self._parse, f) if record is not None]
+            with self._lock:
+                self._index_cache[user_id] = (size, records)
+        else:
+            records = cached[1]
+        return [
+            record for record in records
+            if (start is None or record.end_time > start) and (end is None or record.start_time < end)
+        ]
+
+    @staticmethod
+    def _parse(line: str) -> Optional[ArchiveRecord]:
+        if not line.endswith("\n"):
+            return None
+        try:
+            data = json.loads(line)
+            data["channels"] = tuple(data["channels"])
+            return ArchiveRecord(**data)
+        except (ValueError, TypeError, KeyError):
+            logger.warning("سطر نامعتبر در فهرست بایگانی نادیده گرفته شد: %.80s", line)
+            return None
+
+    def read(
+        self, user_id: int, record: ArchiveRecord, start: Optional[float] = None, end: Optional[float] = None
+    ) -> Tuple[np.ndarray, float]:
+        """
+        برش یک رکورد با ابعاد (کانال، نمونه) بدون کپی (نمای np.memmap) و زمان اولین نمونه آن
+        """
+        first, last = record.sample_range(start, end)
+        n_channels = len(record.channels)
+        if last <= first:
+            return np.empty((n_channels, 0), dtype=ARCHIVE_DTYPE), record.start_time
+        frames = np.memmap(
+            self._user_dir(user_id) / record.segment,
+            dtype=ARCHIVE_DTYPE,
+            mode="r",
+            offset=record.offset + first * n_channels * ARCHIVE_DTYPE.itemsize,
+            shape=(last - first, n_channels),
+        )
+        return frames.T, record.start_time + first / record.sampling_rate
+
+    def read_range(
+        self, user_id: int, start: Optional[float] = None, end: Optional[float] = None
+    ) -> Iterator[Tuple[ArchiveRecord, np.ndarray, float]]:
+        """
+        تمام برش‌های بازه [start, end) به صورت (رکورد، داده، زمان شروع)
+        """
+        for record in self.records(user_id, start, end):
+            data, first_time = self.read(user_id, record, start, end)
+            if data.shape[1]:
+                yield record, data, first_time
+
+    def users(self) -> List[int]:
+        """
+        شناسه کاربرانی که داده بایگانی شده دارند
+        """
+        if not self.root.is_dir():
+            return []
+        return sorted(int(path.name) for path in self.root.iterdir() if path.name.isdigit())
+
+eeg_archive = EEGArchive(settings.EEG_ARCHIVE_DIR, settings.EEG_ARCHIVE_SEGMENT_MAX_BYTES)
+
+async def archive_eeg(
+    user_id: int, signal: np.ndarray, channels: Sequence[str], sampling_rate: float, start_time: float,
+    calibrated: bool = False
+) -> Optional[ArchiveRecord]:
+    """
+    ذخیره آپلود خام در بایگانی خارج از حلقه رویداد؛ خطای بایگانی مانع پردازش آپلود نمی‌شود
+    """
+    if not settings.EEG_ARCHIVE_ENABLED:
+        return None
+    try:
+        return await asyncio.to_thread(eeg_archive.append, user_id, signal, channels, sampling_rate, start_time, calibrated)
+    except (OSError, ValueError):
+        logger.exception("ذخیره داده خام EEG کاربر %s در بایگانی ناموفق بود", user_id)
+        return None
@@ -0,0 +1,126 @@
+import io
+from typing import Mapping, Optional, Tuple
+
+import numpy as np
+from pydantic import ValidationError
+
+from app.schemas.data import EEGBinaryHeader
+
+# انواع محتوای باینری پشتیبانی شده برای آپلود EEG
+RAW_CONTENT_TYPE = "application/octet-stream"
+NPY_CONTENT_TYPE = "application/x-npy"
+BINARY_CONTENT_TYPES = (RAW_CONTENT_TYPE, NPY_CONTENT_TYPE)
+
+# نوع داده‌های مجاز در بدنه خام (همگی little-endian)
+RAW_DTYPES = {
+    "float32": np.dtype("<f4"),
+    "int16": np.dtype("<i2"),
+}
+
+# ضریب تبدیل هر واحد به میکروولت
+MICROVOLTS_PER_UNIT = {"uV": 1.0, "mV": 1e3, "V": 1e6}
+
+class EEGDecodeError(ValueError):
+    """
+    خطای رمزگشایی بدنه باینری EEG
+    """
+
+def parse_binary_header(headers: Mapping[str, str]) -> EEGBinaryHeader:
+    """
+    خواندن سرآیند داده باینری از هدرهای HTTP
+
+    X-EEG-Channels: نام کانال‌ها جدا شده با کاما
+    X-EEG-Sampling-Rate: نرخ نمونه‌برداری بر حسب هرتز
+    X-EEG-Start-Time: زمان اولین نمونه (ثانیه یونیکس، اختیاری)
+    X-EEG-Dtype: float32 یا int16 (فقط برای بدنه خام)
+    X-EEG-Scale: ضریب تبدیل int16 به واحد X-EEG-Unit
+    X-EEG-Unit: واحد نمونه‌ها (uV، mV یا V، اختیاری)؛ بدون آن آستانه‌های دامنه اعمال نمی‌شوند
+    """
+    channels = headers.get("x-eeg-channels")
+    if not channels:
+        raise EEGDecodeError("هدر X-EEG-Channels الزامی است")
+    fields = {
+        "channels": [name.strip() for name in channels.split(",") if name.strip()],
+        "sampling_rate": headers.get("x-eeg-sampling-rate"),
+        "start_time": headers.get("x-eeg-start-time"),
+        "dtype": headers.get("x-eeg-dtype", "float32"),
+        "scale": headers.get("x-eeg-scale", 1.0),
+        "unit": headers.get("x-eeg-unit"),
+    }
+    try:
+        header = EEGBinaryHeader(**{k: v for k, v in fields.items() if v is not None})
+    except ValidationError as e:
+        raise EEGDecodeError(f"سرآیند EEG نامعتبر است: {e.errors()}")
+    if header.sampling_rate <= 0:
+        raise EEGDecodeError("نرخ نمونه‌برداری باید مثبت باشد")
+    return header
+
+def decode_raw(body: bytes, header: EEGBinaryHeader) -> np.ndarray:
+    """
+    رمزگشایی بدنه خام با نمونه‌های درهم (نمونه × کانال) بدون کپی
+
+    خروجی نمایی با ابعاد (کانال، نمونه) روی همان بافر درخواست است. برای int16
+    یک تبدیل به float32 با اعمال ضریب scale انجام می‌شود.
+    """
+    dtype = RAW_DTYPES.get(header.dtype)
+    if dtype is None:
+        raise EEGDecodeError(f"نوع داده {header.dtype} پشتیبانی نمی‌شود")
+    n_channels = len(header.channels)
+    frame = dtype.itemsize * n_channels
+    if not body or len(body) % frame:
+        raise EEGDecodeError("طول بدنه با تعداد کانال‌ها و نوع داده سازگار نیست")
+
+    samples = np.frombuffer(body, dtype=dtype).reshape(-1, n_channels).T
+    if dtype.kind == "i":
+        samples = samples.astype(np.float32) * np.float32(header.scale)
+    return samples
+
+def decode_npy(body: bytes, header: EEGBinaryHeader) -> np.ndarray:
+    """
+    رمزگشایی فایل .npy بدون کپی؛ آرایه می‌تواند (کانال، نمونه) یا (نمونه، کانال) باشد
+    """
+    stream = io.BytesIO(body)
+    try:
+        version = np.lib.format.read_magic(stream)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+    except ValueError as e:
+        raise EEGDecodeError(f"فایل npy نامعتبر است: {e}")
+    if dtype.kind not in "fiu" or len(shape) != 2:
+        raise EEGDecodeError("آرایه npy باید دوبعدی و عددی باشد")
+
+    offset = stream.tell()
+    count = shape[0] * shape[1]
+    if len(body) - offset < count * dtype.itemsize:
+        raise EEGDecodeError("فایل npy ناقص است")
+    array = np.frombuffer(body, dtype=dtype, count=count, offset=offset)
+    array = array.reshape(shape, order="F" if fortran_order else "C")
+
+    n_channels = len(header.channels)
+    if array.shape[0] != n_channels and array.shape[1] == n_channels:
+        array = array.T
+    if array.shape[0] != n_channels:
+        raise EEGDecodeError("ابعاد آرایه با تعداد کانال‌ها سازگار نیست")
+    if dtype.kind != "f":
+        array = array.astype(np.float32) * np.float32(header.scale)
+    return array
+
+def decode_eeg_body(
+    body: bytes, content_type: str, headers: Mapping[str, str]
+) -> Tuple[np.ndarray, EEGBinaryHeader]:
+    """
+    رمزگشایی بدنه باینری EEG بر اساس نوع محتوا
+    """
+    header = parse_binary_header(headers)
+    if content_type == NPY_CONTENT_TYPE:
+        return decode_npy(body, header), header
+    return decode_raw(body, header), header
+
+def to_microvolts(signal: np.ndarray, unit: Optional[str]) -> np.ndarray:
+    """
+    تبدیل نمونه‌ها از واحد اعلام شده به میکروولت؛ بدون واحد، سیگنال بدون تغییر برمی‌گردد
+    """
+    factor = MICROVOLTS_PER_UNIT.get(unit, 1.0)
+    return signal if factor == 1.0 else signal * factor
@@ -1,39 +1,73 @@
+from typing import Iterator, Optional, Tuple
+
 import numpy as np
 from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.metrics import stage
 from app.schemas.data import EEGData
+from app.services.baseline_service import DEFAULT_AVERAGE
+from app.services.eeg_archive import eeg_archive
+from app.services.eeg_codec import to_microvolts
+from app.services.model_registry import model_registry
+from app.services.preprocessing import artifact_windows, eeg_pipeline
+from app.services.spectral import BANDS, compute_band_powers, window_end_times
+
+# اندیس هر باند در خروجی compute_band_powers
+BAND_INDEX = {name: i for i, name in enumerate(BANDS)}
 
 def process_eeg_data(db: Session, user_id: int, eeg_data: EEGData):
     """
     پردازش داده‌های EEG و استخراج ویژگی‌های شناختی
     
-    این پیاده‌سازی یک نمونه ساده است. در نسخه واقعی، از کتابخانه MNE و الگوریتم‌های
-    یادگیری ماشین برای استخراج ویژگی‌های پیچیده استفاده می‌کنیم.
+    توان باندهای فرکانسی با روش Welch برای تمام کانال‌ها و پنجره‌ها به صورت برداری
+    محاسبه می‌شود و شاخص‌های شناختی از نسبت توان باندها به دست می‌آیند.
     """
-    # تبدیل داده‌ها به آرایه numpy برای پردازش راحت‌تر
-    data_array = np.array(eeg_data.values)
+    # تبدیل داده‌ها به آرایه numpy با ابعاد (کانال، نمونه)
+    data_array = to_microvolts(np.asarray(eeg_data.values, dtype=np.float64), eeg_data.unit)
     
-    # استخراج باندهای فرکانسی مختلف (شبیه‌سازی شده)
-    # در واقعیت، از تبدیل فوریه یا موجک برای استخراج باندهای فرکانسی استفاده می‌شود
-    alpha = simulate_band_power(data_array, 'alpha')
-    beta = simulate_band_power(data_array, 'beta')
-    delta = simulate_band_power(data_array, 'delta')
-    theta = simulate_band_power(data_array, 'theta')
-    gamma = simulate_band_power(data_array, 'gamma')
+    return analyze_eeg_signal(data_array, eeg_data.sampling_rate, calibrated=eeg_data.unit is not None)
+
+def reanalyze_archived(user_id: int, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[Tuple[float, dict]]:
+    """
+    پردازش مجدد داده‌های خام بایگانی شده کاربر در بازه [start, end)
+
+    داده هر برش مستقیماً از نمای memmap خوانده می‌شود و (زمان اولین نمونه، نتیجه تحلیل) برمی‌گردد.
+    """
+    for record, data, first_time in eeg_archive.read_range(user_id, start, end):
+        yield first_time, analyze_eeg_signal(data, record.sampling_rate, calibrated=record.calibrated)
+
+def analyze_eeg_signal(data_array: np.ndarray, sampling_rate: float, calibrated: bool = False):
+    """
+    استخراج توان باندها و شاخص‌های شناختی از آرایه EEG با ابعاد (کانال، نمونه)
+    
+    سیگنال ابتدا فیلتر، از کانال‌های خراب پاک و به میانگین کانال‌ها مرجع‌دهی می‌شود.
+    پنجره‌های دارای آرتیفکت دامنه در سری توان باندها می‌مانند اما در شاخص‌ها شرکت نمی‌کنند.
+    calibrated یعنی داده بر حسب میکروولت است؛ در غیر این صورت آستانه‌های دامنه اعمال نمی‌شوند.
+    """
+    report = {"rejected_channels": [], "calibrated": calibrated}
+    rejected = np.zeros(0, dtype=bool)
+    if settings.EEG_PREPROCESSING:
+        with stage("eeg.preprocess"):
+            data_array, report = eeg_pipeline(data_array, sampling_rate, calibrated)
+            if calibrated:
+                rejected = artifact_windows(data_array, sampling_rate, settings.EEG_ARTIFACT_AMPLITUDE_UV)
     
-    # محاسبه شاخص‌های شناختی (شبیه‌سازی شده)
-    # در واقعیت، از الگوریتم‌های پیچیده‌تر استفاده می‌شود
-    focus = calculate_focus_index(beta, theta)
-    relaxation = calculate_relaxation_index(alpha, beta)
-    stress = calculate_stress_index(beta, alpha)
-    creativity = calculate_creativity_index(alpha, theta)
-    alertness = calculate_alertness_index(beta, delta)
-    emotional = calculate_emotional_index(gamma, alpha)
+    # توان باندها با ابعاد (باند، کانال، پنجره) و میانگین روی کانال‌ها برای هر پنجره
+    with stage("eeg.band_power"):
+        band_powers = compute_band_powers(data_array, sampling_rate)
+    alpha, beta, delta, theta, gamma = (
+        band_powers[BAND_INDEX[name]].mean(axis=0)
+        for name in ("alpha", "beta", "delta", "theta", "gamma")
+    )
     
-    # ذخیره‌سازی داده‌ها در پایگاه داده (در نسخه واقعی)
-    # در اینجا فقط نتایج را برمی‌گردانیم
+    # محاسبه شاخص‌های شناختی با مدل شناختی از میانگین توان هر باند
+    with stage("eeg.indices"):
+        clean = band_powers[:, :, ~rejected] if 0 < rejected.sum() < len(rejected) else band_powers
+        current = model_registry.predict("cognitive", clean.mean(axis=(1, 2)))[0]
     
-    # برگرداندن نتایج پردازش
+    # برگرداندن نتایج پردازش؛ نتیجه در کش نتایج و انبار کارها با json ذخیره می‌شود، بنابراین لیست پایتون است
     return {
+        "window_times": window_end_times(data_array.shape[-1], sampling_rate).tolist(),
         "brainwave_data": {
             "alpha": alpha.tolist(),
             "beta": beta.tolist(),
@@ -42,49 +76,78 @@ def process_eeg_data(db: Session, user_id: int, eeg_data: EEGData):
             "gamma": gamma.tolist()
         },
         "cognitive_data": {
-            "current": [focus, relaxation, stress, creativity, alertness, emotional],
-            "average": [60, 65, 40, 70, 65, 55]  # در واقعیت، از میانگین تاریخی کاربر استفاده می‌شود
+            "current": [int(value) for value in current],
+            "average": list(DEFAULT_AVERAGE)  # مسیر آپلود آن را با خط پایه کاربر جایگزین می‌کند
+        },
+        "preprocessing": {
+            "rejected_channels": report["rejected_channels"],
+            "rejected_windows": int(rejected.sum()),
+            "calibrated": calibrated
         }
     }
 
-def simulate_band_power(data, band_type):
+def cognitive_indices(alpha, beta, delta, theta, gamma):
     """
-    شبیه‌سازی استخراج توان باند فرکانسی
+    محاسبه شش شاخص شناختی به ترتیب: تمرکز، آرامش، استرس، خلاقیت، هوشیاری و پردازش هیجانی
     """
-    # مقادیر پایه برای هر باند فرکانسی
-    base_values = {
-        'alpha': 10,
-        'beta': 20,
-        'delta': 5,
-        'theta': 8,
-        'gamma': 30
-    }
-    
-    # ایجاد مقادیر شبیه‌سازی شده با نویز تصادفی
-    length = min(7, data.shape[1])  # حداکثر 7 نقطه زمانی
-    base = base_values.get(band_type, 10)
-    return np.array([base + np.random.randint(-2, 3) for _ in range(length)])
+    return [
+        calculate_focus_index(beta, theta),
+        calculate_relaxation_index(alpha, beta),
+        calculate_stress_index(beta, alpha),
+        calculate_creativity_index(alpha, theta),
+        calculate_alertness_index(beta, delta),
+        calculate_emotional_index(gamma, alpha),
+    ]
+
+def ratio_index(numerator, denominator, reference=1.0):
+    """
+    نگاشت نسبت میانگین توان دو باند به بازه 0 تا 100
+
+    وقتی نسبت برابر reference باشد، شاخص 50 است و با افزایش نسبت به 100 میل می‌کند.
+    """
+    ratio = float(np.mean(numerator)) / max(float(np.mean(denominator)), 1e-12)
+    return min(100, max(0, int(round(100 * ratio / (ratio + reference)))))
 
 def calculate_focus_index(beta, theta):
     """محاسبه شاخص تمرکز"""
-    return min(100, max(0, int(70 + np.random.normal(0, 10))))
+    return ratio_index(beta, theta, reference=1.0)
 
 def calculate_relaxation_index(alpha, beta):
     """محاسبه شاخص آرامش"""
-    return min(100, max(0, int(65 + np.random.normal(0, 10))))
+    return ratio_index(alpha, beta, reference=1.0)
 
 def calculate_stress_index(beta, alpha):
     """محاسبه شاخص استرس"""
-    return min(100, max(0, int(40 + np.random.normal(0, 10))))
+    return ratio_index(beta, alpha, reference=1.0)
 
 def calculate_creativity_index(alpha, theta):
     """محاسبه شاخص خلاقیت"""
-    return min(100, max(0, int(80 + np.random.normal(0, 10))))
+    return ratio_index(alpha, theta, reference=1.0)
 
 def calculate_alertness_index(beta, delta):
     """محاسبه شاخص هوشیاری"""
-    return min(100, max(0, int(75 + np.random.normal(0, 10))))
+    return ratio_index(beta, delta, reference=0.5)
 
 def calculate_emotional_index(gamma, alpha):
     """محاسبه شاخص پردازش هیجانی"""
-    return min(100, max(0, int(60 + np.random.normal(0, 10)))) 
\ No newline at end of file
+    return ratio_index(gamma, alpha, reference=0.5)
+
+def ratio_cognitive_model(rows: np.ndarray) -> np.ndarray:
+    """
+    مدل پیش‌فرض: شاخص‌های شناختی از نسبت توان باندها؛ هر سطر توان باندها به ترتیب BANDS است
+    """
+    names = ("alpha", "beta", "delta", "theta", "gamma")
+    return np.array([cognitive_indices(*(row[BAND_INDEX[name]] for name in names)) for row in rows])
+
+def load_cognitive_model():
+    """
+    بارگذاری رگرسیون scikit-learn از COGNITIVE_MODEL_PATH یا مدل نسبت باندها
+    """
+    if not settings.COGNITIVE_MODEL_PATH:
+        return ratio_cognitive_model
+    import joblib
+
+    model = joblib.load(settings.COGNITIVE_MODEL_PATH, mmap_mode="r")
+    return lambda rows: np.clip(np.rint(model.predict(rows)), 0, 100).astype(int)
+
+model_registry.register("cognitive", load_cognitive_model)
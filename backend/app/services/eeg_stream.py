@@ -0,0 +1,127 @@
+from typing import Any, Dict, List
+
+import numpy as np
+
+from app.schemas.data import EEGStreamConfig
+from app.services.eeg_service import BAND_INDEX, cognitive_indices
+from app.services.spectral import compute_band_powers
+
+# ترتیب آرگومان‌های cognitive_indices
+_INDEX_BANDS = ("alpha", "beta", "delta", "theta", "gamma")
+
+# فضای اضافه بافر حلقوی (بر حسب ثانیه) برای بلوک‌هایی که بزرگ‌تر از یک گام هستند
+BUFFER_SLACK_SECONDS = 10.0
+
+class EEGRingBuffer:
+    """
+    بافر حلقوی با ظرفیت ثابت برای نگهداری آخرین نمونه‌های هر کانال
+    """
+
+    def __init__(self, n_channels: int, capacity: int):
+        self._data = np.zeros((n_channels, capacity), dtype=np.float32)
+        self.capacity = capacity
+        self.total = 0  # تعداد کل نمونه‌های دریافت شده از ابتدای جلسه
+
+    def append(self, block: np.ndarray) -> None:
+        """
+        افزودن بلوک (کانال، نمونه) به بافر؛ هزینه فقط به اندازه بلوک وابسته است
+        """
+        n = block.shape[1]
+        if n >= self.capacity:
+            block = block[:, -self.capacity:]
+            self.total += n - self.capacity
+            n = self.capacity
+        start = self.total % self.capacity
+        first = min(n, self.capacity - start)
+        self._data[:, start:start + first] = block[:, :first]
+        self._data[:, :n - first] = block[:, first:]
+        self.total += n
+
+    def read(self, start: int, stop: int) -> np.ndarray:
+        """
+        خواندن نمونه‌های بازه [start, stop) بر حسب شمارنده کل نمونه‌ها
+        """
+        if start < self.total - self.capacity or stop > self.total:
+            raise IndexError("بازه درخواستی در بافر موجود نیست")
+        indices = np.arange(start, stop) % self.capacity
+        return self._data[:, indices]
+
+class EEGStreamSession:
+    """
+    جلسه دریافت جریانی EEG با محاسبه افزایشی ویژگی‌ها روی پنجره‌های لغزان
+
+    پس از هر بلوک، فقط پنجره‌هایی که تازه کامل شده‌اند پردازش می‌شوند و میانگین
+    تجمعی توان باندها در زمان O(1) به‌روزرسانی می‌شود؛ بنابراین تأخیر هر بلوک به
+    اندازه بلوک وابسته است و نه به طول جلسه.
+    """
+
+    def __init__(self, config: EEGStreamConfig):
+        if config.sampling_rate <= 0:
+            raise ValueError("نرخ نمونه‌برداری باید مثبت باشد")
+        self.config = config
+        self.window = max(2, int(round(config.window_seconds * config.sampling_rate)))
+        self.step = max(1, min(self.window, int(round(config.step_seconds * config.sampling_rate))))
+        slack = int(BUFFER_SLACK_SECONDS * config.sampling_rate)
+        self.buffer = EEGRingBuffer(len(config.channels), self.window + max(slack, self.step))
+        self._next_end = self.window
+        self._band_sums = np.zeros(len(BAND_INDEX))
+        self._window_count = 0
+
+    def push(self, block: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        افزودن یک بلوک نمونه و برگرداندن ویژگی‌های پنجره‌های تازه کامل شده
+        """
+        self.buffer.append(block)
+        total = self.buffer.total
+
+        # پنجره‌هایی که از بافر خارج شده‌اند را رد می‌کنیم
+        oldest_end = total - self.buffer.capacity + self.window
+        if self._next_end < oldest_end:
+            skipped = -(-(oldest_end - self._next_end) // self.step)
+            self._next_end += skipped * self.step
+        if self._next_end > total:
+            return []
+
+        # تمام پنجره‌های آماده در یک فراخوانی برداری محاسبه می‌شوند
+        n_windows = (total - self._next_end) // self.step + 1
+        last_end = self._next_end + (n_windows - 1) * self.step
+        segment = self.buffer.read(self._next_end - self.window, last_end)
+        powers = compute_band_powers(
+            segment,
+            self.config.sampling_rate,
+            window_seconds=self.window / self.config.sampling_rate,
+            overlap=1.0 - self.step / self.window,
+        ).mean(axis=1)  # میانگین روی کانال‌ها: (باند، پنجره)
+
+        updates = []
+        for i in range(powers.shape[1]):
+            window_powers = powers[:, i]
+            self._band_sums += window_powers
+            self._window_count += 1
+            updates.append(self._build_update(self._next_end + i * self.step, window_powers))
+        self._next_end = last_end + self.step
+        return updates
+
+    def _build_update(self, end_sample: int, window_powers: np.ndarray) -> Dict[str, Any]:
+        """
+        ساخت پیام خروجی برای یک پنجره
+        """
+        averages = self._band_sums / self._window_count
+        return {
+            "type": "features",
+            "end_time": self._sample_time(end_sample),
+            "brainwave": {name: float(window_powers[i]) for name, i in BAND_INDEX.items()},
+            "cognitive": {
+                "current": cognitive_indices(*(window_powers[BAND_INDEX[name]] for name in _INDEX_BANDS)),
+                "average": cognitive_indices(*(averages[BAND_INDEX[name]] for name in _INDEX_BANDS)),
+            },
+        }
+
+    def _sample_time(self, sample: int) -> float:
+        """
+        زمان نمونه بر حسب ثانیه (نسبت به start_time در صورت وجود)
+        """
+        offset = sample / self.config.sampling_rate
+        if self.config.start_time is None:
+            return offset
+        return self.config.start_time + offset
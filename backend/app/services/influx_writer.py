@@ -0,0 +1,485 @@
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# ترتیب شاخص‌های شناختی در cognitive_data["current"]
+COGNITIVE_FIELDS = ("focus", "relaxation", "stress", "creativity", "alertness", "emotional")
+
+# سطوح پیش‌تجمیع (rollup) سری‌ها: نام و طول سطل بر حسب ثانیه
+ROLLUPS = (("1m", 60), ("1h", 3600), ("1d", 86400))
+
+# خروجی پرس‌وجو: زمان‌ها و مقادیر هر فیلد
+SeriesResult = Tuple[np.ndarray, Dict[str, np.ndarray]]
+
+# نشانه توقف در صف نویسنده؛ حلقه منتظر get را بیدار می‌کند
+_STOP = object()
+
+def select_rollup(every: float) -> Optional[Tuple[str, int]]:
+    """
+    درشت‌ترین سطح پیش‌تجمیع که از دقت درخواستی ریزتر یا برابر آن است
+    """
+    candidates = [rollup for rollup in ROLLUPS if rollup[1] <= every]
+    return candidates[-1] if candidates else None
+
+def point_tags(user_id: int, pipeline: Optional[str] = None) -> Dict[str, str]:
+    """
+    برچسب‌های هر نقطه؛ pipeline نسخه الگوریتم تولید کننده است تا نتایج نسخه‌ها کنار هم بمانند
+    """
+    return {"user_id": str(user_id), "pipeline": pipeline or settings.PIPELINE_VERSION}
+
+def _empty_series(fields: List[str]) -> SeriesResult:
+    return np.empty(0), {field: np.empty(0) for field in fields}
+
+def _select_versions(rows: Iterable[Tuple[float, Optional[str], Dict[str, float]]]) -> List[Tuple[float, Dict[str, float]]]:
+    """
+    یک ردیف برای هر زمان از ردیف‌های (زمان، نسخه، فیلدها)
+
+    نقاط بدون برچسب نسخه پیش از برچسب‌گذاری نوشته شده‌اند؛ اگر همان پنجره با نسخه جاری
+    دوباره پردازش شده باشد فقط نتیجه نسخه جاری برگردانده می‌شود.
+    """
+    selected: Dict[float, Dict[str, float]] = {}
+    for timestamp, pipeline, fields in rows:
+        if pipeline is not None or timestamp not in selected:
+            selected[timestamp] = fields
+    return sorted(selected.items(), key=lambda row: row[0])
+
+def _rows_to_series(rows: List[Tuple[float, Dict[str, float]]], fields: List[str]) -> SeriesResult:
+    if not rows:
+        return _empty_series(fields)
+    timestamps = np.array([row[0] for row in rows])
+    values = {field: np.array([row[1].get(field, np.nan) for row in rows], dtype=np.float64) for field in fields}
+    return timestamps, values
+
+class TimeSeriesPoint(NamedTuple):
+    """
+    یک نقطه سری زمانی برای نوشتن در InfluxDB
+    """
+    measurement: str
+    tags: Dict[str, str]
+    fields: Dict[str, float]
+    timestamp: float  # ثانیه یونیکس
+
+class InfluxDBSink:
+    """
+    مقصد واقعی InfluxDB؛ کلاینت همگام در نخ جداگانه اجرا می‌شود
+    """
+
+    def __init__(self, url: str, token: str, org: str, bucket: str):
+        from influxdb_client import InfluxDBClient
+        from influxdb_client.client.write_api import SYNCHRONOUS
+
+        self.bucket = bucket
+        self.org = org
+        self._client = InfluxDBClient(url=url, token=token, org=org)
+        self._write_api = self._client.write_api(write_options=SYNCHRONOUS)
+
+    def _to_record(self, point: TimeSeriesPoint):
+        from influxdb_client import Point, WritePrecision
+
+        record = Point(point.measurement).time(int(point.timestamp * 1e9), WritePrecision.NS)
+        for key, value in point.tags.items():
+            record = record.tag(key, value)
+        for key, value in point.fields.items():
+            record = record.field(key, float(value))
+        return record
+
+    async def write(self, points: List[TimeSeriesPoint]) -> None:
+        records = [self._to_record(point) for point in points]
+        await asyncio.get_running_loop().run_in_executor(
+            None, lambda: self._write_api.write(bucket=self.bucket, org=self.org, record=records)
+        )
+
+    async def query(
+        self, user_id: int, measurement: str, fields: List[str], start: float, end: float, every: float
+    ) -> SeriesResult:
+        """
+        پرس‌وجوی بازه زمانی با تجمیع سمت سرور (aggregateWindow) و استفاده از سطل‌های پیش‌تجمیع
+        """
+        bucket = self.bucket
+        rollup = select_rollup(every) if settings.INFLUXDB_ROLLUPS_ENABLED else None
+        if rollup is not None:
+            bucket = f"{self.bucket}_{rollup[0]}"
+        flux = """
+from(bucket: params.bucket)
+  |> range(start: params.start, stop: params.stop)
+  |> filter(fn: (r) => r._measurement == params.measurement and r.user_id == params.user_id)
+  |> filter(fn: (r) => not exists r.pipeline or r.pipeline == params.pipeline)
+  |> aggregateWindow(every: params.every, fn: mean, createEmpty: false, timeSrc: "_start")
+  |> pivot(rowKey: ["_time"], columnKey: ["_field"], valueColumn: "_value")
+"""
+        params = {
+            "bucket": bucket,
+            "start": datetime.fromtimestamp(start, timezone.utc),
+            "stop": datetime.fromtimestamp(end, timezone.utc),
+            "measurement": measurement,
+            "user_id": str(user_id),
+            "pipeline": settings.PIPELINE_VERSION,
+            "every": timedelta(seconds=max(1, int(every))),
+        }
+        tables = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: self._client.query_api().query(flux, org=self.org, params=params)
+        )
+        # جدول‌ها بر اساس برچسب‌ها (از جمله pipeline) جدا هستند؛ هر پنجره یک بار انتخاب می‌شود
+        rows = _select_versions(
+            (record.get_time().timestamp(), record.values.get("pipeline"), record.values)
+            for table in tables for record in table.records
+        )
+        return _rows_to_series(rows, fields)
+
+    def ensure_rollups(self) -> None:
+        """
+        ایجاد سطل‌ها و وظایف پیش‌تجمیع InfluxDB (هر سطح از سطح ریزتر قبلی تغذیه می‌شود)
+
+        نقطه هر سطل با زمان شروع آن (timeSrc: "_start") نوشته می‌شود، مانند FakeInfluxSink،
+        تا سطح بعدی و backfill_rollups همان سطل را با همان زمان بسازند.
+        """
+        organization = self._client.organizations_api().find_organizations(org=self.org)[0]
+        buckets_api = self._client.buckets_api()
+        tasks_api = self._client.tasks_api()
+        existing_tasks = {task.name for task in tasks_api.find_tasks(org_id=organization.id)}
+        source = self.bucket
+        for name, seconds in ROLLUPS:
+            target = f"{self.bucket}_{name}"
+            if buckets_api.find_bucket_by_name(target) is None:
+                buckets_api.create_bucket(bucket_name=target, org=organization)
+            task_name = f"rollup_{target}"
+            if task_name not in existing_tasks:
+                flux = (
+                    f'from(bucket: "{source}")\n'
+                    f"  |> range(start: -{2 * seconds}s)\n"
+                    f'  |> aggregateWindow(every: {seconds}s, fn: mean, createEmpty: false, timeSrc: "_start")\n'
+                    f'  |> to(bucket: "{target}")\n'
+                )
+                tasks_api.create_task_every(task_name, flux, f"{seconds}s", organization)
+            source = target
+
+    async def backfill_rollups(self, user_id: int, start: float, end: float, pipeline: str) -> None:
+        """
+        محاسبه دوباره سطل‌های پیش‌تجمیع برای نقاط تاریخی یک نسخه
+
+        وظایف دوره‌ای فقط بازه اخیر را تجمیع می‌کنند، بنابراین نقاطی که پردازش مجدد با زمان
+        گذشته می‌نویسد بدون این کار فقط در دقت خام دیده می‌شوند. بازه هر سطح به مرز سطل‌های
+        آن گسترش می‌یابد تا سطل‌های مرزی از تمام نقاط خود محاسبه شوند.
+        """
+        flux = """
+from(bucket: params.source)
+  |> range(start: params.start, stop: params.stop)
+  |> filter(fn: (r) => r.user_id == params.user_id and r.pipeline == params.pipeline)
+  |> aggregateWindow(every: params.every, fn: mean, createEmpty: false, timeSrc: "_start")
+  |> to(bucket: params.target)
+"""
+        loop = asyncio.get_running_loop()
+        query_api = self._client.query_api()
+        source = self.bucket
+        for name, seconds in ROLLUPS:
+            target = f"{self.bucket}_{name}"
+            params = {
+                "source": source,
+                "target": target,
+                "start": datetime.fromtimestamp(math.floor(start / seconds) * seconds, timezone.utc),
+                "stop": datetime.fromtimestamp((math.floor(end / seconds) + 1) * seconds, timezone.utc),
+                "user_id": str(user_id),
+                "pipeline": pipeline,
+                "every": timedelta(seconds=seconds),
+            }
+            # هر سطح مانند وظایف ensure_rollups از سطح ریزتر قبلی خوانده می‌شود
+            await loop.run_in_executor(None, lambda params=params: query_api.query(flux, org=self.org, params=params))
+            source = target
+
+    async def close(self) -> None:
+        self._client.close()
+
+class FakeInfluxSink:
+    """
+    مقصد محلی در حافظه برای تست و توسعه؛ می‌تواند خطای نوشتن را شبیه‌سازی کند
+    """
+
+    def __init__(self):
+        self.points: List[TimeSeriesPoint] = []
+        self.batches = 0
+        self.fail_next = 0  # تعداد نوشتن‌های بعدی که باید شکست بخورند
+        # پیش‌تجمیع‌ها: طول سطل -> (سنجه، کاربر، نسخه) -> شروع سطل -> [تعداد، مجموع فیلدها]
+        self._rollups: Dict[int, Dict[Tuple[str, str, Optional[str]], Dict[float, list]]] = {
+            seconds: {} for _, seconds in ROLLUPS
+        }
+
+    async def write(self, points: List[TimeSeriesPoint]) -> None:
+        if self.fail_next > 0:
+            self.fail_next -= 1
+            raise ConnectionError("خطای شبیه‌سازی شده InfluxDB")
+        self.points.extend(points)
+        self.batches += 1
+        for point in points:
+            key = (point.measurement, point.tags.get("user_id"), point.tags.get("pipeline"))
+            for seconds, series in self._rollups.items():
+                bucket = math.floor(point.timestamp / seconds) * seconds
+                aggregate = series.setdefault(key, {}).setdefault(bucket, [0, {}])
+                aggregate[0] += 1
+                for field, value in point.fields.items():
+                    aggregate[1][field] = aggregate[1].get(field, 0.0) + value
+
+    async def query(
+        self, user_id: int, measurement: str, fields: List[str], start: float, end: float, every: float
+    ) -> SeriesResult:
+        """
+        پرس‌وجوی بازه زمانی از داده‌های خام یا درشت‌ترین پیش‌تجمیع مناسب
+        """
+        # مانند InfluxDB: نقاط بدون برچسب نسخه و نقاط نسخه جاری، یک نقطه برای هر زمان
+        keys = {(measurement, str(user_id), None), (measurement, str(user_id), settings.PIPELINE_VERSION)}
+        rollup = select_rollup(every)
+        if rollup is None:
+            rows = _select_versions(
+                (p.timestamp, p.tags.get("pipeline"), p.fields) for p in self.points
+                if (p.measurement, p.tags.get("user_id"), p.tags.get("pipeline")) in keys
+                and start <= p.timestamp < end
+            )
+        else:
+            rows = _select_versions(
+                (bucket, key[2], {field: total / count for field, total in sums.items()})
+                for key in keys
+                for bucket, (count, sums) in self._rollups[rollup[1]].get(key, {}).items()
+                if start <= bucket < end
+            )
+        return _rows_to_series(rows, fields)
+
+    async def backfill_rollups(self, user_id: int, start: float, end: float, pipeline: str) -> None:
+        # پیش‌تجمیع‌های حافظه هنگام نوشتن و برای هر زمانی به‌روز می‌شوند
+        pass
+
+    async def close(self) -> None:
+        pass
+
+class InfluxWriter:
+    """
+    نویسنده پس‌زمینه با صف محدود که نقاط را دسته‌ای و بر اساس اندازه یا زمان ارسال می‌کند
+
+    submit هرگز منتظر پایگاه داده نمی‌ماند؛ اگر صف پر باشد نقاط دور ریخته و شمرده می‌شوند،
+    بنابراین تأخیر آپلود مستقل از تأخیر نوشتن است.
+    """
+
+    def __init__(
+        self,
+        sink,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_queue: int = 10000,
+        max_retries: int = 5,
+        retry_backoff: float = 0.5,
+    ):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.written = 0
+        self.dropped = 0
+        self.failed_batches = 0
+
+    def submit(self, points: Iterable[TimeSeriesPoint]) -> int:
+        """
+        افزودن نقاط به صف بدون انتظار؛ تعداد نقاط پذیرفته شده را برمی‌گرداند
+        """
+        accepted = 0
+        for point in points:
+            try:
+                self._queue.put_nowait(point)
+                accepted += 1
+            except asyncio.QueueFull:
+                self.dropped += 1
+        return accepted
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        توقف نویسنده پس از ارسال نقاط باقی‌مانده در صف
+        """
+        if self._task is not None:
+            # دسته در حال ارسال کامل می‌شود و حلقه پس از آن خارج می‌شود
+            self._stopping = True
+            try:
+                self._queue.put_nowait(_STOP)
+            except asyncio.QueueFull:
+                # صف پر است؛ حلقه منتظر get نمی‌ماند و پس از دسته جاری پرچم را می‌بیند
+                pass
+            await self._task
+            self._task = None
+            self._stopping = False
+        while not self._queue.empty():
+            await self._flush(self._drain(self.batch_size))
+        await self.sink.close()
+
+    def _drain(self, limit: int) -> List[TimeSeriesPoint]:
+        batch = []
+        while len(batch) < limit and not self._queue.empty():
+            point = self._queue.get_nowait()
+            if point is not _STOP:
+                batch.append(point)
+        return batch
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            # انتظار برای اولین نقطه، سپس جمع‌آوری تا پر شدن دسته یا پایان بازه زمانی
+            point = await self._queue.get()
+            if point is _STOP:
+                break
+            batch = [point]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and not self._stopping:
+                batch.extend(self._drain(self.batch_size - len(batch)))
+                remaining = deadline - time.monotonic()
+                if len(batch) >= self.batch_size or remaining <= 0:
+                    break
+                try:
+                    point = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if point is _STOP:
+                    break
+                batch.append(point)
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[TimeSeriesPoint]) -> None:
+        """
+        ارسال یک دسته با تلاش مجدد و تأخیر نمایی
+        """
+        if not batch:
+            return
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.sink.write(batch)
+                self.written += len(batch)
+                return
+            except Exception:
+                if attempt == self.max_retries:
+                    break
+                logger.warning("نوشتن در InfluxDB ناموفق بود، تلاش مجدد %s", attempt + 1)
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+        self.failed_batches += 1
+        self.dropped += len(batch)
+        logger.error("دسته‌ای با %s نقطه پس از %s تلاش دور ریخته شد", len(batch), self.max_retries + 1)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_batches": self.failed_batches,
+        }
+
+def create_sink():
+    """
+    ساخت مقصد نوشتن بر اساس INFLUXDB_SINK
+    """
+    if settings.INFLUXDB_SINK.lower() == "memory":
+        return FakeInfluxSink()
+    return InfluxDBSink(
+        settings.INFLUXDB_URL, settings.INFLUXDB_TOKEN, settings.INFLUXDB_ORG, settings.INFLUXDB_BUCKET
+    )
+
+def create_writer() -> InfluxWriter:
+    return InfluxWriter(
+        create_sink(),
+        batch_size=settings.INFLUXDB_BATCH_SIZE,
+        flush_interval=settings.INFLUXDB_FLUSH_INTERVAL_SECONDS,
+        max_queue=settings.INFLUXDB_QUEUE_SIZE,
+        max_retries=settings.INFLUXDB_MAX_RETRIES,
+        retry_backoff=settings.INFLUXDB_RETRY_BACKOFF_SECONDS,
+    )
+
+# نویسنده مشترک هر پردازه؛ در رویداد startup برنامه ساخته و اجرا می‌شود
+influx_writer: Optional[InfluxWriter] = None
+
+async def start_writer() -> InfluxWriter:
+    global influx_writer
+    if influx_writer is None:
+        influx_writer = create_writer()
+    await influx_writer.start()
+    return influx_writer
+
+async def stop_writer() -> None:
+    global influx_writer
+    if influx_writer is not None:
+        await influx_writer.stop()
+        influx_writer = None
+
+def submit_points(points: Iterable[TimeSeriesPoint]) -> int:
+    """
+    ارسال نقاط به نویسنده پس‌زمینه (اگر فعال نباشد نقاط نادیده گرفته می‌شوند)
+    """
+    if influx_writer is None:
+        return 0
+    return influx_writer.submit(points)
+
+async def query_series(
+    user_id: int, measurement: str, fields: List[str], start: float, end: float, every: float
+) -> SeriesResult:
+    """
+    پرس‌وجوی سری زمانی کاربر از همان مقصدی که نویسنده در آن می‌نویسد
+    """
+    if influx_writer is None:
+        return _empty_series(fields)
+    return await influx_writer.sink.query(user_id, measurement, fields, start, end, every)
+
+def build_eeg_points(
+    user_id: int, result: Dict[str, Any], start_time: float, pipeline: Optional[str] = None
+) -> List[TimeSeriesPoint]:
+    """
+    تبدیل خروجی analyze_eeg_signal به نقاط توان باند (هر پنجره) و شاخص‌های شناختی
+    """
+    tags = point_tags(user_id, pipeline)
+    bands = result["brainwave_data"]
+    times = result["window_times"]
+    points = [
+        TimeSeriesPoint("brainwave", tags, {name: values[i] for name, values in bands.items()}, start_time + t)
+        for i, t in enumerate(times)
+    ]
+    end_time = start_time + (times[-1] if times else 0.0)
+    current = result["cognitive_data"]["current"]
+    points.append(TimeSeriesPoint("cognitive", tags, dict(zip(COGNITIVE_FIELDS, current)), end_time))
+    return points
+
+def build_stream_points(user_id: int, updates: List[Dict[str, Any]]) -> List[TimeSeriesPoint]:
+    """
+    تبدیل پیام‌های EEGStreamSession به نقاط توان باند و شاخص‌های شناختی
+    """
+    tags = point_tags(user_id)
+    points = []
+    for update in updates:
+        points.append(TimeSeriesPoint("brainwave", tags, update["brainwave"], update["end_time"]))
+        current = update["cognitive"]["current"]
+        points.append(TimeSeriesPoint("cognitive", tags, dict(zip(COGNITIVE_FIELDS, current)), update["end_time"]))
+    return points
+
+def build_emotion_points(user_id: int, result: Dict[str, Any], end_time: float) -> List[TimeSeriesPoint]:
+    """
+    تبدیل خروجی process_audio_data به یک نقطه احساسات برای هر بخش صوتی
+
+    end_time زمان پایان ضبط (معمولاً زمان آپلود) است و زمان هر بخش از آن محاسبه می‌شود.
+    """
+    emotion = result["emotion_data"]
+    start_time = end_time - result["duration"]
+    tags = point_tags(user_id)
+    return [
+        TimeSeriesPoint(
+            "emotion",
+            tags,
+            {key: emotion[key][i] for key in ("positive", "negative", "neutral")},
+            start_time + offset,
+        )
+        for i, offset in enumerate(result["segment_times"])
+    ]
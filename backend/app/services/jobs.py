@@ -0,0 +1,221 @@
+import asyncio
+import io
+import json
+import logging
+import time
+import uuid
+from concurrent.futures import Executor
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.db.redis import get_redis
+from app.db.session import AsyncSessionLocal
+from app.services.audio_service import process_audio_data
+from app.services.baseline_service import update_baseline
+from app.services.cpu_pool import get_cpu_pool
+from app.services.eeg_service import analyze_eeg_signal
+from app.services.influx_writer import build_emotion_points, build_eeg_points, submit_points
+from app.services.result_cache import result_cache
+
+logger = logging.getLogger(__name__)
+
+# نوع کارها و موضوع Kafka متناظر
+EEG_JOB = "eeg"
+AUDIO_JOB = "audio"
+
+# وضعیت‌های کار
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+class JobTooLargeError(ValueError):
+    """
+    داده کار از سقف اندازه پیام صف (KAFKA_MAX_MESSAGE_BYTES) بزرگ‌تر است
+    """
+
+def job_topics() -> Dict[str, str]:
+    return {EEG_JOB: settings.KAFKA_EEG_TOPIC, AUDIO_JOB: settings.KAFKA_AUDIO_TOPIC}
+
+def encode_eeg_payload(signal: np.ndarray) -> bytes:
+    """
+    بسته‌بندی آرایه EEG (کانال، نمونه) به قالب .npy برای ارسال در صف
+    """
+    buffer = io.BytesIO()
+    np.save(buffer, np.ascontiguousarray(signal, dtype=np.float32), allow_pickle=False)
+    return buffer.getvalue()
+
+def run_job(kind: str, meta: Dict[str, Any], payload: bytes) -> Dict[str, Any]:
+    """
+    اجرای پردازش یک کار؛ تابع سطح بالا تا در استخر پردازه‌ها قابل اجرا باشد
+    """
+    if kind == EEG_JOB:
+        signal = np.load(io.BytesIO(payload), allow_pickle=False)
+        return analyze_eeg_signal(signal, meta["sampling_rate"], meta.get("calibrated", False))
+    if kind == AUDIO_JOB:
+        return process_audio_data(None, meta["user_id"], payload)
+    raise ValueError(f"نوع کار ناشناخته: {kind}")
+
+class MemoryJobStore:
+    """
+    نگهداری وضعیت کارها در حافظه (برای تست و حالت صف درون‌فرایندی)
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self._jobs.get(job_id)
+
+    async def set(self, job_id: str, record: Dict[str, Any]) -> None:
+        self._jobs[job_id] = record
+
+class RedisJobStore:
+    """
+    نگهداری وضعیت کارها در Redis تا API و پردازه‌های کارگر آن را به اشتراک بگذارند
+    """
+
+    prefix = "job:"
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = await get_redis().get(self.prefix + job_id)
+        return json.loads(raw) if raw else None
+
+    async def set(self, job_id: str, record: Dict[str, Any]) -> None:
+        await get_redis().set(self.prefix + job_id, json.dumps(record), ex=settings.JOB_RESULT_TTL_SECONDS)
+
+class KafkaJobQueue:
+    """
+    صف کار روی Kafka؛ متادیتا در هدر پیام و داده خام در بدنه ارسال می‌شود
+    """
+
+    def __init__(self):
+        from kafka import KafkaProducer
+
+        self._producer = KafkaProducer(
+            bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS,
+            max_request_size=settings.KAFKA_MAX_MESSAGE_BYTES,
+            acks="all",
+        )
+
+    async def put(self, kind: str, job_id: str, meta: Dict[str, Any], payload: bytes) -> None:
+        future = self._producer.send(
+            job_topics()[kind],
+            value=payload,
+            key=job_id.encode(),
+            headers=[("meta", json.dumps(meta).encode())],
+        )
+        # انتظار برای تأیید کارگزار خارج از حلقه رویداد
+        await asyncio.get_running_loop().run_in_executor(None, future.get, 30)
+
+    async def close(self) -> None:
+        self._producer.close()
+
+class InMemoryJobQueue:
+    """
+    صف درون‌فرایندی جایگزین Kafka؛ کارها در همان پردازه API مصرف می‌شوند
+    """
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    async def put(self, kind: str, job_id: str, meta: Dict[str, Any], payload: bytes) -> None:
+        await self._queue.put((kind, job_id, meta, payload))
+
+    def start(self, store) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._consume(store))
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    async def _consume(self, store) -> None:
+        while True:
+            kind, job_id, meta, payload = await self._queue.get()
+            try:
+                await handle_job(store, get_cpu_pool(), kind, job_id, meta, payload)
+            except Exception:
+                # خطای یک کار (مثلاً انبار وضعیت در دسترس نیست) نباید مصرف کارهای بعدی را متوقف کند
+                logger.exception("مصرف کار %s ناموفق بود", job_id)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+async def handle_job(
+    store, executor: Optional[Executor], kind: str, job_id: str, meta: Dict[str, Any], payload: bytes
+) -> None:
+    """
+    اجرای یک کار، ارسال نقاط سری زمانی و ثبت نتیجه در انبار وضعیت
+    """
+    record = dict(meta, job_id=job_id, kind=kind, status=RUNNING, updated_at=time.time())
+    await store.set(job_id, record)
+    try:
+        result = await asyncio.get_running_loop().run_in_executor(executor, run_job, kind, meta, payload)
+        if kind == EEG_JOB:
+            submit_points(build_eeg_points(meta["user_id"], result, meta["start_time"]))
+            async with AsyncSessionLocal() as db:
+                baseline = await update_baseline(db, meta["user_id"], result["cognitive_data"]["current"])
+            result["cognitive_data"]["average"] = [round(value) for value in baseline.mean]
+        else:
+            submit_points(build_emotion_points(meta["user_id"], result, meta["uploaded_at"]))
+        if meta.get("cache_key"):
+            await result_cache.set(meta["cache_key"], result)
+    except Exception as e:
+        # خطای پردازش یا پایگاه داده/Redis؛ کار نباید در وضعیت running باقی بماند
+        logger.exception("کار %s ناموفق بود", job_id)
+        record.update(status=FAILED, error=str(e), updated_at=time.time())
+    else:
+        record.update(status=DONE, result=result, updated_at=time.time())
+    await store.set(job_id, record)
+
+# صف و انبار وضعیت هر پردازه؛ در رویداد startup ساخته می‌شوند
+job_queue = None
+job_store = None
+
+async def start_jobs() -> None:
+    global job_queue, job_store
+    if settings.JOB_QUEUE_BACKEND.lower() == "memory":
+        job_store = MemoryJobStore()
+        job_queue = InMemoryJobQueue()
+        job_queue.start(job_store)
+    else:
+        job_store = RedisJobStore()
+
+async def stop_jobs() -> None:
+    global job_queue
+    if job_queue is not None:
+        await job_queue.close()
+        job_queue = None
+
+def _get_queue():
+    global job_queue
+    # تولیدکننده Kafka فقط در اولین درخواست ناهمگام ساخته می‌شود
+    if job_queue is None:
+        job_queue = KafkaJobQueue()
+    return job_queue
+
+async def enqueue_job(kind: str, user_id: int, payload: bytes, **meta: Any) -> str:
+    """
+    ثبت کار جدید در صف و برگرداندن شناسه آن
+    """
+    # سقف یکسان برای هر دو صف تا رفتار حالت توسعه با Kafka یکی باشد
+    if len(payload) > settings.KAFKA_MAX_MESSAGE_BYTES:
+        raise JobTooLargeError(
+            f"حجم داده ({len(payload)} بایت) از سقف صف پردازش ({settings.KAFKA_MAX_MESSAGE_BYTES} بایت) بیشتر است"
+        )
+    job_id = uuid.uuid4().hex
+    meta = dict(meta, user_id=user_id, created_at=time.time())
+    record = dict(meta, job_id=job_id, kind=kind, status=QUEUED)
+    await job_store.set(job_id, record)
+    try:
+        await _get_queue().put(kind, job_id, meta, payload)
+    except Exception as e:
+        record.update(status=FAILED, error=str(e), updated_at=time.time())
+        await job_store.set(job_id, record)
+        raise
+    return job_id
+
+async def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    return await job_store.get(job_id)
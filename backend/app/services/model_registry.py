@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# هر مدل یک تابع برداری است: ماتریس ویژگی (نمونه، ویژگی) -> خروجی (نمونه، ...)
+Model = Callable[[np.ndarray], np.ndarray]
+
+class MicroBatcher:
+    """
+    تجمیع درخواست‌های همزمان استنتاج در یک فراخوانی برداری مدل
+
+    اولین درخواست حداکثر max_wait_seconds منتظر درخواست‌های بعدی می‌ماند؛ سپس تمام
+    سطرها به هم چسبانده، یک بار به مدل داده و نتیجه بین درخواست‌ها تقسیم می‌شود.
+    """
+
+    def __init__(self, predict: Model, max_batch_size: int, max_wait_seconds: float):
+        self.predict = predict
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.batches = 0
+        self.requests = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def submit(self, rows: np.ndarray) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+        future = loop.create_future()
+        self._queue.put_nowait((np.atleast_2d(rows), future))
+        return await future
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            size = len(batch[0][0])
+            deadline = loop.time() + self.max_wait_seconds
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                size += len(item[0])
+            await self._execute(batch)
+
+    async def _execute(self, batch: List[Tuple[np.ndarray, asyncio.Future]]) -> None:
+        batch = [(rows, future) for rows, future in batch if not future.done()]
+        if not batch:
+            return
+        self.batches += 1
+        self.requests += len(batch)
+        try:
+            # اجرای مدل خارج از حلقه رویداد؛ بارگذاری تنبل مدل هم همین‌جا انجام می‌شود
+            outputs = await asyncio.get_running_loop().run_in_executor(
+                None, self.predict, np.concatenate([rows for rows, _ in batch])
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        offset = 0
+        for rows, future in batch:
+            if not future.done():
+                future.set_result(outputs[offset:offset + len(rows)])
+            offset += len(rows)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "mean_batch_requests": self.requests / self.batches if self.batches else 0.0,
+        }
+
+class ModelRegistry:
+    """
+    نگهداری مدل‌های یادگیری ماشین به صورت ماندگار در هر پردازه کارگر
+
+    مدل‌ها در اولین استفاده (یا در پس‌زمینه با warm_up) یک بار بارگذاری می‌شوند. اگر
+    load_all پیش از fork شدن کارگرها اجرا شود، وزن‌ها به صورت copy-on-write بین آن‌ها
+    مشترک می‌مانند.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Model]] = {}
+        self._models: Dict[str, Model] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._batchers: Dict[str, MicroBatcher] = {}
+
+    def register(self, name: str, loader: Callable[[], Model]) -> None:
+        self._loaders[name] = loader
+        self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name: str) -> Model:
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        with self._locks[name]:
+            model = self._models.get(name)
+            if model is None:
+                started = time.perf_counter()
+                model = self._loaders[name]()
+                self._models[name] = model
+                logger.info("مدل %s در %.2f ثانیه بارگذاری شد", name, time.perf_counter() - started)
+        return model
+
+    def predict(self, name: str, rows: np.ndarray) -> np.ndarray:
+        """
+        استنتاج همگام مستقیم (برای کدهای خارج از حلقه رویداد مانند کارگر صف)
+        """
+        return self.get(name)(np.atleast_2d(rows))
+
+    async def predict_batched(self, name: str, rows: np.ndarray) -> np.ndarray:
+        """
+        استنتاج با تجمیع درخواست‌های همزمان همین پردازه
+        """
+        batcher = self._batchers.get(name)
+        if batcher is None:
+            batcher = self._batchers[name] = MicroBatcher(
+                lambda batch: self.predict(name, batch),
+                settings.MODEL_BATCH_MAX_SIZE,
+                settings.MODEL_BATCH_WAIT_MS / 1000.0,
+            )
+        return await batcher.submit(rows)
+
+    def load_all(self) -> None:
+        for name in list(self._loaders):
+            try:
+                self.get(name)
+            except Exception:
+                logger.exception("بارگذاری مدل %s ناموفق بود", name)
+
+    def warm_up(self) -> threading.Thread:
+        """
+        بارگذاری مدل‌ها در نخ پس‌زمینه تا راه‌اندازی سرویس معطل آن‌ها نشود
+        """
+        thread = threading.Thread(target=self.load_all, name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    async def stop(self) -> None:
+        for batcher in self._batchers.values():
+            await batcher.stop()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "registered": sorted(self._loaders),
+            "loaded": sorted(self._models),
+            "batching": {name: batcher.stats() for name, batcher in self._batchers.items()},
+        }
+
+# رجیستری سراسری هر پردازه؛ سرویس‌ها مدل‌های خود را هنگام import ثبت می‌کنند
+model_registry = ModelRegistry()
@@ -0,0 +1,144 @@
+from functools import lru_cache
+from typing import Any, Dict, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import signal
+
+from app.core.config import settings
+from app.services.spectral import window_end_times
+
+Report = Dict[str, Any]
+
+@lru_cache(maxsize=64)
+def bandpass_sos(sampling_rate: float, low: float, high: float, order: int) -> np.ndarray:
+    """
+    ضرایب فیلتر میان‌گذر باترورث (SOS) به ازای هر (نرخ نمونه‌برداری، باند)؛ طراحی فقط یک بار انجام می‌شود
+    """
+    return signal.butter(order, (low, high), btype="bandpass", fs=sampling_rate, output="sos")
+
+@lru_cache(maxsize=64)
+def notch_sos(sampling_rate: float, frequency: float, quality: float) -> np.ndarray:
+    """
+    ضرایب فیلتر شکافی (SOS) برای حذف برق شهر
+    """
+    b, a = signal.iirnotch(frequency, quality, fs=sampling_rate)
+    return signal.tf2sos(b, a)
+
+def _filtfilt(sos: np.ndarray, data: np.ndarray) -> np.ndarray:
+    # فیلتر بدون تغییر فاز روی تمام کانال‌ها؛ برای سیگنال‌های کوتاه طول padding کاهش می‌یابد
+    padlen = min(3 * (2 * len(sos) + 1), data.shape[-1] - 1)
+    return signal.sosfiltfilt(sos, data, axis=-1, padlen=padlen)
+
+class BandPass:
+    """
+    فیلتر میان‌گذر بدون تغییر فاز
+    """
+
+    def __init__(self, low: float, high: float, order: int = 4):
+        self.low = low
+        self.high = high
+        self.order = order
+
+    def __call__(self, data: np.ndarray, sampling_rate: float, report: Report) -> np.ndarray:
+        high = min(self.high, 0.9 * sampling_rate / 2)
+        if self.low >= high:
+            raise ValueError("نرخ نمونه‌برداری برای فیلتر میان‌گذر کافی نیست")
+        return _filtfilt(bandpass_sos(float(sampling_rate), self.low, high, self.order), data)
+
+class Notch:
+    """
+    فیلتر شکافی برق شهر (50 یا 60 هرتز)؛ بالاتر از نایکوئیست اعمال نمی‌شود
+    """
+
+    def __init__(self, frequency: float, quality: float = 30.0):
+        self.frequency = frequency
+        self.quality = quality
+
+    def __call__(self, data: np.ndarray, sampling_rate: float, report: Report) -> np.ndarray:
+        if self.frequency >= sampling_rate / 2:
+            return data
+        return _filtfilt(notch_sos(float(sampling_rate), self.frequency, self.quality), data)
+
+class RejectChannels:
+    """
+    حذف کانال‌های صاف (قطع الکترود) و کانال‌هایی که بخش زیادی از نمونه‌هایشان از آستانه دامنه بیشتر است
+
+    آستانه‌ها بر حسب میکروولت هستند؛ برای سیگنال بدون واحد اعلام شده (report["calibrated"] نادرست)
+    فقط کانال‌های کاملاً ثابت رد می‌شوند.
+    """
+
+    def __init__(self, amplitude: float, flat_std: float, max_bad_fraction: float):
+        self.amplitude = amplitude
+        self.flat_std = flat_std
+        self.max_bad_fraction = max_bad_fraction
+
+    def __call__(self, data: np.ndarray, sampling_rate: float, report: Report) -> np.ndarray:
+        std = data.std(axis=-1)
+        if report.get("calibrated"):
+            flat = std < self.flat_std
+            noisy = (np.abs(data) > self.amplitude).mean(axis=-1) > self.max_bad_fraction
+            bad = flat | noisy
+        else:
+            bad = std == 0
+        report["rejected_channels"] = np.flatnonzero(bad).tolist()
+        if bad.all():
+            raise ValueError("تمام کانال‌های EEG به عنوان آرتیفکت رد شدند")
+        return data[~bad] if bad.any() else data
+
+class CommonAverageReference:
+    """
+    مرجع‌دهی مجدد به میانگین کانال‌ها؛ با کمتر از min_channels کانال اعمال نمی‌شود
+    """
+
+    def __init__(self, min_channels: int = 3):
+        self.min_channels = min_channels
+
+    def __call__(self, data: np.ndarray, sampling_rate: float, report: Report) -> np.ndarray:
+        if data.shape[0] < self.min_channels:
+            return data
+        return data - data.mean(axis=0, keepdims=True)
+
+class Pipeline:
+    """
+    زنجیره مراحل پیش‌پردازش روی آرایه (کانال، نمونه)؛ یک بار تعریف و بین درخواست‌ها استفاده می‌شود
+    """
+
+    def __init__(self, steps: Sequence):
+        self.steps = tuple(steps)
+
+    def __call__(self, data: np.ndarray, sampling_rate: float, calibrated: bool = False) -> Tuple[np.ndarray, Report]:
+        data = np.atleast_2d(np.asarray(data, dtype=np.float64))
+        report: Report = {"rejected_channels": [], "calibrated": calibrated}
+        if data.shape[-1] < 2:
+            return data, report
+        for step in self.steps:
+            data = step(data, sampling_rate, report)
+        return data, report
+
+def artifact_windows(data: np.ndarray, sampling_rate: float, amplitude: float) -> np.ndarray:
+    """
+    پنجره‌های خروجی compute_band_powers که دامنه یکی از کانال‌ها در آن‌ها از آستانه بیشتر است
+    """
+    ends = np.rint(window_end_times(data.shape[-1], sampling_rate) * sampling_rate).astype(int)
+    if len(ends) == 0:
+        return np.zeros(0, dtype=bool)
+    nperseg = ends[0]
+    peak = np.abs(data).max(axis=0)
+    return sliding_window_view(peak, nperseg)[ends - nperseg].max(axis=1) > amplitude
+
+def build_pipeline() -> Pipeline:
+    """
+    زنجیره پیش‌فرض از تنظیمات: میان‌گذر، شکافی، رد کانال‌های خراب و مرجع میانگین
+    """
+    steps = [BandPass(settings.EEG_BANDPASS_LOW_HZ, settings.EEG_BANDPASS_HIGH_HZ)]
+    if settings.EEG_NOTCH_HZ:
+        steps.append(Notch(settings.EEG_NOTCH_HZ))
+    steps.append(RejectChannels(
+        settings.EEG_ARTIFACT_AMPLITUDE_UV, settings.EEG_FLATLINE_STD_UV, settings.EEG_ARTIFACT_MAX_BAD_FRACTION
+    ))
+    steps.append(CommonAverageReference())
+    return Pipeline(steps)
+
+# زنجیره مشترک هر پردازه
+eeg_pipeline = build_pipeline()
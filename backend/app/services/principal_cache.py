@@ -0,0 +1,119 @@
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.core.config import settings
+from app.db.redis import get_redis
+from app.schemas.user import Principal
+
+logger = logging.getLogger(__name__)
+
+class MemoryPrincipalCache:
+    """
+    کش LRU با زمان انقضا در حافظه هر پردازه کارگر
+    """
+
+    def __init__(self, ttl_seconds: int, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, subject: str) -> Optional[Principal]:
+        entry = self._entries.get(subject)
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(subject, None)
+            return None
+        self._entries.move_to_end(subject)
+        return principal
+
+    async def set(self, subject: str, principal: Principal) -> None:
+        self._entries[subject] = (time.monotonic() + self.ttl_seconds, principal)
+        self._entries.move_to_end(subject)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def delete(self, *subjects: str) -> None:
+        for subject in subjects:
+            self._entries.pop(subject, None)
+
+class RedisPrincipalCache:
+    """
+    کش مشترک بین پردازه‌ها در Redis با زمان انقضا
+
+    خطاهای Redis فقط ثبت می‌شوند تا احراز هویت به پایگاه داده برگردد.
+    """
+
+    prefix = "principal:"
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+
+    async def get(self, subject: str) -> Optional[Principal]:
+        try:
+            raw = await get_redis().get(self.prefix + subject)
+        except Exception:
+            logger.warning("خواندن کش هویت از Redis ناموفق بود", exc_info=True)
+            return None
+        return Principal.model_validate_json(raw) if raw else None
+
+    async def set(self, subject: str, principal: Principal) -> None:
+        try:
+            await get_redis().set(self.prefix + subject, principal.model_dump_json(), ex=self.ttl_seconds)
+        except Exception:
+            logger.warning("نوشتن کش هویت در Redis ناموفق بود", exc_info=True)
+
+    async def delete(self, *subjects: str) -> None:
+        if not subjects:
+            return
+        try:
+            await get_redis().delete(*(self.prefix + subject for subject in subjects))
+        except Exception:
+            # تغییر در پایگاه داده ثبت شده است؛ نسخه قدیمی حداکثر تا پایان TTL در کش می‌ماند
+            logger.warning("حذف کش هویت از Redis ناموفق بود", exc_info=True)
+
+class NullPrincipalCache:
+    """
+    کش غیرفعال؛ هر درخواست از پایگاه داده خوانده می‌شود
+    """
+
+    async def get(self, subject: str) -> Optional[Principal]:
+        return None
+
+    async def set(self, subject: str, principal: Principal) -> None:
+        pass
+
+    async def delete(self, *subjects: str) -> None:
+        pass
+
+def create_principal_cache():
+    """
+    ساخت کش هویت بر اساس PRINCIPAL_CACHE_BACKEND
+
+    کش memory فقط در همان کارگری پاک می‌شود که کاربر را تغییر داده یا حذف کرده است؛
+    با چند کارگر وب (WEB_CONCURRENCY، تنظیم شده توسط serve.py و gunicorn) کارگرهای دیگر
+    تا پایان TTL هویت قدیمی را می‌پذیرند، بنابراین در این حالت اجرا متوقف می‌شود.
+    """
+    backend = settings.PRINCIPAL_CACHE_BACKEND.lower()
+    if backend == "redis":
+        return RedisPrincipalCache(settings.PRINCIPAL_CACHE_TTL_SECONDS)
+    if backend == "memory":
+        web_workers = int(os.environ.get("WEB_CONCURRENCY", "1") or 1)
+        if web_workers > 1:
+            raise RuntimeError(
+                f"PRINCIPAL_CACHE_BACKEND=memory با {web_workers} کارگر وب امن نیست؛ از redis یا none استفاده کنید"
+            )
+        return MemoryPrincipalCache(settings.PRINCIPAL_CACHE_TTL_SECONDS, settings.PRINCIPAL_CACHE_MAX_SIZE)
+    return NullPrincipalCache()
+
+principal_cache = create_principal_cache()
+
+async def invalidate_principal(*subjects: Optional[str]) -> None:
+    """
+    حذف صریح هویت کاربر از کش پس از تغییر یا حذف حساب
+    """
+    await principal_cache.delete(*(subject for subject in subjects if subject))
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, BinaryIO, Dict, Optional, Union
+
+from app.core.config import settings
+from app.db.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+# اندازه هر بلوک خواندن فایل هنگام محاسبه هش
+_HASH_BLOCK_BYTES = 1024 * 1024
+
+def payload_key(kind: str, payload: Union[bytes, memoryview, BinaryIO], **params: Any) -> str:
+    """
+    کلید محتوا-محور: هش BLAKE2 محتوای آپلود به همراه پارامترهای پردازش و PIPELINE_VERSION
+
+    فایل‌ها بلوک به بلوک خوانده و سپس به ابتدا برگردانده می‌شوند.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    header = dict(params, kind=kind, pipeline=settings.PIPELINE_VERSION)
+    digest.update(json.dumps(header, sort_keys=True, default=str).encode())
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        digest.update(payload)
+    else:
+        for block in iter(lambda: payload.read(_HASH_BLOCK_BYTES), b""):
+            digest.update(block)
+        payload.seek(0)
+    return f"{kind}:{digest.hexdigest()}"
+
+class ResultCache:
+    """
+    کش دوسطحی نتایج پردازش: LRU محدود به حجم در حافظه و در صورت نیاز Redis با زمان انقضا
+
+    نتایج بزرگ‌تر از max_item_bytes ذخیره نمی‌شوند. خطاهای Redis فقط ثبت می‌شوند و
+    درخواست به پردازش کامل برمی‌گردد.
+    """
+
+    prefix = "result:"
+
+    def __init__(self, max_bytes: int, max_item_bytes: int, ttl_seconds: int, use_redis: bool = False):
+        self.max_bytes = max_bytes
+        self.max_item_bytes = max_item_bytes
+        self.ttl_seconds = ttl_seconds
+        self.use_redis = use_redis
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self.counters = {"memory_hits": 0, "redis_hits": 0, "misses": 0, "stores": 0, "skipped": 0}
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.counters["memory_hits"] += 1
+            return entry[0]
+        if self.use_redis:
+            try:
+                raw = await get_redis().get(self.prefix + key)
+            except Exception:
+                logger.warning("خواندن کش نتایج از Redis ناموفق بود", exc_info=True)
+                raw = None
+            if raw:
+                value = json.loads(raw)
+                self._remember(key, value, len(raw))
+                self.counters["redis_hits"] += 1
+                return value
+        self.counters["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        raw = json.dumps(value, separators=(",", ":")).encode()
+        if len(raw) > self.max_item_bytes:
+            self.counters["skipped"] += 1
+            return
+        self._remember(key, value, len(raw))
+        self.counters["stores"] += 1
+        if self.use_redis:
+            try:
+                await get_redis().set(self.prefix + key, raw, ex=self.ttl_seconds)
+            except Exception:
+                logger.warning("نوشتن کش نتایج در Redis ناموفق بود", exc_info=True)
+
+    def _remember(self, key: str, value: Dict[str, Any], size: int) -> None:
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous[1]
+        self._entries[key] = (value, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes and self._entries:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= evicted
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.counters["memory_hits"] + self.counters["redis_hits"]
+        lookups = hits + self.counters["misses"]
+        return dict(
+            self.counters,
+            entries=len(self._entries),
+            bytes=self._bytes,
+            hit_ratio=hits / lookups if lookups else 0.0,
+        )
+
+class NullResultCache:
+    """
+    کش غیرفعال؛ هر آپلود دوباره پردازش می‌شود
+    """
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+def create_result_cache():
+    """
+    ساخت کش نتایج بر اساس RESULT_CACHE_BACKEND (memory، redis یا none)
+    """
+    backend = settings.RESULT_CACHE_BACKEND.lower()
+    if backend not in ("memory", "redis"):
+        return NullResultCache()
+    return ResultCache(
+        settings.RESULT_CACHE_MAX_BYTES,
+        settings.RESULT_CACHE_MAX_ITEM_BYTES,
+        settings.RESULT_CACHE_TTL_SECONDS,
+        use_redis=backend == "redis",
+    )
+
+result_cache = create_result_cache()
@@ -0,0 +1,101 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# محدوده باندهای فرکانسی استاندارد EEG بر حسب هرتز
+BANDS = {
+    "delta": (0.5, 4.0),
+    "theta": (4.0, 8.0),
+    "alpha": (8.0, 13.0),
+    "beta": (13.0, 30.0),
+    "gamma": (30.0, 45.0),
+}
+
+# طول پیش‌فرض هر پنجره و میزان هم‌پوشانی پنجره‌ها (روش Welch)
+DEFAULT_WINDOW_SECONDS = 2.0
+DEFAULT_OVERLAP = 0.5
+
+# حداکثر تعداد عناصر هر بلوک پردازشی برای محدود نگه داشتن مصرف حافظه
+_MAX_BLOCK_ELEMENTS = 8_000_000
+
+
+def _band_matrix(freqs: np.ndarray, bands: dict) -> np.ndarray:
+    """
+    ساخت ماتریس انتگرال‌گیری باندها (باند × فرکانس) برای ضرب ماتریسی با طیف توان
+    """
+    df = freqs[1] - freqs[0] if len(freqs) > 1 else 1.0
+    matrix = np.zeros((len(bands), len(freqs)))
+    for i, (low, high) in enumerate(bands.values()):
+        matrix[i, (freqs >= low) & (freqs < high)] = df
+    return matrix
+
+
+def _window_geometry(n_samples: int, sampling_rate: float, window_seconds: float, overlap: float):
+    """
+    طول هر پنجره و گام بین پنجره‌ها بر حسب نمونه
+    """
+    nperseg = min(n_samples, max(2, int(round(window_seconds * sampling_rate))))
+    step = max(1, int(round(nperseg * (1.0 - overlap))))
+    return nperseg, step
+
+
+def window_end_times(
+    n_samples: int,
+    sampling_rate: float,
+    window_seconds: float = DEFAULT_WINDOW_SECONDS,
+    overlap: float = DEFAULT_OVERLAP,
+) -> np.ndarray:
+    """
+    زمان پایان هر پنجره خروجی compute_band_powers بر حسب ثانیه از ابتدای سیگنال
+    """
+    nperseg, step = _window_geometry(n_samples, sampling_rate, window_seconds, overlap)
+    return np.arange(nperseg, n_samples + 1, step) / sampling_rate
+
+
+def compute_band_powers(
+    data: np.ndarray,
+    sampling_rate: float,
+    window_seconds: float = DEFAULT_WINDOW_SECONDS,
+    overlap: float = DEFAULT_OVERLAP,
+    bands: dict = BANDS,
+) -> np.ndarray:
+    """
+    محاسبه توان باندهای فرکانسی برای تمام کانال‌ها و پنجره‌ها در یک گذر برداری
+
+    data باید آرایه‌ای با ابعاد (کانال، نمونه) باشد. خروجی آرایه‌ای با ابعاد
+    (باند، کانال، پنجره) است که ترتیب باندها همان ترتیب کلیدهای bands است.
+    """
+    data = np.atleast_2d(np.asarray(data))
+    if sampling_rate <= 0:
+        raise ValueError("نرخ نمونه‌برداری باید مثبت باشد")
+    n_channels, n_samples = data.shape
+    if n_channels == 0 or n_samples < 2:
+        raise ValueError("داده EEG برای تحلیل طیفی کافی نیست")
+
+    nperseg, step = _window_geometry(n_samples, sampling_rate, window_seconds, overlap)
+
+    # نمای پنجره‌ها بدون کپی: (کانال، پنجره، نمونه)
+    segments = sliding_window_view(data, nperseg, axis=-1)[:, ::step, :]
+    n_windows = segments.shape[1]
+
+    taper = np.hanning(nperseg)
+    scale = 1.0 / (sampling_rate * np.sum(taper ** 2))
+    freqs = np.fft.rfftfreq(nperseg, d=1.0 / sampling_rate)
+    band_matrix = _band_matrix(freqs, bands)
+    # طیف یک‌طرفه: تمام بین‌ها به جز DC (و نایکوئیست در طول زوج) دو برابر می‌شوند
+    one_sided = np.full(len(freqs), 2.0)
+    one_sided[0] = 1.0
+    if nperseg % 2 == 0:
+        one_sided[-1] = 1.0
+    band_matrix = band_matrix * (one_sided * scale)
+
+    powers = np.empty((n_channels, n_windows, len(bands)))
+    block = max(1, _MAX_BLOCK_ELEMENTS // (n_channels * nperseg))
+    for start in range(0, n_windows, block):
+        chunk = segments[:, start:start + block, :]
+        # حذف مؤلفه DC هر پنجره و اعمال پنجره هنینگ
+        chunk = (chunk - chunk.mean(axis=-1, keepdims=True)) * taper
+        spectrum = np.fft.rfft(chunk, axis=-1)
+        psd = spectrum.real ** 2 + spectrum.imag ** 2
+        powers[:, start:start + block, :] = psd @ band_matrix.T
+
+    return np.moveaxis(powers, -1, 0)
@@ -0,0 +1,73 @@
+import re
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.downsampling import downsample
+from app.services.influx_writer import query_series
+
+# تعداد نقاط هدف وقتی دقت مشخص نشده و سقف نقاط هر پاسخ
+TARGET_POINTS = 500
+MAX_POINTS = 5000
+
+# بازه پیش‌فرض پرس‌وجو وقتی start مشخص نشده است
+DEFAULT_RANGE_SECONDS = 24 * 3600
+
+# ضریب ریزتر بودن داده دریافتی از پایگاه داده برای روش‌های minmax و lttb
+_FINE_FACTOR = 8
+
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+def parse_resolution(resolution: Optional[str]) -> Optional[float]:
+    """
+    تبدیل دقت به ثانیه؛ قالب‌های مجاز: 30، 30s، 5m، 1h، 1d
+    """
+    if not resolution:
+        return None
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)([smhd]?)", resolution.strip())
+    if match is None:
+        raise ValueError("قالب دقت نامعتبر است (نمونه: 30s، 5m، 1h)")
+    return float(match.group(1)) * _UNITS.get(match.group(2) or "s")
+
+def resolve_range(
+    start: Optional[datetime], end: Optional[datetime], resolution: Optional[str]
+) -> Tuple[float, float, float]:
+    """
+    محاسبه بازه زمانی و دقت نهایی (بر حسب ثانیه یونیکس) با اعمال سقف تعداد نقاط
+    """
+    end_ts = _to_epoch(end) if end else time.time()
+    start_ts = _to_epoch(start) if start else end_ts - DEFAULT_RANGE_SECONDS
+    if start_ts >= end_ts:
+        raise ValueError("زمان شروع باید پیش از زمان پایان باشد")
+    span = end_ts - start_ts
+    requested = parse_resolution(resolution)
+    step = requested if requested else span / TARGET_POINTS
+    return start_ts, end_ts, max(step, span / MAX_POINTS, 1e-3)
+
+def _to_epoch(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+async def get_series(
+    user_id: int,
+    measurement: str,
+    fields: List[str],
+    start: float,
+    end: float,
+    resolution: float,
+    method: str = "mean",
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    دریافت سری زمانی کاربر و کاهش نمونه آن در سمت سرور
+
+    پایگاه داده از پیش‌تجمیع‌های ۱ دقیقه، ۱ ساعت و ۱ روز استفاده می‌کند؛ برای mean
+    تجمیع در همان دقت انجام می‌شود و برای minmax و lttb داده کمی ریزتر دریافت می‌شود.
+    """
+    every = resolution if method == "mean" else resolution / _FINE_FACTOR
+    timestamps, columns = await query_series(user_id, measurement, fields, start, end, every)
+    values = np.vstack([columns[field] for field in fields])
+    timestamps, values = downsample(timestamps, values, start, end, resolution, method)
+    return timestamps, {field: values[i] for i, field in enumerate(fields)}
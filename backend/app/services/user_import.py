@@ -0,0 +1,140 @@
+import asyncio
+import csv
+import io
+import json
+from typing import Any, Dict, Iterator, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import get_password_hash
+from app.models.user import User
+from app.schemas.user import UserCreate
+from app.services.cpu_pool import pool_size, run_cpu_bound
+
+# تعداد ردیف‌های هر دستور INSERT و هر پرس‌وجوی بررسی تکراری
+BATCH_SIZE = 1000
+
+# حداقل تعداد رمز عبور در هر بخش هش موازی
+_MIN_HASH_CHUNK = 16
+
+def parse_rows(content: bytes, fmt: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    خواندن ردیف‌های CSV (با سطر عنوان) یا NDJSON همراه با شماره سطر فایل
+    """
+    text = content.decode("utf-8-sig")
+    if fmt == "csv":
+        for line_no, row in enumerate(csv.DictReader(io.StringIO(text)), start=2):
+            yield line_no, {key: value for key, value in row.items() if value not in ("", None)}
+        return
+    for line_no, line in enumerate(text.splitlines(), start=1):
+        if line.strip():
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                row = {"__error__": f"JSON نامعتبر: {e.msg}"}
+            yield line_no, row if isinstance(row, dict) else {"__error__": "هر سطر باید یک شیء JSON باشد"}
+
+def detect_format(filename: str, content_type: str) -> str:
+    """
+    تشخیص قالب فایل از پسوند یا نوع محتوا
+    """
+    if filename.lower().endswith(".csv") or "csv" in (content_type or ""):
+        return "csv"
+    return "ndjson"
+
+def hash_batch(passwords: List[str]) -> List[str]:
+    """
+    هش یک بخش از رمزهای عبور؛ تابع سطح ماژول تا در استخر پردازه قابل اجرا باشد
+    """
+    return [get_password_hash(password) for password in passwords]
+
+async def hash_passwords(passwords: List[str]) -> List[str]:
+    """
+    هش موازی رمزهای عبور روی تمام پردازه‌های استخر محاسباتی
+    """
+    if not passwords:
+        return []
+    parts = max(1, pool_size())
+    size = max(_MIN_HASH_CHUNK, -(-len(passwords) // parts))
+    chunks = [passwords[i:i + size] for i in range(0, len(passwords), size)]
+    hashed = await asyncio.gather(*(run_cpu_bound(hash_batch, chunk) for chunk in chunks))
+    return [value for chunk in hashed for value in chunk]
+
+def _insert_ignoring_duplicates(dialect: str):
+    """
+    دستور INSERT ... ON CONFLICT DO NOTHING مناسب پایگاه داده (PostgreSQL و SQLite)
+    """
+    if dialect == "postgresql":
+        return postgresql.insert(User).on_conflict_do_nothing(index_elements=["email"])
+    if dialect == "sqlite":
+        return sqlite.insert(User).on_conflict_do_nothing(index_elements=["email"])
+    return insert(User)
+
+async def import_users_async(db: AsyncSession, rows: Iterator[Tuple[int, Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    ایجاد گروهی کاربران با گزارش خطای هر ردیف
+
+    ردیف‌ها اعتبارسنجی، ایمیل‌های تکراری فایل و پایگاه داده با پرس‌وجوهای مجموعه‌ای
+    حذف، رمزها به صورت موازی هش و کاربران با INSERT دسته‌ای بدون شکست روی تکراری‌ها
+    درج می‌شوند.
+    """
+    errors: List[Dict[str, Any]] = []
+    valid: Dict[str, Tuple[int, UserCreate]] = {}
+    total = 0
+    for line_no, row in rows:
+        total += 1
+        if "__error__" in row:
+            errors.append({"row": line_no, "email": None, "error": row["__error__"]})
+            continue
+        try:
+            user = UserCreate.model_validate(row)
+        except ValidationError as e:
+            errors.append({"row": line_no, "email": row.get("email"), "error": _describe(e)})
+            continue
+        if user.email in valid:
+            errors.append({"row": line_no, "email": user.email, "error": "ایمیل در فایل تکراری است"})
+            continue
+        valid[user.email] = (line_no, user)
+
+    # حذف ایمیل‌هایی که از قبل در پایگاه داده وجود دارند
+    emails = list(valid)
+    for i in range(0, len(emails), BATCH_SIZE):
+        result = await db.execute(select(User.email).where(User.email.in_(emails[i:i + BATCH_SIZE])))
+        for email in result.scalars():
+            line_no, _ = valid.pop(email)
+            errors.append({"row": line_no, "email": email, "error": "ایمیل وارد شده قبلاً ثبت شده است"})
+
+    pending = list(valid.values())
+    hashed = await hash_passwords([user.password for _, user in pending])
+    statement = _insert_ignoring_duplicates(db.bind.dialect.name).returning(User.email)
+    created = 0
+    for i in range(0, len(pending), BATCH_SIZE):
+        batch = pending[i:i + BATCH_SIZE]
+        result = await db.execute(statement, [
+            {
+                "email": user.email,
+                "name": user.name,
+                "age": user.age,
+                "gender": user.gender,
+                "hashed_password": hashed_password,
+            }
+            for (_, user), hashed_password in zip(batch, hashed[i:i + BATCH_SIZE])
+        ])
+        inserted = set(result.scalars())
+        created += len(inserted)
+        # ردیف‌هایی که همزمان توسط ثبت‌نام دیگری ایجاد شده‌اند
+        for line_no, user in batch:
+            if user.email not in inserted:
+                errors.append({"row": line_no, "email": user.email, "error": "ایمیل وارد شده قبلاً ثبت شده است"})
+        await db.commit()
+
+    errors.sort(key=lambda error: error["row"])
+    return {"total": total, "created": created, "failed": len(errors), "errors": errors}
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors()
+    )
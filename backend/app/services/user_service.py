@@ -1,7 +1,15 @@
+import base64
+import json
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate
-from app.core.security import get_password_hash, verify_password
+from app.schemas.user import User as UserSchema, UserCreate, UserUpdate
+from app.services.principal_cache import invalidate_principal
+from app.core.security import get_password_hash, get_password_hash_async, verify_password
 
 def get_user(db: Session, user_id: int):
     """
@@ -38,32 +46,119 @@ def create_user(db: Session, user: UserCreate):
     db.refresh(db_user)
     return db_user
 
-def update_user(db: Session, user_id: int, user_update: UserUpdate):
+async def get_user_async(db: AsyncSession, user_id: int):
+    """
+    دریافت کاربر با شناسه (ناهمگام)
+    """
+    result = await db.execute(select(User).where(User.id == user_id))
+    return result.scalars().first()
+
+async def get_user_by_email_async(db: AsyncSession, email: str):
+    """
+    دریافت کاربر با ایمیل (ناهمگام)
+    """
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
+
+# فقط ستون‌های طرح‌واره پاسخ User خوانده می‌شوند (بدون hashed_password)
+USER_LIST_COLUMNS = tuple(getattr(User, name) for name in UserSchema.model_fields)
+
+def encode_cursor(created_at: Optional[datetime], user_id: int) -> str:
+    """
+    ساخت cursor مبهم از کلید مرتب‌سازی (created_at، id) آخرین ردیف صفحه
+    """
+    raw = json.dumps([created_at.isoformat() if created_at else None, user_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    بازگشایی cursor؛ در صورت نامعتبر بودن ValueError
+    """
+    try:
+        created_at, user_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(created_at), int(user_id)
+    except Exception:
+        raise ValueError("cursor نامعتبر است")
+
+async def get_users_page_async(
+    db: AsyncSession, limit: int = 100, cursor: Optional[str] = None
+) -> Tuple[List[Dict], Optional[str]]:
+    """
+    دریافت یک صفحه از کاربران با صفحه‌بندی keyset روی (created_at، id)
+
+    هزینه هر صفحه مستقل از عمق آن است؛ خروجی ردیف‌های صفحه و cursor صفحه بعد است.
+    """
+    query = select(*USER_LIST_COLUMNS, User.created_at).order_by(User.created_at, User.id)
+    if cursor:
+        query = query.where(tuple_(User.created_at, User.id) > decode_cursor(cursor))
+    result = await db.execute(query.limit(limit + 1))
+    rows = [dict(row) for row in result.mappings()]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    for row in rows:
+        del row["created_at"]
+    return rows, next_cursor
+
+async def iter_users_async(db: AsyncSession, batch_size: int = 1000) -> AsyncIterator[Dict]:
+    """
+    پیمایش تمام کاربران صفحه به صفحه برای خروجی حجیم بدون بارگذاری کل جدول
+    """
+    cursor = None
+    while True:
+        rows, cursor = await get_users_page_async(db, limit=batch_size, cursor=cursor)
+        for row in rows:
+            yield row
+        if cursor is None:
+            return
+
+async def create_user_async(db: AsyncSession, user: UserCreate):
+    """
+    ایجاد کاربر جدید (ناهمگام)
+    """
+    hashed_password = await get_password_hash_async(user.password)
+    db_user = User(
+        email=user.email,
+        hashed_password=hashed_password,
+        name=user.name,
+        age=user.age,
+        gender=user.gender
+    )
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
+
+async def update_user_async(db: AsyncSession, user_id: int, user_update: UserUpdate):
     """
-    به‌روزرسانی کاربر
+    به‌روزرسانی کاربر (ناهمگام)
     """
-    db_user = get_user(db, user_id)
+    db_user = await get_user_async(db, user_id)
     if db_user:
+        previous_email = db_user.email
         update_data = user_update.dict(exclude_unset=True)
         
         # هش کردن رمز عبور جدید اگر وارد شده باشد
         if "password" in update_data:
-            update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+            update_data["hashed_password"] = await get_password_hash_async(update_data.pop("password"))
         
         for key, value in update_data.items():
             setattr(db_user, key, value)
         
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await db.refresh(db_user)
+        await invalidate_principal(previous_email, db_user.email)
     
     return db_user
 
-def delete_user(db: Session, user_id: int):
+async def delete_user_async(db: AsyncSession, user_id: int):
     """
-    حذف کاربر
+    حذف کاربر (ناهمگام)
     """
-    db_user = get_user(db, user_id)
+    db_user = await get_user_async(db, user_id)
     if db_user:
-        db.delete(db_user)
-        db.commit()
-    return db_user 
\ No newline at end of file
+        await db.delete(db_user)
+        await db.commit()
+        await invalidate_principal(db_user.email)
+    return db_user
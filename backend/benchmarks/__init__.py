@@ -0,0 +1,38 @@
+"""
+بنچمارک‌های کارایی
+
+تمام بنچمارک‌ها بدون سرویس خارجی اجرا می‌شوند: پایگاه داده SQLite، نوشتن InfluxDB در
+حافظه، صف کارهای درون‌فرایندی و کش‌های حافظه. متغیرهای محیطی صریح بر این پیش‌فرض‌ها
+مقدم هستند. نتایج به صورت JSON ذخیره و با benchmarks.compare مقایسه می‌شوند:
+
+    python -m benchmarks.micro --out results/micro.json
+    python -m benchmarks.load_test_api --out results/load.json
+    python -m benchmarks.compare results/base.json results/micro.json
+"""
+import os
+
+# تنظیمات اجرای ایزوله؛ باید پیش از import شدن app.core.config اعمال شوند
+SANDBOX_ENVIRONMENT = {
+    "SECRET_KEY": "benchmark-secret",
+    "DATABASE_URL": "sqlite:///./benchmark.db",
+    "INFLUXDB_URL": "http://localhost:8086",
+    "INFLUXDB_TOKEN": "benchmark",
+    "INFLUXDB_ORG": "benchmark",
+    "INFLUXDB_BUCKET": "benchmark",
+    "INFLUXDB_SINK": "memory",
+    "REDIS_HOST": "localhost",
+    "REDIS_PORT": "6379",
+    "REDIS_DB": "0",
+    "REDIS_PASSWORD": "",
+    "PRINCIPAL_CACHE_BACKEND": "memory",
+    "RESULT_CACHE_BACKEND": "none",
+    "KAFKA_BOOTSTRAP_SERVERS": "localhost:9092",
+    "KAFKA_EEG_TOPIC": "eeg",
+    "KAFKA_AUDIO_TOPIC": "audio",
+    "JOB_QUEUE_BACKEND": "memory",
+    "MODEL_WARMUP": "false",
+    "EEG_ARCHIVE_DIR": "./benchmark_archive",
+}
+
+for _key, _value in SANDBOX_ENVIRONMENT.items():
+    os.environ.setdefault(_key, _value)
@@ -0,0 +1,108 @@
+"""
+بنچمارک مقیاس‌پذیری توان عملیاتی /api/data/eeg با تعداد کارگرهای serve.py
+
+برای هر تعداد کارگر یک سرور واقعی با serve.py اجرا، با آپلودهای همزمان EEG بارگذاری و
+تعداد درخواست در ثانیه گزارش می‌شود. کش نتایج غیرفعال است تا هر آپلود واقعاً پردازش شود.
+کش هویت نیز غیرفعال است (کش memory با چند کارگر مجاز نیست) تا نتایج تعداد کارگرها قابل مقایسه باشند.
+پایگاه داده و سایر تنظیمات از محیط خوانده می‌شوند (برای اجرای محلی: DATABASE_URL=sqlite:///./bench.db).
+
+اجرا از پوشه backend:
+    python -m benchmarks.bench_scaling --workers 1 2 4 8 --requests 400 --concurrency 64
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.fixtures import eeg_binary_request, synthetic_eeg
+from benchmarks.results import latency_stats, write_results
+from app.db.session import engine
+from app.models.base import Base
+from app.models import baseline, user  # noqa: F401 - ثبت جدول‌ها در metadata
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    env = dict(os.environ, RESULT_CACHE_BACKEND="none", PRINCIPAL_CACHE_BACKEND="none")
+    return subprocess.Popen(
+        [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 120.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError("سرور در زمان مقرر آماده نشد")
+
+async def measure(args, workers: int) -> dict:
+    server = start_server(workers, args.port)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=120.0) as client:
+            await wait_ready(client)
+            email = "scaling@example.com"
+            await client.post("/api/auth/register", json={"email": email, "name": "bench", "password": "bench-password"})
+            response = await client.post("/api/auth/login", data={"username": email, "password": "bench-password"})
+            body, headers = eeg_binary_request(synthetic_eeg(args.channels, args.rate, args.seconds), args.rate)
+            headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+            latencies = []
+            semaphore = asyncio.Semaphore(args.concurrency)
+
+            async def one():
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.post("/api/data/eeg", content=body, headers=headers)
+                    response.raise_for_status()
+                    latencies.append(time.perf_counter() - started)
+
+            # گرم کردن کارگرها و استخرهای محاسباتی پیش از اندازه‌گیری
+            await asyncio.gather(*(one() for _ in range(workers * 2)))
+            latencies.clear()
+            started = time.perf_counter()
+            await asyncio.gather(*(one() for _ in range(args.requests)))
+            elapsed = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait()
+    return dict(latency_stats(latencies), requests_per_sec=args.requests / elapsed)
+
+async def run(args) -> dict:
+    Base.metadata.create_all(bind=engine)
+    results = {}
+    baseline_rps = None
+    for workers in args.workers:
+        result = await measure(args, workers)
+        baseline_rps = baseline_rps or result["requests_per_sec"]
+        result["speedup"] = result["requests_per_sec"] / baseline_rps
+        results[f"scaling.workers_{workers}"] = result
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--channels", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=256.0)
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--out", type=Path)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    parameters = {key: value for key, value in vars(args).items() if key not in ("out", "port")}
+    write_results(args.out, "bench_scaling", parameters, results)
+
+if __name__ == "__main__":
+    main()
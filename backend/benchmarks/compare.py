@@ -0,0 +1,57 @@
+"""
+مقایسه دو فایل نتیجه بنچمارک و تشخیص پسرفت
+
+برای هر معیار مشترک تغییر نسبی گزارش می‌شود. اگر کاهش توان عملیاتی یا افزایش p99 یا
+حافظه از آستانه بیشتر باشد، کد خروج 1 برمی‌گردد تا در CI قابل استفاده باشد.
+
+اجرا از پوشه backend:
+    python -m benchmarks.compare results/base.json results/head.json --threshold 0.10
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# جهت مطلوب هر معیار: 1 یعنی بیشتر بهتر و -1 یعنی کمتر بهتر
+METRICS = {
+    "ops_per_sec": 1,
+    "requests_per_sec": 1,
+    "p50_ms": -1,
+    "p99_ms": -1,
+    "peak_alloc_mb": -1,
+    "max_rss_mb": -1,
+}
+
+def compare(baseline: dict, current: dict, threshold: float):
+    """
+    تولید ردیف‌های (معیار، مقدار پایه، مقدار فعلی، تغییر نسبی، پسرفت)
+    """
+    for name, stats in current["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            continue
+        for metric, direction in METRICS.items():
+            if metric not in stats or not reference.get(metric):
+                continue
+            change = (stats[metric] - reference[metric]) / reference[metric]
+            yield f"{name}.{metric}", reference[metric], stats[metric], change, change * direction < -threshold
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.10, help="تغییر نسبی مجاز (0.10 یعنی 10٪)")
+    args = parser.parse_args()
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    current = json.loads(args.current.read_text(encoding="utf-8"))
+    regressions = 0
+    for metric, before, after, change, regressed in compare(baseline, current, args.threshold):
+        regressions += regressed
+        flag = "REGRESSION" if regressed else ""
+        print(f"{metric:48s} {before:12.2f} -> {after:12.2f} {change:+8.1%} {flag}")
+    print(f"{regressions} پسرفت بیش از {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+داده‌های مصنوعی قابل تکرار برای بنچمارک‌ها
+"""
+import io
+import wave
+from typing import Dict, Tuple
+
+import numpy as np
+
+# دامنه نسبی نوسان هر باند در EEG مصنوعی
+_EEG_RHYTHMS = ((2.0, 1.0), (6.0, 0.6), (10.0, 0.8), (20.0, 0.4), (38.0, 0.2))
+
+def synthetic_eeg(channels: int = 8, rate: float = 256.0, seconds: float = 60.0, seed: int = 0) -> np.ndarray:
+    """
+    EEG مصنوعی با ابعاد (کانال، نمونه): مجموع ریتم‌های پنج باند با فاز تصادفی به علاوه نویز
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(rate * seconds)) / rate
+    signal = rng.standard_normal((channels, len(t))) * 0.5
+    for frequency, amplitude in _EEG_RHYTHMS:
+        phases = rng.uniform(0, 2 * np.pi, (channels, 1))
+        gains = amplitude * rng.uniform(0.5, 1.5, (channels, 1))
+        signal += gains * np.sin(2 * np.pi * frequency * t + phases)
+    return signal.astype(np.float32)
+
+def eeg_binary_request(signal: np.ndarray, rate: float) -> Tuple[bytes, Dict[str, str]]:
+    """
+    بدنه و هدرهای آپلود باینری خام (نمونه‌های درهم float32) برای /api/data/eeg
+    """
+    headers = {
+        "content-type": "application/octet-stream",
+        "x-eeg-channels": ",".join(f"ch{i}" for i in range(signal.shape[0])),
+        "x-eeg-sampling-rate": str(rate),
+    }
+    return np.ascontiguousarray(signal.T, dtype="<f4").tobytes(), headers
+
+def synthetic_speech_wav(seconds: float = 30.0, rate: int = 16000, seed: int = 0) -> bytes:
+    """
+    فایل WAV مونو 16 بیتی شبیه گفتار: گام متغیر با هارمونیک‌ها، هجاهای متناوب و نویز
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(rate * seconds)) / rate
+    pitch = 150.0 + 40.0 * np.sin(2 * np.pi * 0.3 * t) + 10.0 * rng.standard_normal(len(t)).cumsum() / rate
+    phase = 2 * np.pi * np.cumsum(pitch) / rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    syllables = (np.sin(2 * np.pi * 3.0 * t) > -0.2).astype(float)
+    audio = 0.3 * voiced * syllables + 0.02 * rng.standard_normal(len(t))
+    samples = np.clip(audio / np.abs(audio).max(), -1, 1) * 32767 * 0.8
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as output:
+        output.setnchannels(1)
+        output.setsampwidth(2)
+        output.setframerate(rate)
+        output.writeframes(samples.astype("<i2").tobytes())
+    return buffer.getvalue()
@@ -0,0 +1,114 @@
+"""
+آزمون بار درون‌فرایندی برای ورود و آپلود همزمان EEG
+
+برنامه FastAPI بدون سرور HTTP و از طریق ASGITransport در همان حلقه رویداد اجرا
+می‌شود؛ بنابراین هر فراخوانی مسدودکننده مستقیماً در تأخیر سایر درخواست‌ها دیده می‌شود.
+پایگاه داده SQLite و InfluxDB، صف و کش‌ها درون حافظه هستند (بسته benchmarks). هر آپلود
+بدنه متفاوتی دارد تا کش نتایج روی اندازه‌گیری اثر نگذارد. جدول‌ها در هر اجرا حذف و دوباره
+ساخته می‌شوند، بنابراین DATABASE_URL محیط نادیده گرفته و همیشه LOAD_TEST_DATABASE_URL
+استفاده می‌شود.
+
+اجرا از پوشه backend:
+    python -m benchmarks.load_test_api --users 20 --requests 200 --concurrency 50 --out results/load.json
+"""
+import argparse
+import asyncio
+import os
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+# پیش از import برنامه؛ پایگاه داده محیط (توسعه یا عملیاتی) هرگز پاک نمی‌شود
+LOAD_TEST_DATABASE_URL = "sqlite:///./load_test.db"
+os.environ["DATABASE_URL"] = LOAD_TEST_DATABASE_URL
+
+from benchmarks.fixtures import eeg_binary_request, synthetic_eeg
+from benchmarks.results import latency_stats, max_rss_mb, write_results
+from app.db.session import engine
+from app.main import app, shutdown, startup
+from app.models.base import Base
+from app.models import baseline, user  # noqa: F401 - ثبت جدول‌ها در metadata
+
+async def timed(latencies, name, coro):
+    started = time.perf_counter()
+    response = await coro
+    latencies.setdefault(name, []).append(time.perf_counter() - started)
+    return response
+
+async def run(args) -> dict:
+    if str(engine.url) != LOAD_TEST_DATABASE_URL:
+        raise SystemExit(f"آزمون بار فقط روی {LOAD_TEST_DATABASE_URL} اجرا می‌شود، نه {engine.url}")
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    await startup()
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+            # ایجاد کاربران آزمایشی و دریافت توکن
+            tokens = []
+            for i in range(args.users):
+                email = f"load{i}@example.com"
+                await client.post("/api/auth/register", json={"email": email, "name": "load", "password": "loadtest-password"})
+                response = await client.post("/api/auth/login", data={"username": email, "password": "loadtest-password"})
+                tokens.append(response.json()["access_token"])
+
+            body, eeg_headers = eeg_binary_request(synthetic_eeg(args.channels, args.rate, args.seconds), args.rate)
+            bodies = [bytes(body[:-4]) + np.float32(i).tobytes() for i in range(args.requests)]
+
+            latencies = {}
+            failures = 0
+            semaphore = asyncio.Semaphore(args.concurrency)
+
+            async def one(i):
+                nonlocal failures
+                async with semaphore:
+                    user = i % args.users
+                    if i % 2:
+                        response = await timed(latencies, "login", client.post(
+                            "/api/auth/login",
+                            data={"username": f"load{user}@example.com", "password": "loadtest-password"},
+                        ))
+                    else:
+                        response = await timed(latencies, "eeg_upload", client.post(
+                            "/api/data/eeg",
+                            content=bodies[i],
+                            headers={**eeg_headers, "Authorization": f"Bearer {tokens[user]}"},
+                        ))
+                    failures += response.status_code >= 400
+
+            started = time.perf_counter()
+            await asyncio.gather(*(one(i) for i in range(args.requests)))
+            elapsed = time.perf_counter() - started
+    finally:
+        await shutdown()
+
+    results = {}
+    for name, values in sorted(latencies.items()):
+        results[f"load.{name}"] = dict(latency_stats(values), requests_per_sec=len(values) / elapsed)
+    results["load.total"] = {
+        "n": args.requests,
+        "requests_per_sec": args.requests / elapsed,
+        "failures": failures,
+        "max_rss_mb": max_rss_mb(),
+    }
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--channels", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=256.0)
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--out", type=Path)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    parameters = {key: value for key, value in vars(args).items() if key != "out"}
+    write_results(args.out, "load_test_api", parameters, results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+ریزبنچمارک مسیرهای پرهزینه: تحلیل طیفی، process_eeg_data، process_audio_data، هش رمز عبور و
+سریال‌سازی پاسخ‌های عددی
+
+اجرا از پوشه backend:
+    python -m benchmarks.micro --channels 64 --rate 256 --seconds 600 --out results/micro.json
+    python -m benchmarks.micro --only eeg spectral
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from benchmarks.fixtures import eeg_binary_request, synthetic_eeg, synthetic_speech_wav
+from benchmarks.results import measure, write_results
+from app.api.responses import MsgPackResponse, NumericJSONResponse
+from app.core.security import get_password_hash
+from app.schemas.data import EEGData
+from app.services.audio_service import process_audio_data
+from app.services.eeg_codec import decode_eeg_body
+from app.services.eeg_service import analyze_eeg_signal, process_eeg_data
+from app.services.spectral import compute_band_powers
+
+def per_channel_band_powers(data, sampling_rate):
+    """
+    پیاده‌سازی مرجع: محاسبه توان باندها با حلقه پایتونی روی کانال‌ها و پنجره‌ها
+    """
+    results = []
+    nperseg = int(round(2.0 * sampling_rate))
+    for channel in data:
+        windows = []
+        for start in range(0, len(channel) - nperseg + 1, nperseg // 2):
+            segment = channel[start:start + nperseg]
+            windows.append(compute_band_powers(segment[np.newaxis, :], sampling_rate)[:, 0, 0])
+        results.append(windows)
+    return np.transpose(np.array(results), (2, 0, 1))
+
+def spectral_benchmarks(args, signal):
+    data = signal.astype(np.float64)
+    np.testing.assert_allclose(
+        compute_band_powers(data[:2], args.rate), per_channel_band_powers(data[:2], args.rate), rtol=1e-6
+    )
+    return {
+        "spectral.vectorized": measure(lambda: compute_band_powers(data, args.rate), args.repeat),
+        "spectral.per_channel_loop": measure(lambda: per_channel_band_powers(data, args.rate), 1, warmup=0),
+    }
+
+def eeg_benchmarks(args, signal):
+    eeg_data = EEGData(
+        channels=[f"ch{i}" for i in range(signal.shape[0])],
+        timestamps=[],
+        values=signal.astype(np.float64).tolist(),
+        sampling_rate=args.rate,
+        unit="uV",
+    )
+    body, headers = eeg_binary_request(signal, args.rate)
+    return {
+        "eeg.process_eeg_data": measure(lambda: process_eeg_data(None, 1, eeg_data), args.repeat),
+        "eeg.binary_decode_analyze": measure(
+            lambda: analyze_eeg_signal(decode_eeg_body(body, headers["content-type"], headers)[0], args.rate, True),
+            args.repeat,
+        ),
+    }
+
+def audio_benchmarks(args, _):
+    wav = synthetic_speech_wav(args.audio_seconds)
+    # اجرای گرم‌کننده کامپایل JIT librosa را از اندازه‌گیری خارج می‌کند
+    return {"audio.process_audio_data": measure(lambda: process_audio_data(None, 1, wav), args.repeat)}
+
+def security_benchmarks(args, _):
+    return {"security.get_password_hash": measure(lambda: get_password_hash("benchmark-password"), args.repeat)}
+
+def serialization_benchmarks(args, signal):
+    # پاسخ سری زمانی /api/data/brainwave با یک نقطه به ازای هر ستون سیگنال
+    series = {band: np.abs(row) for band, row in zip(("alpha", "beta", "delta", "theta", "gamma"), signal[:5])}
+    series["timestamps"] = np.arange(signal.shape[1], dtype=np.float64)
+    as_lists = {key: value.astype(np.float64).tolist() for key, value in series.items()}
+    return {
+        "serialization.jsonable_encoder": measure(lambda: JSONResponse(jsonable_encoder(as_lists)), args.repeat),
+        "serialization.orjson_numpy": measure(lambda: NumericJSONResponse(series), args.repeat),
+        "serialization.msgpack_columnar": measure(lambda: MsgPackResponse(series), args.repeat),
+    }
+
+SUITES = {
+    "spectral": spectral_benchmarks,
+    "eeg": eeg_benchmarks,
+    "audio": audio_benchmarks,
+    "security": security_benchmarks,
+    "serialization": serialization_benchmarks,
+}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--channels", type=int, default=32)
+    parser.add_argument("--rate", type=float, default=256.0)
+    parser.add_argument("--seconds", type=float, default=300.0, help="طول EEG مصنوعی")
+    parser.add_argument("--audio-seconds", type=float, default=60.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="+", choices=sorted(SUITES), default=sorted(SUITES))
+    parser.add_argument("--out", type=Path)
+    args = parser.parse_args()
+
+    signal = synthetic_eeg(args.channels, args.rate, args.seconds, args.seed)
+    results = {}
+    for name in args.only:
+        results.update(SUITES[name](args, signal))
+    parameters = {key: value for key, value in vars(args).items() if key != "out"}
+    write_results(args.out, "micro", parameters, results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+اندازه‌گیری و ذخیره نتایج بنچمارک‌ها در قالب JSON قابل مقایسه
+"""
+import json
+import os
+import platform
+import resource
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+def latency_stats(seconds: List[float]) -> Dict[str, float]:
+    """
+    خلاصه تأخیرها بر حسب میلی‌ثانیه
+    """
+    values = np.asarray(seconds) * 1000
+    if len(values) == 0:
+        return {"n": 0}
+    return {
+        "n": int(len(values)),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "min_ms": float(values.min()),
+    }
+
+def measure(func: Callable[[], Any], repeat: int = 5, warmup: int = 1) -> Dict[str, float]:
+    """
+    اجرای تکراری یک تابع و گزارش تأخیر، توان عملیاتی و بیشینه حافظه تخصیص یافته یک اجرا
+    """
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    # حافظه در اجرای جداگانه اندازه‌گیری می‌شود تا سربار tracemalloc در زمان‌ها نباشد
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    stats = latency_stats(timings)
+    stats["ops_per_sec"] = repeat / sum(timings)
+    stats["peak_alloc_mb"] = peak / 2 ** 20
+    return stats
+
+def max_rss_mb() -> float:
+    """
+    بیشینه حافظه مقیم پردازه (لینوکس: کیلوبایت)
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+def write_results(path: Optional[Path], suite: str, parameters: Dict[str, Any], results: Dict[str, Dict]) -> None:
+    """
+    چاپ خلاصه نتایج و ذخیره آن‌ها در فایل JSON (در صورت تعیین مسیر)
+    """
+    for name, stats in results.items():
+        summary = " ".join(
+            f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}" for key, value in stats.items()
+        )
+        print(f"{name:32s} {summary}")
+    if path is None:
+        return
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {"suite": suite, "environment": environment(), "parameters": parameters, "results": results}
+    path.write_text(json.dumps(document, indent=2), encoding="utf-8")
+    print(f"نتایج در {path} ذخیره شد")
@@ -0,0 +1,40 @@
+import argparse
+import asyncio
+import json
+import logging
+from pathlib import Path
+
+from app.db.session import AsyncSessionLocal
+from app.services.cpu_pool import stop_cpu_pool
+from app.services.user_import import detect_format, import_users_async, parse_rows
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def run(path: Path, fmt: str) -> dict:
+    async with AsyncSessionLocal() as db:
+        return await import_users_async(db, parse_rows(path.read_bytes(), fmt))
+
+def main() -> None:
+    """
+    اسکریپت ایجاد گروهی کاربران از فایل CSV یا NDJSON
+    """
+    parser = argparse.ArgumentParser(description="ایجاد گروهی کاربران از فایل CSV یا NDJSON")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=("csv", "ndjson"), help="پیش‌فرض: بر اساس پسوند فایل")
+    parser.add_argument("--errors", type=Path, help="ذخیره خطاهای هر ردیف در این فایل JSON")
+    args = parser.parse_args()
+
+    fmt = args.format or detect_format(args.path.name, "")
+    try:
+        report = asyncio.run(run(args.path, fmt))
+    finally:
+        stop_cpu_pool()
+    logger.info("%s ردیف: %s کاربر ایجاد شد، %s ردیف ناموفق", report["total"], report["created"], report["failed"])
+    for error in report["errors"][:20]:
+        logger.warning("سطر %s (%s): %s", error["row"], error["email"], error["error"])
+    if args.errors:
+        args.errors.write_text(json.dumps(report["errors"], ensure_ascii=False, indent=2), encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
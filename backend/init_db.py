@@ -1,7 +1,9 @@
 import logging
 
+from app.core.config import settings
 from app.db.init_db import init_db
 from app.db.session import SessionLocal
+from app.services.influx_writer import InfluxDBSink
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -14,6 +16,14 @@ def main() -> None:
     db = SessionLocal()
     init_db(db)
     logger.info("پایگاه داده اولیه ایجاد شد")
+    
+    # ایجاد سطل‌ها و وظایف پیش‌تجمیع سری‌های زمانی
+    if settings.INFLUXDB_SINK.lower() != "memory" and settings.INFLUXDB_ROLLUPS_ENABLED:
+        logger.info("ایجاد پیش‌تجمیع‌های InfluxDB")
+        sink = InfluxDBSink(
+            settings.INFLUXDB_URL, settings.INFLUXDB_TOKEN, settings.INFLUXDB_ORG, settings.INFLUXDB_BUCKET
+        )
+        sink.ensure_rollups()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,206 @@
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.services.eeg_archive import eeg_archive
+from app.services.influx_writer import TimeSeriesPoint, build_eeg_points, create_sink
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# بخش کار: (کاربر، شروع بازه، پایان بازه)؛ هر رکورد بایگانی به بخشی تعلق دارد که شروعش در آن است
+Shard = Tuple[int, float, float]
+
+def shard_id(shard: Shard) -> str:
+    return f"{shard[0]}:{shard[1]:.0f}"
+
+def parse_time(value: str) -> float:
+    """
+    زمان به صورت ثانیه یونیکس یا ISO 8601
+    """
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+def plan_shards(users: List[int], start: Optional[float], end: Optional[float], shard_seconds: float) -> List[Shard]:
+    """
+    تقسیم کار بر اساس کاربر و بازه زمانی؛ فقط بازه‌هایی که رکورد بایگانی دارند
+    """
+    shards = []
+    for user_id in users:
+        starts = {
+            math.floor(record.start_time / shard_seconds) * shard_seconds
+            for record in eeg_archive.records(user_id, start, end)
+            if (start is None or record.start_time >= start) and (end is None or record.start_time < end)
+        }
+        shards.extend((user_id, shard_start, shard_start + shard_seconds) for shard_start in sorted(starts))
+    return shards
+
+def reprocess_shard(shard: Shard, pipeline: str, start: Optional[float], end: Optional[float]) -> Tuple[Shard, List[TimeSeriesPoint], int]:
+    """
+    تحلیل دوباره رکوردهای یک بخش در پردازه فرزند؛ هر رکورد کامل و مانند آپلود اصلی تحلیل می‌شود
+    """
+    from app.services.eeg_service import analyze_eeg_signal
+
+    user_id, shard_start, shard_end = shard
+    low = shard_start if start is None else max(shard_start, start)
+    high = shard_end if end is None else min(shard_end, end)
+    points: List[TimeSeriesPoint] = []
+    samples = 0
+    for record in eeg_archive.records(user_id, low, high):
+        if not low <= record.start_time < high:
+            continue
+        data, first_time = eeg_archive.read(user_id, record)
+        try:
+            result = analyze_eeg_signal(data, record.sampling_rate, record.calibrated)
+        except ValueError as e:
+            logger.warning("رکورد %s/%s@%s رد شد: %s", user_id, record.segment, record.offset, e)
+            continue
+        points.extend(build_eeg_points(user_id, result, first_time, pipeline=pipeline))
+        samples += record.samples * len(record.channels)
+    return shard, points, samples
+
+class Checkpoint:
+    """
+    فهرست بخش‌های تکمیل شده در فایل jsonl؛ هر بخش پس از نوشتن نقاط و پیش‌تجمیع‌هایش ثبت می‌شود
+
+    اجرای مجدد با همان فایل، بخش‌های ثبت شده را رد می‌کند. بخشی که نقاطش نوشته شده ولی
+    ثبت نشده دوباره پردازش می‌شود و نوشتن دوباره همان نقاط در InfluxDB بی‌اثر است.
+    """
+
+    def __init__(self, path: Path, pipeline: str, shard_hours: float):
+        self.path = path
+        self.done: Set[str] = set()
+        if path.exists():
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        continue
+                    entry = json.loads(line)
+                    if "pipeline" in entry and entry["pipeline"] != pipeline:
+                        raise SystemExit(f"فایل {path} متعلق به نسخه {entry['pipeline']} است")
+                    # شناسه بخش‌ها به طول بخش وابسته است
+                    if "shard_hours" in entry and entry["shard_hours"] != shard_hours:
+                        raise SystemExit(f"فایل {path} با --shard-hours {entry['shard_hours']} ساخته شده است")
+                    if "shard" in entry:
+                        self.done.add(entry["shard"])
+        else:
+            self._append([{"pipeline": pipeline, "shard_hours": shard_hours, "created_at": time.time()}])
+
+    def mark(self, shards: List[Dict]) -> None:
+        self._append(shards)
+        self.done.update(entry["shard"] for entry in shards)
+
+    def _append(self, entries: List[Dict]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(entry) + "\n" for entry in entries))
+            f.flush()
+            os.fsync(f.fileno())
+
+async def run(args: argparse.Namespace) -> None:
+    pipeline = args.pipeline_version
+    checkpoint = Checkpoint(args.checkpoint or Path(f"reprocess-{pipeline}.checkpoint"), pipeline, args.shard_hours)
+    users = args.users or eeg_archive.users()
+    shards = [
+        shard for shard in plan_shards(users, args.start, args.end, args.shard_hours * 3600)
+        if shard_id(shard) not in checkpoint.done
+    ]
+    logger.info(
+        "%s بخش برای %s کاربر (نسخه %s، %s بخش قبلاً انجام شده)", len(shards), len(users), pipeline, len(checkpoint.done)
+    )
+    if not shards:
+        return
+
+    sink = create_sink()
+    loop = asyncio.get_running_loop()
+    processes = args.processes or os.cpu_count() or 1
+    # محدود کردن بخش‌های در جریان تا نتایج در حافظه انباشته نشوند
+    in_flight = asyncio.Semaphore(processes * 2)
+    pending_points: List[TimeSeriesPoint] = []
+    pending_shards: List[Dict] = []
+    # بازه زمانی نقاط هر بخش برای محاسبه دوباره پیش‌تجمیع‌ها
+    pending_ranges: List[Tuple[int, float, float]] = []
+    totals = {"shards": 0, "samples": 0, "points": 0}
+    started = time.perf_counter()
+
+    async def flush() -> None:
+        if not pending_shards:
+            return
+        for i in range(0, len(pending_points), args.batch_size):
+            await sink.write(pending_points[i:i + args.batch_size])
+        if settings.INFLUXDB_ROLLUPS_ENABLED:
+            for user_id, first, last in pending_ranges:
+                await sink.backfill_rollups(user_id, first, last, pipeline)
+        checkpoint.mark(pending_shards)
+        totals["shards"] += len(pending_shards)
+        totals["points"] += len(pending_points)
+        pending_points.clear()
+        pending_shards.clear()
+        pending_ranges.clear()
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "%s/%s بخش، %s نقطه، %.0f نمونه در ثانیه",
+            totals["shards"], len(shards), totals["points"], totals["samples"] / max(elapsed, 1e-9),
+        )
+
+    async def one(executor: ProcessPoolExecutor, shard: Shard):
+        async with in_flight:
+            return await loop.run_in_executor(executor, reprocess_shard, shard, pipeline, args.start, args.end)
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        tasks = [asyncio.ensure_future(one(executor, shard)) for shard in shards]
+        try:
+            for task in asyncio.as_completed(tasks):
+                shard, points, samples = await task
+                totals["samples"] += samples
+                pending_points.extend(points)
+                pending_shards.append({"shard": shard_id(shard), "samples": samples, "points": len(points)})
+                if points:
+                    times = [point.timestamp for point in points]
+                    pending_ranges.append((shard[0], min(times), max(times)))
+                if len(pending_points) >= args.batch_size:
+                    await flush()
+            await flush()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await sink.close()
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "پایان: %s نمونه در %.1f ثانیه (%.0f نمونه در ثانیه)",
+        totals["samples"], elapsed, totals["samples"] / max(elapsed, 1e-9),
+    )
+
+def main() -> None:
+    """
+    اسکریپت پردازش مجدد داده‌های خام بایگانی شده EEG با نسخه فعلی الگوریتم‌ها
+
+    نتایج با برچسب pipeline نوشته می‌شوند تا در کنار نتایج نسخه‌های قبلی باقی بمانند و
+    پیش‌تجمیع‌های بازه‌های پردازش شده دوباره محاسبه می‌شوند. سرویس نتایج نسخه
+    PIPELINE_VERSION را نمایش می‌دهد و در هر پنجره آن را بر نتایج بدون برچسب قدیمی ترجیح
+    می‌دهد. صدا در بایگانی خام نگهداری نمی‌شود و پردازش مجدد نمی‌شود.
+    """
+    parser = argparse.ArgumentParser(description="پردازش مجدد موازی و قابل ادامه داده‌های خام EEG")
+    parser.add_argument("--pipeline-version", default=settings.PIPELINE_VERSION, help="برچسب نسخه نتایج")
+    parser.add_argument("--users", type=int, nargs="+", help="پیش‌فرض: تمام کاربران بایگانی")
+    parser.add_argument("--start", type=parse_time, help="ثانیه یونیکس یا ISO 8601")
+    parser.add_argument("--end", type=parse_time, help="ثانیه یونیکس یا ISO 8601")
+    parser.add_argument("--shard-hours", type=float, default=24.0, help="طول بازه زمانی هر بخش کار")
+    parser.add_argument("--processes", type=int, default=0, help="صفر یعنی به تعداد هسته‌ها")
+    parser.add_argument("--batch-size", type=int, default=settings.INFLUXDB_BATCH_SIZE, help="تعداد نقاط هر نوشتن")
+    parser.add_argument("--checkpoint", type=Path, help="پیش‌فرض: reprocess-<نسخه>.checkpoint")
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import logging
+import os
+
+from app.core.config import settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="اجرای سرویس API در حالت تولید با چند کارگر")
+    parser.add_argument("--host", default=settings.API_HOST)
+    parser.add_argument("--port", type=int, default=settings.API_PORT)
+    parser.add_argument("--workers", type=int, default=settings.WEB_CONCURRENCY, help="صفر یعنی به تعداد هسته‌ها")
+    parser.add_argument("--preload", action=argparse.BooleanOptionalAction, default=settings.WEB_PRELOAD)
+    parser.add_argument("--timeout", type=int, default=settings.WEB_TIMEOUT)
+    parser.add_argument("--graceful-timeout", type=int, default=settings.WEB_GRACEFUL_TIMEOUT)
+    parser.add_argument("--max-requests", type=int, default=settings.WEB_MAX_REQUESTS)
+    parser.add_argument("--reload", action="store_true", help="حالت توسعه: یک پردازه uvicorn با بارگذاری مجدد")
+    return parser.parse_args()
+
+def when_ready(server) -> None:
+    server.log.info("سرویس با %s کارگر آماده است (SIGHUP: راه‌اندازی مجدد تدریجی)", server.num_workers)
+
+def run_gunicorn(args: argparse.Namespace, workers: int) -> None:
+    """
+    اجرای gunicorn با کارگرهای uvicorn؛ هر کارگر حالت مستقل خود را دارد (shared-nothing)
+
+    با preload برنامه و مدل‌ها یک بار در پردازه اصلی بارگذاری و به صورت copy-on-write
+    بین کارگرها به اشتراک گذاشته می‌شوند. SIGHUP کارگرها را یکی‌یکی و بدون قطع
+    درخواست‌های جاری جایگزین می‌کند.
+    """
+    from gunicorn.app.base import BaseApplication
+
+    class Application(BaseApplication):
+        def load_config(self):
+            options = {
+                "bind": f"{args.host}:{args.port}",
+                "workers": workers,
+                "worker_class": "uvicorn.workers.UvicornWorker",
+                "preload_app": args.preload,
+                "timeout": args.timeout,
+                "graceful_timeout": args.graceful_timeout,
+                "max_requests": args.max_requests,
+                "max_requests_jitter": args.max_requests // 10,
+                "when_ready": when_ready,
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+            from app.services.model_registry import model_registry
+
+            if args.preload:
+                model_registry.load_all()
+            return app
+
+    Application().run()
+
+def main() -> None:
+    """
+    نقطه ورود اجرای سرویس API
+    """
+    args = parse_args()
+    if args.reload:
+        import uvicorn
+
+        uvicorn.run("app.main:app", host=args.host, port=args.port, reload=True)
+        return
+
+    workers = args.workers or os.cpu_count() or 1
+    # تعداد کارگرها برای تقسیم هسته‌ها بین استخرهای محاسباتی آن‌ها
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    logger.info("اجرای سرویس روی %s:%s با %s کارگر", args.host, args.port, workers)
+    run_gunicorn(args, workers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+تنظیمات مشترک تست‌ها
+
+تمام سرویس‌های خارجی با جایگزین‌های درون حافظه اجرا می‌شوند (مانند benchmarks). محیط
+پیش از import شدن app.core.config و بدون توجه به متغیرهای محیطی پوسته تنظیم می‌شود
+تا تست‌ها هرگز به پایگاه داده توسعه یا عملیاتی دسترسی نداشته باشند.
+"""
+import os
+import tempfile
+
+TEST_DIR = tempfile.mkdtemp(prefix="sscr-tests-")
+
+TEST_ENVIRONMENT = {
+    "SECRET_KEY": "test-secret",
+    "DATABASE_URL": f"sqlite:///{TEST_DIR}/test.db",
+    "INFLUXDB_URL": "http://localhost:8086",
+    "INFLUXDB_TOKEN": "test",
+    "INFLUXDB_ORG": "test",
+    "INFLUXDB_BUCKET": "test",
+    "INFLUXDB_SINK": "memory",
+    "REDIS_HOST": "localhost",
+    "REDIS_PORT": "6379",
+    "REDIS_DB": "0",
+    "REDIS_PASSWORD": "",
+    "PRINCIPAL_CACHE_BACKEND": "memory",
+    "RESULT_CACHE_BACKEND": "none",
+    "KAFKA_BOOTSTRAP_SERVERS": "localhost:9092",
+    "KAFKA_EEG_TOPIC": "eeg",
+    "KAFKA_AUDIO_TOPIC": "audio",
+    "JOB_QUEUE_BACKEND": "memory",
+    "CPU_POOL_PROCESSES": "0",
+    "MODEL_WARMUP": "false",
+    "EEG_ARCHIVE_DIR": os.path.join(TEST_DIR, "archive"),
+    "PROFILING_OUTPUT_DIR": os.path.join(TEST_DIR, "profiles"),
+}
+
+os.environ.update(TEST_ENVIRONMENT)
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db.session import engine
+from app.main import app
+from app.models.base import Base
+from app.models import baseline, user  # noqa: F401 - ثبت جدول‌ها در metadata
+
+@pytest.fixture(scope="session")
+def database():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture(scope="session")
+def client(database):
+    with TestClient(app) as test_client:
+        yield test_client
+
+@pytest.fixture(scope="session")
+def auth_headers(client):
+    credentials = {"email": "tester@example.com", "name": "tester", "password": "test-password"}
+    client.post("/api/auth/register", json=credentials)
+    response = client.post(
+        "/api/auth/login", data={"username": credentials["email"], "password": credentials["password"]}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+@pytest.fixture
+def eeg_signal():
+    """
+    سیگنال مصنوعی چهار کاناله ده ثانیه‌ای با نرخ 256 هرتز (میکروولت)
+    """
+    rng = np.random.default_rng(0)
+    t = np.arange(256 * 10) / 256
+    return 10 * np.sin(2 * np.pi * 10 * t) + rng.normal(0, 5, size=(4, t.size))
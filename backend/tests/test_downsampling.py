@@ -0,0 +1,65 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from app.services.downsampling import bucket_mean, bucket_min_max, downsample, lttb_indices
+from app.services.influx_writer import select_rollup
+from app.services.timeseries_service import MAX_POINTS, parse_resolution, resolve_range
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(1)
+    timestamps = np.sort(rng.uniform(0, 100, 1000))
+    return timestamps, rng.normal(size=(2, timestamps.size))
+
+def test_bucket_mean_matches_loop(series):
+    timestamps, values = series
+    times, means = bucket_mean(timestamps, values, 0.0, 10.0)
+    assert times.tolist() == [10.0 * i for i in range(10)]
+    for i, start in enumerate(times):
+        inside = (timestamps >= start) & (timestamps < start + 10)
+        np.testing.assert_allclose(means[:, i], values[:, inside].mean(axis=1))
+
+def test_min_max_keeps_extremes(series):
+    timestamps, values = series
+    times, envelope = bucket_min_max(timestamps, values, 0.0, 10.0)
+    assert len(times) == envelope.shape[1] == 20
+    assert envelope.min() == values.min() and envelope.max() == values.max()
+
+def test_lttb_keeps_ends_and_spikes():
+    timestamps = np.arange(1000, dtype=float)
+    values = np.zeros(1000)
+    values[437] = 50.0
+    indices = lttb_indices(timestamps, values, 50)
+    assert len(indices) == 50
+    assert indices[0] == 0 and indices[-1] == 999
+    assert 437 in indices
+    assert np.all(np.diff(indices) > 0)
+
+def test_downsample_sorts_input(series):
+    timestamps, values = series
+    order = np.random.default_rng(2).permutation(timestamps.size)
+    expected = downsample(timestamps, values, 0, 100, 10)
+    shuffled = downsample(timestamps[order], values[:, order], 0, 100, 10)
+    np.testing.assert_allclose(shuffled[1], expected[1])
+
+def test_empty_series_keeps_field_axis():
+    times, values = downsample(np.empty(0), np.empty((3, 0)), 0, 100, 10, "lttb")
+    assert times.shape == (0,) and values.shape == (3, 0)
+
+def test_resolution_is_capped_to_max_points():
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    end = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    start_ts, end_ts, step = resolve_range(start, end, "1s")
+    assert step == (end_ts - start_ts) / MAX_POINTS
+    assert resolve_range(start, end, "5m")[2] == 300
+    with pytest.raises(ValueError):
+        parse_resolution("5 minutes")
+    with pytest.raises(ValueError):
+        resolve_range(end, start, None)
+
+@pytest.mark.parametrize("every, rollup", [(30, None), (60, "1m"), (1800, "1m"), (7200, "1h"), (86400 * 7, "1d")])
+def test_select_rollup(every, rollup):
+    selected = select_rollup(every)
+    assert (selected and selected[0]) == rollup
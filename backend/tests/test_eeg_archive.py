@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from app.services.eeg_archive import ARCHIVE_DTYPE, INDEX_FILE, EEGArchive
+
+@pytest.fixture
+def archive(tmp_path):
+    return EEGArchive(str(tmp_path), segment_max_bytes=64 * 1024)
+
+def test_round_trip(archive, eeg_signal):
+    record = archive.append(7, eeg_signal, ["a", "b", "c", "d"], 256, 1000.0)
+    data, first_time = archive.read(7, record)
+    assert first_time == 1000.0
+    assert data.shape == eeg_signal.shape
+    np.testing.assert_array_equal(data, eeg_signal.astype(ARCHIVE_DTYPE))
+    assert archive.users() == [7]
+
+def test_read_time_range(archive, eeg_signal):
+    record = archive.append(7, eeg_signal, ["a", "b", "c", "d"], 256, 1000.0)
+    data, first_time = archive.read(7, record, 1002.0, 1004.0)
+    assert first_time == 1002.0
+    np.testing.assert_array_equal(data, eeg_signal[:, 512:1024].astype(ARCHIVE_DTYPE))
+    assert archive.records(7, 1011.0, 1020.0) == []
+
+def test_segments_roll_over_and_channels_split(archive, eeg_signal):
+    channels = ["a", "b", "c", "d"]
+    first = archive.append(7, eeg_signal, channels, 256, 1000.0)
+    second = archive.append(7, eeg_signal, channels, 256, 1010.0)
+    other = archive.append(7, eeg_signal[:2], ["a", "b"], 256, 1020.0)
+    # هر آپلود 40 کیلوبایت است، بنابراین دومی در قطعه جدید نوشته می‌شود
+    assert len({first.segment, second.segment, other.segment}) == 3
+    pieces = list(archive.read_range(7, 1005.0, 1015.0))
+    assert [(record.start_time, data.shape[1]) for record, data, _ in pieces] == [(1000.0, 1280), (1010.0, 1280)]
+
+def test_partial_index_line_is_ignored(archive, eeg_signal, tmp_path):
+    archive.append(7, eeg_signal, ["a", "b", "c", "d"], 256, 1000.0)
+    with open(tmp_path / "7" / INDEX_FILE, "a", encoding="utf-8") as f:
+        f.write('{"segment": "000001.f32", "off')
+    assert len(archive.records(7)) == 1
+
+def test_mismatched_channels_are_rejected(archive, eeg_signal):
+    with pytest.raises(ValueError):
+        archive.append(7, eeg_signal, ["a"], 256, 1000.0)
+
+def test_append_after_torn_index_line(archive, eeg_signal, tmp_path):
+    channels = ["a", "b", "c", "d"]
+    archive.append(7, eeg_signal, channels, 256, 1000.0)
+    with open(tmp_path / "7" / INDEX_FILE, "a", encoding="utf-8") as f:
+        f.write('{"segment": "0000')
+    second = archive.append(7, eeg_signal, channels, 256, 1010.0)
+    assert [record.start_time for record in archive.records(7)] == [1000.0, 1010.0]
+    data, _ = archive.read(7, second)
+    np.testing.assert_array_equal(data, eeg_signal.astype(ARCHIVE_DTYPE))
+
+def test_corrupt_index_line_is_skipped(archive, eeg_signal, tmp_path):
+    channels = ["a", "b", "c", "d"]
+    archive.append(7, eeg_signal, channels, 256, 1000.0)
+    with open(tmp_path / "7" / INDEX_FILE, "a", encoding="utf-8") as f:
+        f.write('{"segment": "0000{"segment": "000001.f32"}\n')
+    archive.append(7, eeg_signal, channels, 256, 1010.0)
+    assert [record.start_time for record in archive.records(7)] == [1000.0, 1010.0]
@@ -0,0 +1,90 @@
+import asyncio
+
+from app.core.config import settings
+from app.services.influx_writer import FakeInfluxSink, InfluxWriter, TimeSeriesPoint
+
+def points(count, tags=None, value=1.0):
+    return [TimeSeriesPoint("brainwave", tags or {"user_id": "1"}, {"alpha": value}, float(i)) for i in range(count)]
+
+class SlowSink(FakeInfluxSink):
+    async def write(self, batch):
+        await asyncio.sleep(0.05)
+        await super().write(batch)
+
+def test_writer_flushes_full_batches():
+    async def scenario():
+        writer = InfluxWriter(FakeInfluxSink(), batch_size=10, flush_interval=60)
+        await writer.start()
+        writer.submit(points(25))
+        await asyncio.sleep(0.05)
+        # دو دسته کامل بدون انتظار برای بازه زمانی؛ باقی‌مانده هنگام توقف ارسال می‌شود
+        assert writer.written == 20
+        await writer.stop()
+        return writer
+
+    writer = asyncio.run(scenario())
+    assert writer.written == 25
+    assert writer.sink.batches == 3
+
+def test_writer_flushes_partial_batch_after_interval():
+    async def scenario():
+        writer = InfluxWriter(FakeInfluxSink(), batch_size=100, flush_interval=0.05)
+        await writer.start()
+        writer.submit(points(3))
+        await asyncio.sleep(0.2)
+        written = writer.written
+        await writer.stop()
+        return written
+
+    assert asyncio.run(scenario()) == 3
+
+def test_stop_keeps_batch_in_flight():
+    async def scenario():
+        writer = InfluxWriter(SlowSink(), batch_size=10, flush_interval=0.01)
+        await writer.start()
+        writer.submit(points(25))
+        await asyncio.sleep(0.02)
+        await writer.stop()
+        return writer
+
+    writer = asyncio.run(scenario())
+    assert len(writer.sink.points) == 25
+    assert writer.dropped == 0
+
+def test_stop_without_points():
+    async def scenario():
+        writer = InfluxWriter(FakeInfluxSink(), flush_interval=60)
+        await writer.start()
+        await writer.stop()
+        return writer
+
+    assert asyncio.run(scenario()).written == 0
+
+def test_failed_writes_are_retried():
+    async def scenario():
+        sink = FakeInfluxSink()
+        sink.fail_next = 2
+        writer = InfluxWriter(sink, batch_size=5, flush_interval=0.01, retry_backoff=0.001)
+        await writer.start()
+        writer.submit(points(5))
+        await writer.stop()
+        return writer
+
+    writer = asyncio.run(scenario())
+    assert writer.written == 5
+    assert writer.failed_batches == 0
+
+def test_query_prefers_current_pipeline_over_untagged_points():
+    async def scenario():
+        sink = FakeInfluxSink()
+        current = {"user_id": "1", "pipeline": settings.PIPELINE_VERSION}
+        await sink.write(points(3, value=1.0))
+        await sink.write(points(2, tags=current, value=5.0))
+        await sink.write(points(1, tags={"user_id": "1", "pipeline": "old"}, value=9.0))
+        return await sink.query(1, "brainwave", ["alpha"], 0, 10, 1), await sink.query(1, "brainwave", ["alpha"], 0, 10, 60)
+
+    (times, values), (rollup_times, rollup_values) = asyncio.run(scenario())
+    assert times.tolist() == [0.0, 1.0, 2.0]
+    assert values["alpha"].tolist() == [5.0, 5.0, 1.0]
+    assert rollup_times.tolist() == [0.0]
+    assert rollup_values["alpha"].tolist() == [5.0]
@@ -0,0 +1,76 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.db.session import async_engine
+from app.services import jobs
+from app.services.jobs import DONE, EEG_JOB, FAILED, InMemoryJobQueue, MemoryJobStore, encode_eeg_payload, handle_job
+
+@pytest.fixture
+def run(database):
+    def run(coro):
+        async def main():
+            try:
+                return await coro
+            finally:
+                # اتصال‌های ناهمگام به حلقه رویداد همین تست وابسته هستند
+                await async_engine.dispose()
+        return asyncio.run(main())
+    return run
+
+def eeg_job(signal):
+    meta = {"user_id": 1, "sampling_rate": 256, "start_time": 1000.0}
+    return EEG_JOB, "job-1", meta, encode_eeg_payload(signal)
+
+def test_handle_job_records_result(run, eeg_signal):
+    store = MemoryJobStore()
+    run(handle_job(store, None, *eeg_job(eeg_signal)))
+    record = run(store.get("job-1"))
+    assert record["status"] == DONE
+    assert len(record["result"]["cognitive_data"]["average"]) == 6
+
+def test_handle_job_records_processing_failure(run):
+    store = MemoryJobStore()
+    kind, job_id, meta, _ = eeg_job(np.zeros((1, 1)))
+    run(handle_job(store, None, kind, job_id, meta, b"not an npy payload"))
+    record = run(store.get(job_id))
+    assert record["status"] == FAILED
+    assert "result" not in record
+
+def test_handle_job_records_post_processing_failure(run, eeg_signal, monkeypatch):
+    async def broken_baseline(*args):
+        raise ConnectionError("database unavailable")
+
+    monkeypatch.setattr(jobs, "update_baseline", broken_baseline)
+    store = MemoryJobStore()
+    run(handle_job(store, None, *eeg_job(eeg_signal)))
+    record = run(store.get("job-1"))
+    assert record["status"] == FAILED
+    assert "database unavailable" in record["error"]
+
+def test_memory_queue_survives_store_errors(run, eeg_signal, monkeypatch):
+    class FlakyStore(MemoryJobStore):
+        async def set(self, job_id, record):
+            if job_id == "broken":
+                raise ConnectionError("store unavailable")
+            await super().set(job_id, record)
+
+    monkeypatch.setattr(jobs, "get_cpu_pool", lambda: None)
+
+    async def scenario(store):
+        queue = InMemoryJobQueue()
+        queue.start(store)
+        kind, _, meta, payload = eeg_job(eeg_signal)
+        await queue.put(kind, "broken", meta, payload)
+        await queue.put(kind, "job-2", meta, payload)
+        for _ in range(500):
+            record = await store.get("job-2")
+            if record and record["status"] == DONE:
+                break
+            await asyncio.sleep(0.01)
+        await queue.close()
+
+    store = FlakyStore()
+    run(scenario(store))
+    assert run(store.get("job-2"))["status"] == DONE
@@ -0,0 +1,18 @@
+import pytest
+
+from app.core.config import settings
+from app.services.principal_cache import MemoryPrincipalCache, RedisPrincipalCache, create_principal_cache
+
+def test_memory_cache_with_one_worker(monkeypatch):
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    assert isinstance(create_principal_cache(), MemoryPrincipalCache)
+
+def test_memory_cache_is_refused_with_several_workers(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    with pytest.raises(RuntimeError):
+        create_principal_cache()
+
+def test_redis_cache_with_several_workers(monkeypatch):
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    monkeypatch.setattr(settings, "PRINCIPAL_CACHE_BACKEND", "redis")
+    assert isinstance(create_principal_cache(), RedisPrincipalCache)
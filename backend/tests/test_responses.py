@@ -0,0 +1,22 @@
+import msgpack
+
+def test_default_response_is_validated_json(client, auth_headers):
+    response = client.get("/api/data/brainwave", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["vary"] == "Accept"
+    assert set(response.json()) == {"alpha", "beta", "delta", "theta", "gamma", "timestamps"}
+
+def test_numeric_json_is_opt_in(client, auth_headers):
+    headers = {**auth_headers, "accept": "application/vnd.numeric+json"}
+    response = client.get("/api/data/brainwave", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert set(response.json()) >= {"alpha", "timestamps"}
+
+def test_msgpack_is_negotiated(client, auth_headers):
+    headers = {**auth_headers, "accept": "application/msgpack"}
+    response = client.get("/api/data/brainwave", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/msgpack"
+    assert "alpha" in msgpack.unpackb(response.content)
@@ -0,0 +1,43 @@
+import asyncio
+import io
+
+from app.api.routes import data as data_routes
+from app.core.config import settings
+from app.services.result_cache import ResultCache, payload_key
+from tests.test_upload import eeg_json
+
+def test_payload_key_depends_on_content_and_parameters(monkeypatch):
+    key = payload_key("eeg", b"abc", user_id=1, content_type="application/json")
+    assert payload_key("eeg", io.BytesIO(b"abc"), content_type="application/json", user_id=1) == key
+    assert payload_key("eeg", b"abd", user_id=1, content_type="application/json") != key
+    assert payload_key("eeg", b"abc", user_id=2, content_type="application/json") != key
+    monkeypatch.setattr(settings, "PIPELINE_VERSION", "next")
+    assert payload_key("eeg", b"abc", user_id=1, content_type="application/json") != key
+
+def test_payload_key_rewinds_files():
+    upload = io.BytesIO(b"x" * 10)
+    payload_key("audio", upload)
+    assert upload.read() == b"x" * 10
+
+def test_cache_evicts_least_recently_used_by_size():
+    async def scenario():
+        cache = ResultCache(max_bytes=20, max_item_bytes=15, ttl_seconds=60)
+        await cache.set("a", {"v": 1})
+        await cache.set("b", {"v": 2})
+        await cache.get("a")
+        await cache.set("c", {"v": 3})
+        await cache.set("large", {"v": "x" * 40})
+        return cache, [await cache.get(key) for key in ("a", "b", "c", "large")]
+
+    cache, values = asyncio.run(scenario())
+    assert values == [{"v": 1}, None, {"v": 3}, None]
+    assert cache.stats()["skipped"] == 1
+    assert cache.stats()["bytes"] <= 20
+
+def test_repeated_upload_is_served_from_cache(client, auth_headers, eeg_signal, monkeypatch):
+    monkeypatch.setattr(data_routes, "result_cache", ResultCache(10 ** 7, 10 ** 6, 60))
+    payload = eeg_json(eeg_signal.tolist(), timestamps=[3_000_000.0])
+    first = client.post("/api/data/eeg", headers=auth_headers, json=payload)
+    second = client.post("/api/data/eeg", headers=auth_headers, json=payload)
+    assert (first.headers["x-cache"], second.headers["x-cache"]) == ("MISS", "HIT")
+    assert second.json()["brainwaveData"] == first.json()["brainwaveData"]
@@ -0,0 +1,25 @@
+import numpy as np
+from scipy import signal
+
+from app.services.spectral import BANDS, compute_band_powers, window_end_times
+
+def test_ten_hertz_sine_peaks_in_alpha(eeg_signal):
+    powers = compute_band_powers(eeg_signal, 256)
+    alpha = list(BANDS).index("alpha")
+    assert (powers.argmax(axis=0) == alpha).all()
+
+def test_vectorized_matches_per_window_periodogram(eeg_signal):
+    rate, nperseg = 256, 512
+    powers = compute_band_powers(eeg_signal, rate)
+    for channel, samples in enumerate(eeg_signal):
+        for window, start in enumerate(range(0, samples.size - nperseg + 1, nperseg // 2)):
+            freqs, psd = signal.periodogram(
+                samples[start:start + nperseg], rate, window=np.hanning(nperseg), detrend="constant"
+            )
+            expected = [psd[(freqs >= low) & (freqs < high)].sum() * freqs[1] for low, high in BANDS.values()]
+            np.testing.assert_allclose(powers[:, channel, window], expected, rtol=1e-8)
+
+def test_window_end_times_match_windows(eeg_signal):
+    times = window_end_times(eeg_signal.shape[1], 256)
+    assert compute_band_powers(eeg_signal, 256).shape[-1] == len(times)
+    assert times[0] == 2.0 and np.allclose(np.diff(times), 1.0)
@@ -0,0 +1,69 @@
+import json
+
+import numpy as np
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app.db.session import SessionLocal
+from app.models.user import User
+from app.schemas.data import EEGStreamConfig
+from app.services.eeg_stream import EEGRingBuffer, EEGStreamSession
+from app.services.spectral import BANDS, compute_band_powers
+
+def token(auth_headers):
+    return auth_headers["Authorization"].split()[1]
+
+def stream_config(**overrides):
+    return json.dumps({"channels": ["a", "b"], "sampling_rate": 256, "window_seconds": 1, "step_seconds": 0.5, **overrides})
+
+def test_stream_sends_window_features(client, auth_headers):
+    block = np.random.default_rng(0).normal(0, 10, size=(256, 2)).astype("<f4").tobytes()
+    with client.websocket_connect(f"/api/data/eeg/stream?token={token(auth_headers)}") as websocket:
+        websocket.send_text(stream_config())
+        websocket.send_bytes(block)
+        update = websocket.receive_json()
+    assert set(update["brainwave"]) >= {"alpha", "beta"}
+
+def test_stream_rejects_invalid_token(client):
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect("/api/data/eeg/stream?token=invalid") as websocket:
+            websocket.receive_text()
+
+def test_stream_rejects_inactive_user(client):
+    credentials = {"email": "inactive@example.com", "name": "inactive", "password": "test-password"}
+    client.post("/api/auth/register", json=credentials)
+    response = client.post("/api/auth/login", data={"username": credentials["email"], "password": credentials["password"]})
+    with SessionLocal() as db:
+        db.query(User).filter(User.email == credentials["email"]).update({"is_active": False})
+        db.commit()
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect(f"/api/data/eeg/stream?token={response.json()['access_token']}") as websocket:
+            websocket.receive_text()
+
+@pytest.mark.parametrize("overrides", [{"window_seconds": 3600}, {"step_seconds": 0}, {"channels": []}])
+def test_stream_config_out_of_bounds_is_rejected(client, auth_headers, overrides):
+    with client.websocket_connect(f"/api/data/eeg/stream?token={token(auth_headers)}") as websocket:
+        websocket.send_text(stream_config(**overrides))
+        assert websocket.receive_json()["type"] == "error"
+
+def test_ring_buffer_reads_across_wraparound():
+    buffer = EEGRingBuffer(1, 8)
+    samples = np.arange(13, dtype=np.float32)[np.newaxis, :]
+    buffer.append(samples[:, :5])
+    buffer.append(samples[:, 5:])
+    np.testing.assert_array_equal(buffer.read(7, 13), samples[:, 7:13])
+    with pytest.raises(IndexError):
+        buffer.read(4, 6)
+
+@pytest.mark.parametrize("block_size", [37, 128, 1000])
+def test_session_windows_match_offline_band_powers(eeg_signal, block_size):
+    config = EEGStreamConfig(channels=["a", "b", "c", "d"], sampling_rate=256, window_seconds=2, step_seconds=0.5)
+    session = EEGStreamSession(config)
+    updates = []
+    for start in range(0, eeg_signal.shape[1], block_size):
+        updates.extend(session.push(eeg_signal[:, start:start + block_size].astype(np.float32)))
+    expected = compute_band_powers(eeg_signal.astype(np.float32), 256, overlap=0.75).mean(axis=1)
+    assert len(updates) == expected.shape[1]
+    np.testing.assert_allclose([update["end_time"] for update in updates], 2 + 0.5 * np.arange(len(updates)))
+    for i, name in enumerate(BANDS):
+        np.testing.assert_allclose([update["brainwave"][name] for update in updates], expected[i], rtol=1e-5)
@@ -0,0 +1,122 @@
+import numpy as np
+
+from app.core.config import settings
+from app.services.eeg_archive import eeg_archive
+
+def eeg_json(values, sampling_rate=256, timestamps=None, unit=None):
+    return {
+        "channels": [f"ch{i}" for i in range(len(values))],
+        "timestamps": timestamps or [],
+        "values": values,
+        "sampling_rate": sampling_rate,
+        "unit": unit,
+    }
+
+def binary_headers(auth_headers, channels, content_type="application/octet-stream", **extra):
+    headers = {
+        **auth_headers,
+        "content-type": content_type,
+        "x-eeg-channels": ",".join(channels),
+        "x-eeg-sampling-rate": "256",
+    }
+    headers.update({f"x-eeg-{key.replace('_', '-')}": value for key, value in extra.items()})
+    return headers
+
+def test_json_upload_is_analyzed(client, auth_headers, eeg_signal):
+    response = client.post("/api/data/eeg", headers=auth_headers, json=eeg_json(eeg_signal.tolist()))
+    assert response.status_code == 200
+    assert set(response.json()["brainwaveData"]) >= {"alpha", "beta"}
+
+def test_binary_upload_matches_json(client, auth_headers, eeg_signal):
+    channels = ["a", "b", "c", "d"]
+    body = np.ascontiguousarray(eeg_signal.T, dtype="<f4").tobytes()
+    binary = client.post("/api/data/eeg", headers=binary_headers(auth_headers, channels), content=body)
+    as_json = client.post(
+        "/api/data/eeg", headers=auth_headers, json=eeg_json(eeg_signal.astype(np.float32).tolist())
+    )
+    assert binary.status_code == as_json.status_code == 200
+    np.testing.assert_allclose(
+        binary.json()["brainwaveData"]["alpha"], as_json.json()["brainwaveData"]["alpha"], rtol=1e-4
+    )
+
+def test_ragged_values_return_400(client, auth_headers):
+    response = client.post("/api/data/eeg", headers=auth_headers, json=eeg_json([[1.0, 2.0, 3.0], [1.0, 2.0]]))
+    assert response.status_code == 400
+
+def test_channel_count_mismatch_returns_400(client, auth_headers, eeg_signal):
+    payload = {**eeg_json(eeg_signal.tolist()), "channels": ["a", "b"]}
+    response = client.post("/api/data/eeg", headers=auth_headers, json=payload)
+    assert response.status_code == 400
+
+def test_zero_sampling_rate_is_rejected(client, auth_headers):
+    response = client.post("/api/data/eeg", headers=auth_headers, json=eeg_json([[1.0, 2.0]], sampling_rate=0))
+    assert response.status_code == 422
+
+def test_truncated_binary_body_returns_400(client, auth_headers):
+    response = client.post("/api/data/eeg", headers=binary_headers(auth_headers, ["a", "b"]), content=b"\0" * 7)
+    assert response.status_code == 400
+
+def test_unsupported_content_type_returns_415(client, auth_headers):
+    response = client.post("/api/data/eeg", headers={**auth_headers, "content-type": "text/plain"}, content=b"1,2,3")
+    assert response.status_code == 415
+
+def test_async_upload_returns_job(client, auth_headers, eeg_signal):
+    response = client.post(
+        "/api/data/eeg", params={"mode": "async"}, headers=auth_headers, json=eeg_json(eeg_signal.tolist())
+    )
+    assert response.status_code == 202
+    job = client.get(f"/api/data/jobs/{response.json()['jobId']}", headers=auth_headers)
+    assert job.status_code == 200
+
+def test_async_upload_above_queue_limit_returns_413(client, auth_headers, eeg_signal, monkeypatch):
+    monkeypatch.setattr(settings, "KAFKA_MAX_MESSAGE_BYTES", 1024)
+    response = client.post(
+        "/api/data/eeg", params={"mode": "async"}, headers=auth_headers, json=eeg_json(eeg_signal.tolist())
+    )
+    assert response.status_code == 413
+
+def user_id(client, auth_headers):
+    return client.get("/api/auth/me", headers=auth_headers).json()["id"]
+
+def test_accepted_upload_is_archived(client, auth_headers, eeg_signal):
+    start = 1_000_000.0
+    response = client.post("/api/data/eeg", headers=auth_headers, json=eeg_json(eeg_signal.tolist(), timestamps=[start]))
+    assert response.status_code == 200
+    records = eeg_archive.records(user_id(client, auth_headers), start, start + 1)
+    assert [record.start_time for record in records] == [start]
+
+def test_rejected_upload_is_not_archived(client, auth_headers):
+    start = 2_000_000.0
+    flat = np.zeros((2, 600)).tolist()
+    response = client.post("/api/data/eeg", headers=auth_headers, json=eeg_json(flat, timestamps=[start], unit="uV"))
+    assert response.status_code == 400
+    assert eeg_archive.records(user_id(client, auth_headers), start, start + 10) == []
+
+def test_microvolt_sine_keeps_all_channels(client, auth_headers, eeg_signal):
+    response = client.post("/api/data/eeg", headers=auth_headers, json=eeg_json(eeg_signal.tolist(), unit="uV"))
+    assert response.status_code == 200
+    preprocessing = response.json()["preprocessing"]
+    assert preprocessing["calibrated"] is True
+    assert preprocessing["rejected_channels"] == []
+    assert preprocessing["rejected_windows"] == 0
+
+def test_volt_scaled_sine_is_converted_to_microvolts(client, auth_headers, eeg_signal):
+    volts = client.post("/api/data/eeg", headers=auth_headers, json=eeg_json((eeg_signal * 1e-6).tolist(), unit="V"))
+    microvolts = client.post("/api/data/eeg", headers=auth_headers, json=eeg_json(eeg_signal.tolist(), unit="uV"))
+    assert volts.status_code == 200
+    assert volts.json()["preprocessing"]["rejected_channels"] == []
+    np.testing.assert_allclose(
+        volts.json()["brainwaveData"]["alpha"], microvolts.json()["brainwaveData"]["alpha"], rtol=1e-6
+    )
+
+def test_volt_scaled_sine_without_unit_is_not_rejected(client, auth_headers, eeg_signal):
+    response = client.post("/api/data/eeg", headers=auth_headers, json=eeg_json((eeg_signal * 1e-6).tolist()))
+    assert response.status_code == 200
+    assert response.json()["preprocessing"] == {"rejected_channels": [], "rejected_windows": 0, "calibrated": False}
+
+def test_int16_counts_without_unit_are_not_rejected(client, auth_headers, eeg_signal):
+    channels = ["a", "b", "c", "d"]
+    body = np.ascontiguousarray((eeg_signal * 200).T, dtype="<i2").tobytes()
+    response = client.post("/api/data/eeg", headers=binary_headers(auth_headers, channels, dtype="int16"), content=body)
+    assert response.status_code == 200
+    assert response.json()["preprocessing"]["rejected_channels"] == []
@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+from app.db.session import AsyncSessionLocal, async_engine
+from app.services.user_import import detect_format, import_users_async, parse_rows
+
+@pytest.fixture
+def import_file(database):
+    def run(content, fmt):
+        async def main():
+            try:
+                async with AsyncSessionLocal() as db:
+                    return await import_users_async(db, parse_rows(content, fmt))
+            finally:
+                await async_engine.dispose()
+        return asyncio.run(main())
+    return run
+
+def test_detect_format():
+    assert detect_format("users.CSV", "") == "csv"
+    assert detect_format("upload", "text/csv") == "csv"
+    assert detect_format("users.ndjson", "application/x-ndjson") == "ndjson"
+
+def test_csv_import_reports_rows_by_line(import_file):
+    content = (
+        "email,name,password,age\n"
+        "import-a@example.com,A,password-a,30\n"
+        "not-an-email,B,password-b,\n"
+        "import-c@example.com,C,short,\n"
+        "import-a@example.com,A again,password-a,\n"
+    ).encode()
+    result = import_file(content, "csv")
+    assert (result["total"], result["created"], result["failed"]) == (4, 1, 3)
+    assert [error["row"] for error in result["errors"]] == [3, 4, 5]
+    assert result["errors"][2]["error"] == "ایمیل در فایل تکراری است"
+
+def test_ndjson_import_skips_existing_users_and_bad_lines(import_file):
+    first = b'{"email": "import-d@example.com", "name": "D", "password": "password-d"}\n'
+    assert import_file(first, "ndjson")["created"] == 1
+    content = first + b"\n{broken\n[1, 2]\n" + b'{"email": "import-e@example.com", "name": "E", "password": "password-e"}\n'
+    result = import_file(content, "ndjson")
+    assert (result["total"], result["created"], result["failed"]) == (4, 1, 3)
+    assert [(error["row"], error["email"]) for error in result["errors"]] == [
+        (1, "import-d@example.com"), (3, None), (4, None)
+    ]
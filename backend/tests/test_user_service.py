@@ -0,0 +1,16 @@
+from datetime import datetime
+
+import pytest
+
+from app.services.user_service import decode_cursor, encode_cursor
+
+def test_cursor_round_trip():
+    created_at = datetime(2023, 5, 1, 12, 30, 15, 123456)
+    cursor = encode_cursor(created_at, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, 42)
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", encode_cursor(None, 1), "WyJ4Il0"])
+def test_invalid_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
@@ -0,0 +1,72 @@
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from kafka import KafkaConsumer
+
+from app.core.config import settings
+from app.db.redis import close_redis
+from app.services.influx_writer import start_writer, stop_writer
+from app.services.jobs import RedisJobStore, handle_job, job_topics
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def consume() -> None:
+    """
+    مصرف پیام‌های موضوع‌های EEG و صوت و اجرای پردازش در استخر پردازه‌ها
+
+    پیام‌ها پس از پردازش کامل هر دسته commit می‌شوند (تحویل حداقل یک‌باره).
+    """
+    topics = job_topics()
+    kinds = {topic: kind for kind, topic in topics.items()}
+    consumer = KafkaConsumer(
+        *topics.values(),
+        bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS,
+        group_id=settings.KAFKA_CONSUMER_GROUP,
+        enable_auto_commit=False,
+        max_partition_fetch_bytes=settings.KAFKA_MAX_MESSAGE_BYTES,
+        fetch_max_bytes=settings.KAFKA_MAX_MESSAGE_BYTES,
+    )
+    processes = settings.JOB_WORKER_PROCESSES or os.cpu_count()
+    # forkserver مانند استخر محاسباتی API؛ فرزندها از پردازه دارای نخ‌های Kafka و نویسنده fork نمی‌شوند
+    executor = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("forkserver"))
+    store = RedisJobStore()
+    loop = asyncio.get_running_loop()
+    await start_writer()
+    logger.info("کارگر با %s پردازه آماده مصرف از %s است", processes, ", ".join(topics.values()))
+    try:
+        while True:
+            batches = await loop.run_in_executor(None, lambda: consumer.poll(timeout_ms=1000, max_records=processes))
+            records = [record for batch in batches.values() for record in batch]
+            if not records:
+                continue
+            await asyncio.gather(*(
+                handle_job(
+                    store,
+                    executor,
+                    kinds[record.topic],
+                    record.key.decode(),
+                    json.loads(dict(record.headers)["meta"]),
+                    record.value,
+                )
+                for record in records
+            ))
+            await loop.run_in_executor(None, consumer.commit)
+    finally:
+        consumer.close()
+        executor.shutdown()
+        await stop_writer()
+        await close_redis()
+
+def main() -> None:
+    """
+    نقطه ورود کارگر پردازش ناهمگام آپلودها
+    """
+    asyncio.run(consume())
+
+if __name__ == "__main__":
+    main()
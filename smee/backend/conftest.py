@@ -0,0 +1,6 @@
+"""
+تنظیمات مشترک تست‌های SMEE
+
+وجود این فایل در ریشه backend باعث می‌شود pytest این پوشه را به sys.path اضافه کند تا
+ماژول‌های processors و fusion مانند main.py مستقیماً import شوند.
+"""
@@ -0,0 +1,101 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from processors import ProcessingError
+
+# نرخ نمونه‌برداری پیش‌فرض هر حسگر وقتی کلاینت timestamps یا sampling_rate نفرستد (Hz)
+DEFAULT_RATES = {"eeg": 256.0, "gsr": 4.0, "heart_rate": 1.0}
+
+# سقف تعداد پنجره‌های خط زمانی مشترک در هر درخواست
+MAX_WINDOWS = 200_000
+
+Stream = Tuple[np.ndarray, np.ndarray]
+
+def build_stream(spec: Dict[str, Any], default_rate: float, default_start: float) -> Optional[Stream]:
+    """
+    تبدیل داده یک حسگر به (زمان‌های مرتب (n,)، مقادیر (کانال‌ها، n))
+
+    spec شامل values و به صورت اختیاری timestamps، sampling_rate و start_time است.
+    """
+    try:
+        values = np.asarray(spec["values"], dtype=np.float64)
+    except ValueError:
+        raise ProcessingError("تعداد نمونه‌های همه کانال‌های یک حسگر باید برابر باشد")
+    if values.size == 0:
+        return None
+    values = np.atleast_2d(values)
+    n = values.shape[1]
+
+    timestamps = spec.get("timestamps")
+    if timestamps is not None:
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if len(timestamps) != n:
+            raise ProcessingError("تعداد timestamps با تعداد نمونه‌ها برابر نیست")
+        if np.any(np.diff(timestamps) < 0):
+            order = np.argsort(timestamps, kind="stable")
+            timestamps, values = timestamps[order], values[:, order]
+    else:
+        rate = spec.get("sampling_rate") or default_rate
+        start = spec.get("start_time")
+        timestamps = (default_start if start is None else start) + np.arange(n) / rate
+    return timestamps, values
+
+def window_features(timestamps: np.ndarray, values: np.ndarray, edges: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    میانگین و انحراف معیار هر کانال در پنجره‌های [edges[i], edges[i+1])
+
+    مرز پنجره‌ها با searchsorted و مجموع‌ها با add.reduceat به صورت برداری محاسبه می‌شوند.
+    پنجره‌های بدون نمونه (حسگرهای کندتر از طول پنجره) با درون‌یابی خطی پر می‌شوند.
+    """
+    starts = np.searchsorted(timestamps, edges[:-1], side="left")
+    end = int(np.searchsorted(timestamps, edges[-1], side="left"))
+    counts = np.diff(np.append(starts, end))
+    centers = (edges[:-1] + edges[1:]) / 2
+    level = np.vstack([np.interp(centers, timestamps, channel) for channel in values])
+
+    # ستون صفر انتهایی تا اندیس پنجره‌های خالی پایانی (برابر end) معتبر باشد
+    window = np.concatenate([values[:, :end], np.zeros((values.shape[0], 1))], axis=1)
+    filled = counts > 0
+    safe_counts = np.maximum(counts, 1)
+    mean = np.add.reduceat(window, starts, axis=1) / safe_counts
+    square = np.add.reduceat(window * window, starts, axis=1) / safe_counts
+    std = np.sqrt(np.maximum(square - mean * mean, 0.0))
+    return np.where(filled, mean, level), np.where(filled, std, 0.0)
+
+def fuse_streams(specs: Dict[str, Dict[str, Any]], window_seconds: float = 1.0, start_time: float = 0.0) -> Optional[Dict[str, Any]]:
+    """
+    هم‌ترازی حسگرها با نرخ‌های متفاوت روی یک خط زمانی مشترک و ساخت ماتریس ویژگی (پنجره × ویژگی)
+
+    تابع سطح ماژول است تا در استخر پردازه اجرا شود.
+    """
+    streams = {}
+    for name, spec in specs.items():
+        stream = build_stream(spec, DEFAULT_RATES.get(name, 1.0), start_time)
+        if stream is not None:
+            streams[name] = stream
+    if not streams:
+        return None
+
+    first = min(timestamps[0] for timestamps, _ in streams.values())
+    last = max(timestamps[-1] for timestamps, _ in streams.values())
+    n_windows = max(1, int(np.floor((last - first) / window_seconds)) + 1)
+    if n_windows > MAX_WINDOWS:
+        raise ProcessingError("بازه زمانی داده‌های حسگرها برای طول پنجره انتخاب شده بیش از حد طولانی است")
+    edges = first + np.arange(n_windows + 1) * window_seconds
+
+    names: List[str] = []
+    columns: List[np.ndarray] = []
+    for name, (timestamps, values) in streams.items():
+        mean, std = window_features(timestamps, values, edges)
+        for channel in range(values.shape[0]):
+            prefix = name if values.shape[0] == 1 else f"{name}_{channel}"
+            names.extend([f"{prefix}_mean", f"{prefix}_std"])
+            columns.extend([mean[channel], std[channel]])
+
+    return {
+        "window_seconds": window_seconds,
+        "timestamps": edges[:-1].tolist(),
+        "features": names,
+        "matrix": np.column_stack(columns).round(6).tolist(),
+    }
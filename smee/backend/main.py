@@ -1,8 +1,23 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, ValidationError
+from starlette.datastructures import UploadFile
 import uvicorn
 
+from fusion import fuse_streams
+from processors import ProcessingError, decode_base64, process_audio, process_tactile, process_visual
+
+logger = logging.getLogger(__name__)
+
 app = FastAPI(title="SMEE Backend API")
 
 # تنظیمات CORS
@@ -14,23 +29,186 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# پردازشگر هر حس و اینکه محاسباتی (استخر پردازه) است یا سبک (استخر نخ)
+PROCESSORS: Dict[str, Callable[[bytes], dict]] = {
+    "visual": process_visual,
+    "audio": process_audio,
+    "tactile": process_tactile,
+}
+CPU_BOUND = {"visual", "audio"}
+
+# طول پنجره‌های خط زمانی مشترک ادغام حسگرها (ثانیه)
+FUSION_WINDOW_SECONDS = float(os.environ.get("SMEE_FUSION_WINDOW_SECONDS", "1.0"))
+
+# استخر پردازه رمزگشایی تصویر و صدا؛ SMEE_POOL_PROCESSES=0 یعنی به تعداد هسته‌ها
+process_pool: Optional[ProcessPoolExecutor] = None
+
+class SignalStream(BaseModel):
+    """
+    نمونه‌های یک حسگر؛ بدون timestamps زمان نمونه‌ها از start_time و sampling_rate محاسبه می‌شود
+    """
+    values: Union[List[float], List[List[float]]]
+    timestamps: Optional[List[float]] = None
+    sampling_rate: Optional[float] = Field(None, gt=0)
+    start_time: Optional[float] = None
+
+# مقدار تکی، لیست نمونه‌ها (با نرخ پیش‌فرض حسگر)، چند کانال یا جریان کامل با زمان‌ها
+SensorValue = Union[float, List[float], List[List[float]], SignalStream]
+
+class BiosensorData(BaseModel):
+    """
+    داده‌های بیوسنسورها با نرخ‌های متفاوت؛ start_time زمان شروع پیش‌فرض همه جریان‌ها است
+    """
+    eeg: Optional[SensorValue] = None
+    gsr: Optional[SensorValue] = None
+    heart_rate: Optional[SensorValue] = None
+    start_time: float = 0.0
+
 class SensoryInput(BaseModel):
     visual_data: str
     audio_data: str
     tactile_data: str
-    biosensor_data: dict
+    biosensor_data: BiosensorData = BiosensorData()
+
+def create_pool() -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=int(os.environ.get("SMEE_POOL_PROCESSES", "0")) or None)
+
+async def run_in_pool(func: Callable, *args: Any) -> Any:
+    """
+    اجرا در استخر پردازه؛ اگر پردازه فرزندی از بین برود استخر برای درخواست‌های بعدی از نو ساخته می‌شود
+    """
+    global process_pool
+    pool = process_pool
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+    except BrokenProcessPool:
+        if pool is not None and pool is process_pool:
+            logger.error("استخر پردازه از کار افتاد و دوباره ساخته می‌شود")
+            process_pool = create_pool()
+            pool.shutdown(wait=False, cancel_futures=True)
+        raise
+
+@app.on_event("startup")
+async def startup():
+    global process_pool
+    process_pool = create_pool()
+
+@app.on_event("shutdown")
+async def shutdown():
+    if process_pool is not None:
+        process_pool.shutdown(cancel_futures=True)
 
 @app.get("/")
 async def root():
     return {"message": "SMEE Backend API is running"}
 
+async def run_processor(modality: str, data: Any) -> dict:
+    """
+    پردازش داده یک حس؛ خطای یک حس مانع پردازش حس‌های دیگر نمی‌شود
+    """
+    started = time.perf_counter()
+    try:
+        if isinstance(data, UploadFile):
+            data = await data.read()
+        elif isinstance(data, str):
+            data = decode_base64(data)
+        if modality in CPU_BOUND:
+            result = await run_in_pool(PROCESSORS[modality], data)
+        else:
+            result = await asyncio.get_running_loop().run_in_executor(None, PROCESSORS[modality], data)
+        result["status"] = "success"
+    except ProcessingError as e:
+        result = {"status": "error", "detail": str(e)}
+    except BrokenProcessPool:
+        result = {"status": "error", "detail": "پردازه پردازش از کار افتاد"}
+    except Exception:
+        # خطای پیش‌بینی نشده رمزگشا (مثلاً DecompressionBombError در Pillow) فقط همین حس را از کار می‌اندازد
+        logger.exception("پردازش داده %s ناموفق بود", modality)
+        result = {"status": "error", "detail": "داده قابل پردازش نیست"}
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+def fusion_specs(biosensor_data: BiosensorData, audio: Optional[dict]) -> Dict[str, Dict[str, Any]]:
+    """
+    جریان‌های ورودی ادغام: بیوسنسورها و پوش شدت صدا
+    """
+    specs = {}
+    for name in ("eeg", "gsr", "heart_rate"):
+        value = getattr(biosensor_data, name)
+        if isinstance(value, SignalStream):
+            specs[name] = value.dict()
+        elif value is not None:
+            specs[name] = {"values": value}
+    if audio and "envelope" in audio:
+        specs["audio"] = {"values": audio.pop("envelope"), "sampling_rate": audio.pop("envelope_rate")}
+    return specs
+
+async def run_fusion(specs: Dict[str, Dict[str, Any]], start_time: float) -> Optional[dict]:
+    if not specs:
+        return None
+    try:
+        fused = await run_in_pool(fuse_streams, specs, FUSION_WINDOW_SECONDS, start_time)
+    except ProcessingError as e:
+        return {"status": "error", "detail": str(e)}
+    except BrokenProcessPool:
+        return {"status": "error", "detail": "پردازه پردازش از کار افتاد"}
+    fused["status"] = "success"
+    return fused
+
+async def read_sensory_request(request: Request):
+    """
+    خواندن ورودی حسی از multipart (یک بخش باینری برای هر حس) یا JSON با داده‌های base64
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        # بخش‌های فایل به صورت جریانی در بافرهای موقت (SpooledTemporaryFile) نوشته می‌شوند
+        form = await request.form()
+        parts = {modality: form.get(modality) for modality in PROCESSORS if form.get(modality) is not None}
+        try:
+            biosensor_data = BiosensorData.parse_obj(json.loads(form.get("biosensor_data") or "{}"))
+        except ValueError as e:
+            errors = e.errors() if isinstance(e, ValidationError) else "biosensor_data باید JSON معتبر باشد"
+            raise HTTPException(status_code=422, detail=errors)
+        return parts, biosensor_data
+
+    try:
+        sensory_input = SensoryInput.parse_raw(await request.body())
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors())
+    parts = {modality: getattr(sensory_input, f"{modality}_data") for modality in PROCESSORS}
+    return parts, sensory_input.biosensor_data
+
 @app.post("/process-sensory-input")
-async def process_sensory_input(input: SensoryInput):
+async def process_sensory_input(request: Request):
+    """
+    پردازش همزمان داده‌های حسی
+
+    ورودی می‌تواند multipart/form-data با بخش‌های visual، audio و tactile (فایل باینری) و
+    فیلد biosensor_data (JSON) باشد، یا JSON با داده‌های base64 (SensoryInput). هر حس
+    همزمان پردازش می‌شود، بنابراین زمان پاسخ برابر کندترین حس است نه مجموع آن‌ها.
+    """
+    parts, biosensor_data = await read_sensory_request(request)
     try:
-        # TODO: پیاده‌سازی پردازش داده‌های حسی
-        return {"status": "success", "message": "Sensory data processed"}
+        results = await asyncio.gather(*(run_processor(modality, data) for modality, data in parts.items()))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        for data in parts.values():
+            if isinstance(data, UploadFile):
+                await data.close()
+
+    modalities = dict(zip(parts, results))
+    # ادغام حسگرها روی خط زمانی مشترک برای مدل‌های عاطفی
+    fusion = await run_fusion(fusion_specs(biosensor_data, modalities.get("audio")), biosensor_data.start_time)
+    failed = [modality for modality, result in modalities.items() if result["status"] != "success"]
+    if fusion is not None and fusion["status"] != "success":
+        failed.append("fusion")
+    return {
+        "status": "partial" if failed else "success",
+        "message": f"Sensory data processed with errors in: {', '.join(failed)}" if failed else "Sensory data processed",
+        "modalities": modalities,
+        "fusion": fusion,
+    }
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,109 @@
+import base64
+import binascii
+import io
+import wave
+
+import numpy as np
+from PIL import Image, UnidentifiedImageError
+
+# طول قاب پوش شدت صدا برای هم‌ترازی با حسگرهای دیگر (ثانیه)
+ENVELOPE_SECONDS = 0.05
+
+# بزرگ‌ترین ضلع تصویر پس از کوچک‌سازی برای محاسبه ویژگی‌ها
+MAX_IMAGE_SIDE = 256
+
+class ProcessingError(ValueError):
+    """
+    خطای داده ورودی نامعتبر یک حس
+    """
+
+def decode_base64(data: str) -> bytes:
+    """
+    رمزگشایی base64 با پشتیبانی از پیشوند data URL (مانند data:image/png;base64,...)
+    """
+    if data.startswith("data:") and "," in data:
+        data = data.split(",", 1)[1]
+    try:
+        return base64.b64decode(data, validate=True)
+    except (binascii.Error, ValueError):
+        raise ProcessingError("داده base64 نامعتبر است")
+
+def process_visual(data: bytes) -> dict:
+    """
+    رمزگشایی تصویر و استخراج ویژگی‌های روشنایی و رنگ
+    """
+    try:
+        image = Image.open(io.BytesIO(data))
+        width, height, image_format = image.width, image.height, image.format
+        # draft برای JPEG رمزگشایی را مستقیماً در اندازه کوچک‌تر انجام می‌دهد
+        image.draft("RGB", (MAX_IMAGE_SIDE, MAX_IMAGE_SIDE))
+        image = image.convert("RGB")
+        image.thumbnail((MAX_IMAGE_SIDE, MAX_IMAGE_SIDE))
+    except Image.DecompressionBombError:
+        raise ProcessingError("ابعاد تصویر بیش از حد مجاز است")
+    except (UnidentifiedImageError, OSError, ValueError, SyntaxError):
+        # تصویر ناقص یا خراب؛ Pillow بسته به قالب OSError، ValueError یا SyntaxError می‌دهد
+        raise ProcessingError("فرمت تصویر پشتیبانی نمی‌شود")
+
+    pixels = np.asarray(image, dtype=np.float32) / 255.0
+    luminance = pixels @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    return {
+        "format": image_format,
+        "width": width,
+        "height": height,
+        "mean_rgb": [round(float(value), 4) for value in pixels.mean(axis=(0, 1))],
+        "brightness": round(float(luminance.mean()), 4),
+        "contrast": round(float(luminance.std()), 4),
+    }
+
+def process_audio(data: bytes) -> dict:
+    """
+    رمزگشایی فایل WAV (PCM) و استخراج ویژگی‌های شدت صدا
+    """
+    try:
+        with wave.open(io.BytesIO(data)) as wav:
+            channels, sample_width, rate = wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+            frames = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError, OSError, ValueError):
+        raise ProcessingError("فقط فایل صوتی WAV پشتیبانی می‌شود")
+    if rate <= 0:
+        raise ProcessingError("نرخ نمونه‌برداری فایل صوتی نامعتبر است")
+    dtypes = {1: np.uint8, 2: np.int16, 4: np.int32}
+    if sample_width not in dtypes:
+        raise ProcessingError("عمق نمونه فایل صوتی پشتیبانی نمی‌شود")
+    if channels < 1 or len(frames) % (sample_width * channels):
+        raise ProcessingError("فایل صوتی ناقص است")
+
+    samples = np.frombuffer(frames, dtype=dtypes[sample_width]).astype(np.float32)
+    if sample_width == 1:
+        samples -= 128.0
+    samples = samples.reshape(-1, channels).mean(axis=1) / float(2 ** (8 * sample_width - 1))
+    if len(samples) == 0:
+        raise ProcessingError("فایل صوتی خالی است")
+    hop = max(1, int(rate * ENVELOPE_SECONDS))
+    frames = samples[: len(samples) // hop * hop].reshape(-1, hop)
+    return {
+        "sample_rate": rate,
+        "channels": channels,
+        "duration": round(len(samples) / rate, 3),
+        "rms": round(float(np.sqrt(np.mean(samples ** 2))), 4),
+        "peak": round(float(np.abs(samples).max()), 4),
+        "zero_crossing_rate": round(float(np.mean(np.signbit(samples[1:]) != np.signbit(samples[:-1]))), 4),
+        # پوش RMS قاب‌ها؛ در ادغام حسگرها استفاده و از پاسخ حذف می‌شود
+        "envelope": np.sqrt(np.mean(frames ** 2, axis=1)),
+        "envelope_rate": rate / hop,
+    }
+
+def process_tactile(data: bytes) -> dict:
+    """
+    خلاصه الگوی لمسی: نمونه‌های فشار/لرزش float32 با ترتیب little-endian
+    """
+    if len(data) == 0 or len(data) % 4:
+        raise ProcessingError("داده لمسی باید دنباله‌ای از نمونه‌های float32 باشد")
+    samples = np.frombuffer(data, dtype="<f4")
+    return {
+        "samples": int(len(samples)),
+        "mean": round(float(samples.mean()), 4),
+        "max": round(float(samples.max()), 4),
+        "energy": round(float(np.sum(samples.astype(np.float64) ** 2)), 4),
+    }
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from fusion import MAX_WINDOWS, fuse_streams, window_features
+from processors import ProcessingError
+
+def test_window_means_and_stds():
+    timestamps = np.arange(8) * 0.5
+    values = np.array([[1.0, 3.0, 5.0, 5.0, 2.0, 4.0, 0.0, 0.0]])
+    mean, std = window_features(timestamps, values, np.arange(5.0))
+    np.testing.assert_allclose(mean[0], [2.0, 5.0, 3.0, 0.0])
+    np.testing.assert_allclose(std[0], [1.0, 0.0, 1.0, 0.0])
+
+def test_empty_windows_are_interpolated():
+    # حسگر کند: یک نمونه هر سه ثانیه با پنجره یک ثانیه‌ای
+    timestamps = np.array([0.0, 3.0])
+    values = np.array([[0.0, 6.0]])
+    mean, std = window_features(timestamps, values, np.arange(5.0))
+    # پنجره‌های 1 و 2 خالی هستند و با مقدار خطی در مرکز پنجره (1.5 و 2.5 ثانیه) پر می‌شوند
+    np.testing.assert_allclose(mean[0], [0.0, 3.0, 5.0, 6.0])
+    np.testing.assert_allclose(std[0], 0.0)
+
+def test_trailing_empty_windows_hold_last_value():
+    timestamps = np.array([0.0, 0.5])
+    values = np.array([[2.0, 4.0]])
+    mean, std = window_features(timestamps, values, np.arange(4.0))
+    np.testing.assert_allclose(mean[0], [3.0, 4.0, 4.0])
+    np.testing.assert_allclose(std[0], [1.0, 0.0, 0.0])
+
+def test_streams_with_different_rates_share_a_timeline():
+    fused = fuse_streams(
+        {
+            "eeg": {"values": [np.ones(512).tolist(), np.zeros(512).tolist()], "sampling_rate": 256},
+            "gsr": {"values": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0], "sampling_rate": 4},
+        },
+        window_seconds=1.0,
+        start_time=100.0,
+    )
+    assert fused["timestamps"] == [100.0, 101.0]
+    assert fused["features"] == ["eeg_0_mean", "eeg_0_std", "eeg_1_mean", "eeg_1_std", "gsr_mean", "gsr_std"]
+    matrix = np.array(fused["matrix"])
+    np.testing.assert_allclose(matrix[:, 0], 1.0)
+    np.testing.assert_allclose(matrix[:, 4], [2.5, 6.5])
+
+def test_empty_streams_are_skipped():
+    assert fuse_streams({"eeg": {"values": []}, "gsr": {"values": []}}) is None
+    fused = fuse_streams({"eeg": {"values": []}, "gsr": {"values": [1.0, 2.0]}})
+    assert fused["features"] == ["gsr_mean", "gsr_std"]
+
+def test_unsorted_timestamps_are_ordered():
+    fused = fuse_streams({"gsr": {"values": [3.0, 1.0, 2.0], "timestamps": [2.5, 0.5, 1.5]}})
+    np.testing.assert_allclose(np.array(fused["matrix"])[:, 0], [1.0, 2.0, 3.0])
+
+def test_mismatched_timestamps_are_rejected():
+    with pytest.raises(ProcessingError):
+        fuse_streams({"gsr": {"values": [1.0, 2.0], "timestamps": [0.0]}})
+
+def test_too_many_windows_are_rejected():
+    with pytest.raises(ProcessingError):
+        fuse_streams({"gsr": {"values": [1.0, 2.0], "timestamps": [0.0, float(MAX_WINDOWS)]}}, window_seconds=0.5)
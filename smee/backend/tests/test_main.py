@@ -0,0 +1,58 @@
+import base64
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from tests.test_processors import png_bytes, wav_bytes
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+def files(visual=None):
+    tactile = np.linspace(0, 1, 16, dtype="<f4").tobytes()
+    return {
+        "visual": ("image.png", visual or png_bytes(), "image/png"),
+        "audio": ("sound.wav", wav_bytes(np.full(8000, 8192)), "audio/wav"),
+        "tactile": ("touch.bin", tactile, "application/octet-stream"),
+    }
+
+def test_multipart_processes_every_modality_and_fuses(client):
+    biosensors = {"gsr": {"values": [1.0, 2.0, 3.0, 4.0], "sampling_rate": 4}}
+    response = client.post(
+        "/process-sensory-input", files=files(), data={"biosensor_data": json.dumps(biosensors)}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "success"
+    assert {name: result["status"] for name, result in body["modalities"].items()} == {
+        "visual": "success", "audio": "success", "tactile": "success"
+    }
+    assert "envelope" not in body["modalities"]["audio"]
+    assert body["fusion"]["features"] == ["gsr_mean", "gsr_std", "audio_mean", "audio_std"]
+
+def test_failed_modality_does_not_fail_the_others(client):
+    response = client.post("/process-sensory-input", files=files(visual=b"not an image"))
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "partial"
+    assert body["modalities"]["visual"]["status"] == "error"
+    assert body["modalities"]["audio"]["status"] == "success"
+
+def test_json_base64_input(client):
+    payload = {
+        "visual_data": "data:image/png;base64," + base64.b64encode(png_bytes()).decode(),
+        "audio_data": base64.b64encode(wav_bytes(np.zeros(800))).decode(),
+        "tactile_data": base64.b64encode(np.ones(4, dtype="<f4").tobytes()).decode(),
+    }
+    response = client.post("/process-sensory-input", json=payload)
+    assert response.status_code == 200
+    assert response.json()["modalities"]["tactile"]["samples"] == 4
+
+def test_invalid_biosensor_json_is_rejected(client):
+    response = client.post("/process-sensory-input", files=files(), data={"biosensor_data": "{"})
+    assert response.status_code == 422
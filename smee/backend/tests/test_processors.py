@@ -0,0 +1,51 @@
+import io
+import wave
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from processors import ProcessingError, decode_base64, process_audio, process_visual
+
+def png_bytes(size=(64, 64)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (255, 0, 0)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+def wav_bytes(samples, rate=8000):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(np.asarray(samples, dtype="<i2").tobytes())
+    return buffer.getvalue()
+
+def test_visual_features():
+    result = process_visual(png_bytes())
+    assert (result["format"], result["width"], result["height"]) == ("PNG", 64, 64)
+    assert result["mean_rgb"] == [1.0, 0.0, 0.0]
+
+@pytest.mark.parametrize("data", [b"not an image", png_bytes()[:60]])
+def test_broken_image_is_a_processing_error(data):
+    with pytest.raises(ProcessingError):
+        process_visual(data)
+
+def test_decompression_bomb_is_a_processing_error(monkeypatch):
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 100)
+    with pytest.raises(ProcessingError):
+        process_visual(png_bytes())
+
+def test_audio_features():
+    result = process_audio(wav_bytes(np.full(8000, 16384)))
+    assert result["duration"] == 1.0
+    assert result["rms"] == 0.5
+
+@pytest.mark.parametrize("data", [b"RIFF" + b"\xff" * 40, wav_bytes(np.zeros(100))[:30]])
+def test_broken_audio_is_a_processing_error(data):
+    with pytest.raises(ProcessingError):
+        process_audio(data)
+
+def test_invalid_base64_is_a_processing_error():
+    with pytest.raises(ProcessingError):
+        decode_base64("data:image/png;base64,***")